@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+import os
+import asyncio
+import secrets
+import logging
+
+from app.services.enrichment_queue import get_enrichment_queue_stats
+from app.services.company_store import get_company_store_stats, compact_company_store
+from app.services.data_registry import get_data_registry_stats, reload_precomputed_store
+from app.services.precomputed_results import get_precomputed_journal_stats, compact_precomputed_results
+from app.services.popularity import get_popularity_stats
+from app.services.llm_client import get_llm_stats
+from app.services.question_bank import get_question_bank_stats
+from app.services.question_cache import get_question_cache_stats
+from app.utils.cache import get_cache_stats
+from app.utils.llm_cache import get_llm_cache_stats
+from app.utils.youtube_resolver import get_youtube_resolver_stats
+
+logger = logging.getLogger(__name__)
+
+# Admin endpoints are disabled unless a token is configured
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+def require_admin(x_admin_token: str | None = Header(None)) -> None:
+    """Check the X-Admin-Token header against ADMIN_TOKEN."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not found")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+
+def _collect_metrics() -> dict:
+    return {
+        "enrichment_queue": get_enrichment_queue_stats(),
+        "company_store": get_company_store_stats(),
+        "data_registry": get_data_registry_stats(),
+        "precomputed_journal": get_precomputed_journal_stats(),
+        "popularity": get_popularity_stats(),
+        "llm": get_llm_stats(),
+        "llm_cache": get_llm_cache_stats(),
+        "response_cache": get_cache_stats(),
+        "question_cache": get_question_cache_stats(),
+        "question_bank": get_question_bank_stats(),
+        "youtube_resolver": get_youtube_resolver_stats(),
+    }
+
+
+@router.get("/metrics")
+async def get_metrics():
+    # Several stats read SQLite; keep that off the event loop
+    return await asyncio.to_thread(_collect_metrics)
+
+
+@router.post("/compact-companies")
+async def compact_companies():
+    """Fold the company journal into top_companies.json / company_info.json now."""
+    applied = await asyncio.to_thread(compact_company_store)
+    return {"applied": applied}
+
+
+@router.post("/compact-precomputed")
+async def compact_precomputed():
+    """Fold the pre-computed results journal into full-links-results.json now."""
+    applied = await asyncio.to_thread(compact_precomputed_results)
+    return {"applied": applied}
+
+
+@router.post("/reload-precomputed")
+async def reload_precomputed():
+    """Swap in a regenerated full-links-results.json without a restart."""
+    try:
+        companies = await asyncio.to_thread(reload_precomputed_store)
+    except Exception as e:
+        logger.error(f"Error reloading pre-computed results: {e}")
+        raise HTTPException(status_code=500, detail="Could not reload pre-computed results")
+    return {"companies": companies}
@@ -1,70 +1,147 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
+from pydantic import BaseModel
+import os
+import json
 import logging
 
-from app.utils.file_loader import load_json_file
+from app.services.data_registry import get_company_directory, get_job_title_index
+from app.services.popularity import record_selection, KINDS as POPULARITY_KINDS
+from app.services.suggestions import (
+    suggest, short_prefix_answer, client_index_version, client_index, client_index_popular, FUZZY_BUDGET_MS
+)
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Cache for companies list
-_companies_cache = None
-_company_info_cache = None
+# Browser/CDN cache lifetime for precomputed short-prefix answers; they only
+# change when the data or popularity ranking changes
+AUTOCOMPLETE_MAX_AGE = int(os.getenv("AUTOCOMPLETE_MAX_AGE", "300"))
 
-def get_companies():
-    global _companies_cache
-    if _companies_cache is None:
-        _companies_cache = load_json_file("data/top_companies.json")
-    return _companies_cache
 
-def get_company_info():
-    global _company_info_cache
-    if _company_info_cache is None:
-        try:
-            _company_info_cache = load_json_file("data/company_info.json")
-        except:
-            _company_info_cache = {}
-    return _company_info_cache
+def _short_prefix_response(request: Request, kind: str, q: str) -> Response | None:
+    """Precomputed answer for 1–3 character queries, as a 304 when the client's ETag matches."""
+    hit = short_prefix_answer(kind, q)
+    if hit is None:
+        return None
+    body, etag = hit
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={AUTOCOMPLETE_MAX_AGE}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("/job-title")
-async def autocomplete_job_title(q: str):
-    logger.info(f"Autocomplete request: q='{q}'")
-
+async def autocomplete_job_title(q: str, request: Request):
     try:
-        job_titles = load_json_file("data/job_family.json")
+        cached = _short_prefix_response(request, "job_title", q)
+        if cached:
+            return cached
+        results = suggest("job_title", q)
     except Exception as e:
         logger.error(f"Error loading job_family.json: {e}")
         raise HTTPException(status_code=500, detail="Job title config error")
 
-    query = q.lower()
-    matches = [t for t in job_titles.keys() if query in t.lower()]
-    results = matches[:10]
-
-    logger.info(f"Found {len(matches)} matches, returning {len(results)}")
+    logger.info(f"Autocomplete request: q='{q}', returning {len(results)} job title matches")
     return results
 
 
 @router.get("/company")
-async def autocomplete_company(q: str):
-    logger.info(f"Company autocomplete request: q='{q}'")
-
+async def autocomplete_company(q: str, request: Request):
     try:
-        companies = get_companies()
+        cached = _short_prefix_response(request, "company", q)
+        if cached:
+            return cached
+        # Prefix matches, then contains, then typo matches; popular companies first
+        results = suggest("company", q)
     except Exception as e:
         logger.error(f"Error loading top_companies.json: {e}")
         raise HTTPException(status_code=500, detail="Company config error")
 
-    query = q.lower()
-    # Prioritize matches that start with the query, then contains
-    starts_with = [c for c in companies if c.lower().startswith(query)]
-    contains = [c for c in companies if query in c.lower() and not c.lower().startswith(query)]
-    matches = starts_with + contains
-    results = matches[:10]
-
-    logger.info(f"Found {len(matches)} company matches, returning {len(results)}")
+    logger.info(f"Company autocomplete request: q='{q}', returning {len(results)} matches")
     return results
 
 
+@router.get("/index")
+async def autocomplete_index_manifest():
+    """
+    Current version of the client-side autocomplete index, plus the popular
+    names (indexes into that version's lists). The browser fetches this once
+    per page load, then downloads (or reuses from cache) the immutable
+    versioned document and matches locally.
+    """
+    try:
+        version = client_index_version()
+        popular = client_index_popular(version)
+    except Exception as e:
+        logger.error(f"Error building client autocomplete index: {e}")
+        raise HTTPException(status_code=500, detail="Autocomplete index unavailable")
+
+    return Response(
+        content=json.dumps(
+            {"version": version, "url": f"/api/autocomplete/index/{version}.json", "popular": popular},
+            separators=(',', ':')
+        ),
+        media_type="application/json",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@router.get("/index/{version}.json")
+async def autocomplete_index_document(version: str, request: Request):
+    """
+    Versioned index document: {"companies": [...], "aliases": [[alias, company_idx]],
+    "job_titles": [...]}. Content never changes for a version, so it's cached for a year.
+    """
+    try:
+        document = client_index(version)
+    except Exception as e:
+        logger.error(f"Error building client autocomplete index: {e}")
+        raise HTTPException(status_code=500, detail="Autocomplete index unavailable")
+    if document is None:
+        raise HTTPException(status_code=404, detail="Unknown index version")
+
+    body, compressed = document
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": f'"{version}"',
+        "Vary": "Accept-Encoding",
+    }
+    if request.headers.get("if-none-match") == f'"{version}"':
+        return Response(status_code=304, headers=headers)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(content=compressed, media_type="application/json",
+                        headers={**headers, "Content-Encoding": "gzip"})
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+class SelectionEvent(BaseModel):
+    kind: str
+    value: str
+
+
+@router.post("/select", status_code=204)
+async def record_autocomplete_selection(event: SelectionEvent):
+    """
+    Record that the user picked a suggestion (feeds popularity ranking).
+    Only known companies/titles are counted.
+    """
+    if event.kind not in POPULARITY_KINDS:
+        raise HTTPException(status_code=400, detail=f"Invalid kind. Use one of: {', '.join(POPULARITY_KINDS)}")
+
+    try:
+        if event.kind == "company":
+            name = get_company_directory().lookup(event.value)
+        else:
+            name = get_job_title_index().lookup(event.value)
+    except Exception as e:
+        logger.error(f"Error loading autocomplete data: {e}")
+        name = None
+
+    if name:
+        record_selection(event.kind, name)
+    return Response(status_code=204)
+
+
 @router.get("/company-confirm")
 async def confirm_company(q: str):
     """
@@ -74,98 +151,72 @@ async def confirm_company(q: str):
     logger.info(f"Company confirmation request: q='{q}'")
 
     try:
-        companies = get_companies()
-        company_info = get_company_info()
+        directory = get_company_directory()
     except Exception as e:
         logger.error(f"Error loading company data: {e}")
         raise HTTPException(status_code=500, detail="Company config error")
 
     query = q.strip()
     query_lower = query.lower()
-    query_upper = query.upper()
 
     # Helper to get company details
     def get_details(company_name):
-        info = company_info.get(company_name, {})
+        info = directory.info(company_name)
         return {
             "full_name": info.get("full_name"),
             "description": info.get("description")
         }
 
     # Check for exact match (case-insensitive)
-    exact_match = None
+    exact_match = directory.lookup(query)
     exact_match_details = None
     exact_match_info = None
-    for c in companies:
-        if c.lower() == query_lower:
-            exact_match = c
-            exact_match_details = get_details(c)
-            exact_match_info = company_info.get(c, {})
-            break
-
-    # Find similar matches
+    if exact_match:
+        exact_match_details = get_details(exact_match)
+        exact_match_info = directory.info(exact_match)
+
+    # Find similar matches (in top_companies.json order)
     # 1. Starts with query
-    starts_with = [c for c in companies if c.lower().startswith(query_lower) and c.lower() != query_lower]
+    starts_with = directory.names_starting_with(query_lower, limit=5, exclude={exact_match})
 
     # 2. Contains query (but doesn't start with)
-    contains = [c for c in companies if query_lower in c.lower() and not c.lower().startswith(query_lower)]
+    contains = directory.names_containing(query_lower, limit=3)
 
     # 3. Query might be an acronym - check if it matches initials of any company
     # Works with uppercase (IBM), mixed case (PwC), or lowercase (ibm)
     acronym_matches = []
     if len(query) <= 6:
-        for c in companies:
-            # Get initials (first letter of each word)
-            words = c.replace('&', ' ').replace('-', ' ').split()
-            initials = ''.join(word[0].upper() for word in words if word)
-            if initials == query_upper and c.lower() != query_lower:
-                acronym_matches.append(c)
+        acronym_matches = [c for c in directory.by_acronym(query) if c.lower() != query_lower]
 
     # 4. Get explicitly related companies from company_info
     related_matches = []
 
-    # First, check if exact match has explicit related companies
+    # First, check if exact match has explicit related companies (and also_known_as)
     if exact_match_info:
-        explicit_related = exact_match_info.get("related", [])
-        for rel in explicit_related:
-            # Find in companies list (case-insensitive)
-            for c in companies:
-                if c.lower() == rel.lower() and c not in related_matches:
-                    related_matches.append(c)
-                    break
-
-        # Also check also_known_as
-        also_known = exact_match_info.get("also_known_as", [])
-        for aka in also_known:
-            for c in companies:
-                if c.lower() == aka.lower() and c not in related_matches:
-                    related_matches.append(c)
-                    break
-
-    # Also check company_info for companies that list query in their related or also_known_as
-    for company_name, info in company_info.items():
-        if company_name.lower() == query_lower:
-            continue
-        # Check if query appears in this company's related or also_known_as
-        related_list = info.get("related", [])
-        aka_list = info.get("also_known_as", [])
-        if query in related_list or query in aka_list:
-            # Find company in our list
-            for c in companies:
-                if c.lower() == company_name.lower() and c not in related_matches:
-                    related_matches.append(c)
-                    break
-
-    # 5. Fuzzy matches - words from query appear in company name
-    query_words = set(query_lower.split())
-    fuzzy_matches = []
-    if len(query_words) > 1:
-        for c in companies:
-            c_lower = c.lower()
-            if c_lower != query_lower and not c_lower.startswith(query_lower) and query_lower not in c_lower:
-                c_words = set(c_lower.replace('&', ' ').replace('-', ' ').split())
-                if query_words & c_words:  # If any words match
-                    fuzzy_matches.append(c)
+        for rel in exact_match_info.get("related", []) + exact_match_info.get("also_known_as", []):
+            c = directory.lookup(rel)
+            if c and c not in related_matches:
+                related_matches.append(c)
+
+    # Also include companies that list the query in their related or also_known_as
+    for c in directory.listed_by(query):
+        if c.lower() != query_lower and c not in related_matches:
+            related_matches.append(c)
+
+    # 5. Probable misspellings (only when nothing matches the query as typed)
+    typo_matches = []
+    if exact_match is None and not starts_with and not contains and not related_matches:
+        for name, distance in directory.fuzzy.search(
+            query, limit=3, prefix=True, budget_ms=FUZZY_BUDGET_MS, exclude=set(starts_with) | set(contains)
+        ):
+            # Distance 0 is an alias spelled right (up to case/punctuation), not a typo
+            if distance == 0:
+                related_matches.append(name)
+            else:
+                typo_matches.append(name)
+
+    # 6. Fuzzy matches - words from query appear in company name
+    fuzzy_matches = directory.word_matches(query, limit=2)
 
     # Combine suggestions (remove duplicates, limit count)
     seen = set()
@@ -183,6 +234,18 @@ async def confirm_company(q: str):
             })
             seen.add(c)
 
+    # Add likely misspellings next — usually what the user meant
+    for c in typo_matches:
+        if c not in seen:
+            details = get_details(c)
+            suggestions.append({
+                "name": c,
+                "reason": "typo",
+                "full_name": details["full_name"],
+                "description": details["description"]
+            })
+            seen.add(c)
+
     # Add related matches (from company_info cross-references)
     for c in related_matches[:3]:
         if c not in seen:
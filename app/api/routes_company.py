@@ -1,53 +1,154 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException
 import logging
 import asyncio
-import httpx
 import json
+import re
 import time
 import logging
+from urllib.parse import urlsplit
 
 
 from app.services.domain_identifier import identify_company_domain
 from app.services.brave_search import brave_search, brave_search_videos
-from app.services.company_enrichment import is_known_company, sync_enrich_and_save_company
-from app.services.precomputed_results import get_precomputed_company_info
+from app.services.company_enrichment import is_known_company
+from app.services.enrichment_queue import enqueue_enrichment
+from app.services.company_overview import build_company_overview
 from app.models.company_info import CompanyInfoResult
 from app.utils.link_formatting import format_link_for_display
 from app.utils.trusted_domains import filter_to_trusted_domains, filter_blacklisted, deduplicate_by_domain, filter_by_company_name_in_title
 from app.utils.link_scoring import score_and_filter_links, score_link, DEFAULT_THRESHOLD
 from app.utils import *
-from app.utils.company_queries import build_company_overview_queries
-from app.utils.company_link_selection import select_top_link_per_category, order_by_priority
-from app.utils.youtube_resolver import resolve_youtube_channel_to_video
+from app.utils.youtube_resolver import resolve_youtube_links
 from app.utils.domain_overrides import get_domain_override
-from app.utils.salary_queries import build_salary_benefits_queries
+from app.utils.salary_queries import build_salary_benefits_queries, COMPANY_BENEFIT_CATEGORIES
 from app.utils.salary_link_selection import select_top_salary_link_per_category, order_salary_by_priority
-from app.utils.link_checker import filter_dead_links
+from app.utils.llm_cache import make_llm_cache_key, get_llm_cached, set_llm_cached
+from app.utils.link_ranker import rank_links, log_link_selection
+from app.services.llm_client import complete_json
+from app.services.popularity import record_search
+from app.services.data_registry import get_company_directory, get_job_title_index, get_precomputed_store
 
 
 import os
 
 BRAVE_API_KEY = os.getenv("BRAVE_API_KEY")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-
-
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Link selection engine per endpoint: "gpt" (default) or "local" (learned ranker).
+# Can be overridden per request with ?engine=local|gpt
+LINK_ENGINES = ("gpt", "local")
+
+
+def _link_engine_setting(env_var: str, default: str) -> str:
+    """Engine from the environment; an unknown value is logged and replaced by `default`."""
+    value = os.getenv(env_var, default).lower().strip()
+    if value not in LINK_ENGINES:
+        logger.error(f"Invalid {env_var}={value!r} (expected one of: {', '.join(LINK_ENGINES)}); using '{default}'")
+        return default
+    return value
+
+
+_DEFAULT_LINK_ENGINE = _link_engine_setting("LINK_ENGINE", "gpt")
+REVIEWS_LINK_ENGINE = _link_engine_setting("REVIEWS_LINK_ENGINE", _DEFAULT_LINK_ENGINE)
+INTERVIEW_LINK_ENGINE = _link_engine_setting("INTERVIEW_LINK_ENGINE", _DEFAULT_LINK_ENGINE)
+
+# Bump a selector's version whenever its prompt changes so the LLM response
+# cache doesn't serve selections made with the old prompt.
+_PROMPT_VERSIONS = {
+    'company_links': 2,
+    'salary_links': 2,
+    'review_links': 2,
+    'interview_links': 2,
+}
+
+_COMPANY_LINK_CATEGORIES = ["About & Mission", "Culture & Values", "Leadership", "Social Media", "Company Overview"]
+_SALARY_LINK_CATEGORIES = ["Salary Data", "Benefits & Perks", "Employee Reviews", "Compensation Overview"]
+_REVIEW_LINK_CATEGORIES = ["Company News", "Culture & Work Environment", "Career Development"]
+_INTERVIEW_LINK_CATEGORIES = ["Company Interview Questions", "Tech Stack & Tools", "Technical Skills", "General Prep"]
+
+# Candidate table field limits (characters) for the selection prompts
+_PAGE_MAX_CHARS = 60
+_TITLE_MAX_CHARS = 90
+_DESCRIPTION_MAX_CHARS = 140
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    text = re.sub(r'<[^>]+>', '', text or '')
+    text = ' '.join(text.replace('|', '/').split())
+    return text if len(text) <= max_chars else text[:max_chars - 1] + '…'
+
+
+def _format_candidate_table(links: list[dict]) -> str:
+    """
+    Compact numbered table of candidates for the selection prompts:
+    one line per link, "id | host/path | title | description", with truncated fields.
+    The model answers with ids only, which _map_selected_ids maps back.
+    """
+    lines = []
+    for i, link in enumerate(links):
+        parts = urlsplit(link.get('url', ''))
+        page = parts.netloc.lower().removeprefix('www.') + parts.path.rstrip('/')
+        lines.append(
+            f"{i} | {_truncate(page, _PAGE_MAX_CHARS)} | "
+            f"{_truncate(link.get('title', ''), _TITLE_MAX_CHARS)} | "
+            f"{_truncate(link.get('description', ''), _DESCRIPTION_MAX_CHARS)}"
+        )
+    return '\n'.join(lines)
+
+
+def _map_selected_ids(selection, all_links: list[dict], categories: list[str], default_category) -> list[dict]:
+    """
+    Map the model's [{"id": n, "category": "..."}] answer back onto the original
+    link dicts. Unknown/duplicate ids are dropped, so URLs can never be hallucinated.
+    Categories outside `categories` fall back to `default_category`
+    (a string, or a callable taking the link).
+    """
+    if not isinstance(selection, list):
+        return []
+
+    selected = []
+    seen = set()
+    for item in selection:
+        raw_id = item.get('id') if isinstance(item, dict) else item
+        try:
+            idx = int(raw_id)
+        except (TypeError, ValueError):
+            continue
+        if idx < 0 or idx >= len(all_links) or idx in seen:
+            continue
+        seen.add(idx)
+
+        link = all_links[idx]
+        category = item.get('category') if isinstance(item, dict) else None
+        if category not in categories:
+            category = default_category(link) if callable(default_category) else default_category
+        selected.append({**link, 'category': category})
+
+    return selected
+
 
 async def select_best_links_with_gpt(
     company: str,
     all_links: list[dict],
-    OPENAI_API_KEY: str,
     max_links: int = 5
 ) -> list[dict]:
     """
-    Use gpt-3.5-turbo to select the most relevant company information links.
+    Use the LLM (gpt-3.5-turbo, Anthropic fallback via llm_client) to select the most relevant company information links.
     """
     
     if not all_links:
         return []
+
+    # Identical candidate sets are only ever ranked once
+    llm_cache_key = make_llm_cache_key(
+        'company_links', _PROMPT_VERSIONS['company_links'], company, all_links, {'max_links': max_links}
+    )
+    cached_selection = await asyncio.to_thread(get_llm_cached, llm_cache_key)
+    if cached_selection:
+        logger.info(f"LLM cache hit for company_links ({company})")
+        return cached_selection[:max_links]
     
     prompt = f"""You are analyzing search results about {company} to find the most valuable links for someone researching the company.
 
@@ -67,67 +168,37 @@ AVOID:
 - Individual employee LinkedIn profiles
 - Blog posts unless they're about company mission/values
 
-Available links:
-{json.dumps(all_links, indent=2)}
+Candidates (id | page | title | description):
+{_format_candidate_table(all_links)}
 
 YOU MUST RESPOND WITH ONLY VALID JSON. NO MARKDOWN. NO CODE BLOCKS. NO EXPLANATIONS.
 
-Return a JSON array with exactly {max_links} objects:
+Return a JSON array with exactly {max_links} objects, referencing candidates by id:
 [
-  {{
-    "url": "full URL",
-    "title": "page title",
-    "description": "description",
-    "category": "About & Mission" | "Culture & Values" | "Leadership" | "Social Media" | "Company Overview"
-  }}
+  {{"id": <candidate id>, "category": "About & Mission" | "Culture & Values" | "Leadership" | "Social Media" | "Company Overview"}}
 ]"""
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {OPENAI_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-3.5-turbo",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are a research assistant. You ONLY respond with valid JSON arrays. Never use markdown code blocks."
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "temperature": 0.3,
-                    "max_tokens": 800
-                },
-                timeout=15
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            content = result["choices"][0]["message"]["content"].strip()
-            
-            # Strip markdown if present (some models ignore instructions)
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-            content = content.strip()
-            
-            selected_links = json.loads(content)
+        selection = await complete_json(
+            "company_links",
+            prompt,
+            system="You are a research assistant. You ONLY respond with valid JSON arrays. Never use markdown code blocks.",
+            expect=list,
+            max_tokens=200,
+            temperature=0.3,
+            timeout=15
+        )
+
+        selected_links = _map_selected_ids(selection, all_links, _COMPANY_LINK_CATEGORIES, 'Company Information')
+        
+        # Validate structure
+        if isinstance(selected_links, list) and len(selected_links) > 0:
+            await asyncio.to_thread(set_llm_cached, llm_cache_key, selected_links)
+            return selected_links[:max_links]
+        else:
+            logger.warning("Invalid GPT response structure, using fallback")
+            return fallback_selection(all_links, max_links)
             
-            # Validate structure
-            if isinstance(selected_links, list) and len(selected_links) > 0:
-                return selected_links[:max_links]
-            else:
-                logger.warning("Invalid GPT response structure, using fallback")
-                return fallback_selection(all_links, max_links)
-                
     except Exception as e:
         logger.error(f"GPT selection error: {e}")
         return fallback_selection(all_links, max_links)
@@ -137,16 +208,24 @@ async def select_salary_links_with_gpt(
     company: str,
     job_title: str,
     all_links: list[dict],
-    OPENAI_API_KEY: str,
     max_links: int = 5
 ) -> list[dict]:
     """
-    Use gpt-3.5-turbo to select the most relevant salary and benefits links.
+    Use the LLM (gpt-3.5-turbo, Anthropic fallback via llm_client) to select the most relevant salary and benefits links.
     Customized for compensation data from aggregator sites.
     """
     
     if not all_links:
         return []
+
+    # Identical candidate sets are only ever ranked once
+    llm_cache_key = make_llm_cache_key(
+        'salary_links', _PROMPT_VERSIONS['salary_links'], company, all_links, {'job_title': job_title.lower().strip(), 'max_links': max_links}
+    )
+    cached_selection = await asyncio.to_thread(get_llm_cached, llm_cache_key)
+    if cached_selection:
+        logger.info(f"LLM cache hit for salary_links ({company})")
+        return cached_selection[:max_links]
     
     prompt = f"""You are analyzing search results about {company} compensation and benefits for a {job_title} role.
 
@@ -162,66 +241,36 @@ AVOID:
 - Generic "how to negotiate salary" articles
 - Links without concrete salary or benefits information
 
-Available links:
-{json.dumps(all_links, indent=2)}
+Candidates (id | page | title | description):
+{_format_candidate_table(all_links)}
 
 YOU MUST RESPOND WITH ONLY VALID JSON. NO MARKDOWN. NO CODE BLOCKS. NO EXPLANATIONS.
 
-Return a JSON array with exactly {max_links} objects:
+Return a JSON array with exactly {max_links} objects, referencing candidates by id:
 [
-  {{
-    "url": "full URL",
-    "title": "page title",
-    "description": "description",
-    "category": "Salary Data" | "Benefits & Perks" | "Employee Reviews" | "Compensation Overview"
-  }}
+  {{"id": <candidate id>, "category": "Salary Data" | "Benefits & Perks" | "Employee Reviews" | "Compensation Overview"}}
 ]"""
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {OPENAI_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-3.5-turbo",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are a compensation research assistant. You ONLY respond with valid JSON arrays. Never use markdown code blocks."
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "temperature": 0.3,
-                    "max_tokens": 800
-                },
-                timeout=15
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            content = result["choices"][0]["message"]["content"].strip()
-            
-            # Strip markdown if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-            content = content.strip()
-            
-            selected_links = json.loads(content)
+        selection = await complete_json(
+            "salary_links",
+            prompt,
+            system="You are a compensation research assistant. You ONLY respond with valid JSON arrays. Never use markdown code blocks.",
+            expect=list,
+            max_tokens=200,
+            temperature=0.3,
+            timeout=15
+        )
+
+        selected_links = _map_selected_ids(selection, all_links, _SALARY_LINK_CATEGORIES, 'Compensation Overview')
+        
+        if isinstance(selected_links, list) and len(selected_links) > 0:
+            await asyncio.to_thread(set_llm_cached, llm_cache_key, selected_links)
+            return selected_links[:max_links]
+        else:
+            logger.warning("Invalid GPT response structure, using fallback")
+            return fallback_selection(all_links, max_links)
             
-            if isinstance(selected_links, list) and len(selected_links) > 0:
-                return selected_links[:max_links]
-            else:
-                logger.warning("Invalid GPT response structure, using fallback")
-                return fallback_selection(all_links, max_links)
-                
     except Exception as e:
         logger.error(f"GPT selection error for salary/benefits: {e}")
         return fallback_selection(all_links, max_links)
@@ -230,15 +279,23 @@ Return a JSON array with exactly {max_links} objects:
 async def select_review_links_with_gpt(
     company: str,
     all_links: list[dict],
-    OPENAI_API_KEY: str,
     max_links: int = 6
 ) -> list[dict]:
     """
-    Use gpt-3.5-turbo to select 6 company review links (2 per category).
+    Use the LLM (gpt-3.5-turbo, Anthropic fallback via llm_client) to select 6 company review links (2 per category).
     """
     
     if not all_links:
         return []
+
+    # Identical candidate sets are only ever ranked once
+    llm_cache_key = make_llm_cache_key(
+        'review_links', _PROMPT_VERSIONS['review_links'], company, all_links, {'max_links': max_links}
+    )
+    cached_selection = await asyncio.to_thread(get_llm_cached, llm_cache_key)
+    if cached_selection:
+        logger.info(f"LLM cache hit for review_links ({company})")
+        return cached_selection[:max_links]
     
     prompt = f"""You are analyzing search results about {company} to find insights on company news, culture, and career development.
 
@@ -274,66 +331,40 @@ AVOID:
 - Old news (pre-2023)
 - Generic articles without specific insights
 
-Available links:
-{json.dumps(all_links, indent=2)}
+Candidates (id | page | title | description):
+{_format_candidate_table(all_links)}
 
 YOU MUST RESPOND WITH ONLY VALID JSON. NO MARKDOWN. NO CODE BLOCKS. NO EXPLANATIONS.
 
-Return a JSON array with exactly {max_links} objects (2 per category):
+Return a JSON array with exactly {max_links} objects (2 per category), referencing candidates by id:
 [
-  {{
-    "url": "full URL",
-    "title": "page title",
-    "description": "description",
-    "category": "Company News" | "Culture & Work Environment" | "Career Development"
-  }}
+  {{"id": <candidate id>, "category": "Company News" | "Culture & Work Environment" | "Career Development"}}
 ]"""
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {OPENAI_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-3.5-turbo",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are a company research assistant. You ONLY respond with valid JSON arrays. Never use markdown code blocks. Select EXACTLY 2 links per category."
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "temperature": 0.3,
-                    "max_tokens": 800
-                },
-                timeout=15
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            content = result["choices"][0]["message"]["content"].strip()
-            
-            # Strip markdown if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-            content = content.strip()
-            
-            selected_links = json.loads(content)
+        selection = await complete_json(
+            "review_links",
+            prompt,
+            system="You are a company research assistant. You ONLY respond with valid JSON arrays. Never use markdown code blocks. Select EXACTLY 2 links per category.",
+            expect=list,
+            max_tokens=200,
+            temperature=0.3,
+            timeout=15
+        )
+
+        selected_links = _map_selected_ids(
+            selection, all_links, _REVIEW_LINK_CATEGORIES,
+            lambda link: _rule_based_review_category(link.get('url', ''), link.get('title', ''))
+        )
+        
+        if isinstance(selected_links, list) and len(selected_links) > 0:
+            await asyncio.to_thread(set_llm_cached, llm_cache_key, selected_links)
+            await asyncio.to_thread(log_link_selection, 'reviews', company, all_links, selected_links)
+            return selected_links[:max_links]
+        else:
+            logger.warning("Invalid GPT response structure, using fallback")
+            return fallback_selection(all_links, max_links)
             
-            if isinstance(selected_links, list) and len(selected_links) > 0:
-                return selected_links[:max_links]
-            else:
-                logger.warning("Invalid GPT response structure, using fallback")
-                return fallback_selection(all_links, max_links)
-                
     except Exception as e:
         logger.error(f"GPT selection error for company reviews: {e}")
         return rule_based_review_selection(all_links, max_links)
@@ -343,15 +374,23 @@ async def select_interview_prep_links_with_gpt(
     company: str,
     job_title: str,
     all_links: list[dict],
-    OPENAI_API_KEY: str,
     max_links: int = 6
 ) -> list[dict]:
     """
-    Use gpt-3.5-turbo to select interview prep links with priority order.
+    Use the LLM (gpt-3.5-turbo, Anthropic fallback via llm_client) to select interview prep links with priority order.
     """
     
     if not all_links:
         return []
+
+    # Identical candidate sets are only ever ranked once
+    llm_cache_key = make_llm_cache_key(
+        'interview_links', _PROMPT_VERSIONS['interview_links'], company, all_links, {'job_title': job_title.lower().strip(), 'max_links': max_links}
+    )
+    cached_selection = await asyncio.to_thread(get_llm_cached, llm_cache_key)
+    if cached_selection:
+        logger.info(f"LLM cache hit for interview_links ({company})")
+        return cached_selection[:max_links]
     
     prompt = f"""You are analyzing search results to find interview preparation resources for a {job_title} role at {company}.
 
@@ -393,71 +432,55 @@ AVOID:
 
 IMPORTANT: Return 4-6 links. Quality over quantity - don't force links if good content isn't available.
 
-Available links:
-{json.dumps(all_links, indent=2)}
+Candidates (id | page | title | description):
+{_format_candidate_table(all_links)}
 
 YOU MUST RESPOND WITH ONLY VALID JSON. NO MARKDOWN. NO CODE BLOCKS. NO EXPLANATIONS.
 
-Return a JSON array with 4-6 objects:
+Return a JSON array with 4-6 objects, referencing candidates by id:
 [
-  {{
-    "url": "full URL",
-    "title": "page title",
-    "description": "description",
-    "category": "Company Interview Questions" | "Tech Stack & Tools" | "Technical Skills" | "General Prep"
-  }}
+  {{"id": <candidate id>, "category": "Company Interview Questions" | "Tech Stack & Tools" | "Technical Skills" | "General Prep"}}
 ]"""
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {OPENAI_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-3.5-turbo",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are an interview preparation research assistant. You ONLY respond with valid JSON arrays. Never use markdown code blocks. Prioritize quality over quantity."
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "temperature": 0.3,
-                    "max_tokens": 800
-                },
-                timeout=15
-            )
-            response.raise_for_status()
-            
-            result = response.json()
-            content = result["choices"][0]["message"]["content"].strip()
-            
-            # Strip markdown if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-            content = content.strip()
-            
-            selected_links = json.loads(content)
+        selection = await complete_json(
+            "interview_links",
+            prompt,
+            system="You are an interview preparation research assistant. You ONLY respond with valid JSON arrays. Never use markdown code blocks. Prioritize quality over quantity.",
+            expect=list,
+            max_tokens=200,
+            temperature=0.3,
+            timeout=15
+        )
+
+        selected_links = _map_selected_ids(
+            selection, all_links, _INTERVIEW_LINK_CATEGORIES,
+            lambda link: _rule_based_interview_category(link.get('url', ''), link.get('title', ''))
+        )
+        
+        if isinstance(selected_links, list) and len(selected_links) > 0:
+            await asyncio.to_thread(set_llm_cached, llm_cache_key, selected_links)
+            await asyncio.to_thread(log_link_selection, 'interview', company, all_links, selected_links)
+            return selected_links[:max_links]
+        else:
+            logger.warning("Invalid GPT response structure, using fallback")
+            return fallback_selection(all_links, max_links)
             
-            if isinstance(selected_links, list) and len(selected_links) > 0:
-                return selected_links[:max_links]
-            else:
-                logger.warning("Invalid GPT response structure, using fallback")
-                return fallback_selection(all_links, max_links)
-                
     except Exception as e:
         logger.error(f"GPT selection error for interview prep: {e}")
         return rule_based_interview_selection(all_links, max_links)
 
 
+def _resolve_link_engine(engine: str | None, default: str) -> str:
+    """Validate the ?engine= override, falling back to the endpoint default (validated at import)."""
+    if not engine:
+        return default
+    selected = engine.lower().strip()
+    if selected not in LINK_ENGINES:
+        raise HTTPException(status_code=400, detail=f"engine must be one of: {', '.join(LINK_ENGINES)}")
+    return selected
+
+
 def fallback_selection(all_links: list[dict], max_links: int) -> list[dict]:
     """Simple rule-based fallback if GPT fails."""
     scored = []
@@ -544,11 +567,38 @@ def rule_based_interview_selection(all_links: list[dict], max_links: int = 6) ->
     return result[:max_links]
 
 
+def _precomputed_section(section: dict | None, engine: str, max_links: int) -> dict | None:
+    """Response fields from a pre-computed reviews/interview-prep section, if it fits the request."""
+    if not section or section["engine"] != engine or max_links > section["max_links"]:
+        return None
+    return {
+        "links": section["links"][:max_links],
+        "all_links": section["all_links"],
+        "total_found": section["total_found"],
+        "threshold": DEFAULT_THRESHOLD,
+        "engine": engine,
+        "source": "precomputed"
+    }
+
+
+def _record_search(company: str, job_title: str) -> None:
+    """Count the search for autocomplete popularity (known companies/titles only)."""
+    try:
+        name = get_company_directory().lookup(company)
+        title = get_job_title_index().lookup(job_title)
+    except Exception as e:
+        logger.warning(f"Could not record search popularity: {e}")
+        return
+    if name:
+        record_search("company", name)
+    if title:
+        record_search("job_title", title)
+
+
 @router.get("/company-info", response_model=dict)
 async def get_company_info(
     company: str,
     job_title: str,
-    background_tasks: BackgroundTasks,
     location: str = None,
     state: str = None,
     city: str = None,
@@ -591,6 +641,8 @@ async def get_company_info(
 
     logger.info(f"Location params received: state={state}, city={city}, zipcode={zipcode} -> location_str={location_str}")
 
+    _record_search(company, job_title)
+
     cache_params = {
         'company': company.lower().strip(),
         'job_title': job_title.lower().strip(),
@@ -610,138 +662,44 @@ async def get_company_info(
     logger.info(f"Company info request: company='{company}', job_title='{job_title}', location='{location_str}'")
 
     # Check pre-computed results first (fast path) — skipped when no_cache=True
-    precomputed = None if no_cache else get_precomputed_company_info(company)
-    if precomputed and precomputed.get("links"):
+    precomputed = None if no_cache else get_precomputed_store().get(company)
+    if precomputed and precomputed["links"]:
+        links = precomputed["links"]
+        if precomputed["has_youtube"]:
+            # Resolve YouTube channel URLs to actual video watch URLs (cached, concurrent)
+            links = [format_link_for_display(link) for link in await resolve_youtube_links(links)]
+
         elapsed = time.time() - start_time
         logger.info(f"Using pre-computed results for '{company}' - returned in {elapsed:.2f}s")
 
-        # Resolve any YouTube channel URLs to actual video watch URLs
-        resolved_links = []
-        for link in precomputed["links"]:
-            if link.get("type") == "video" and "youtube.com" in link.get("url", ""):
-                link = await resolve_youtube_channel_to_video(link)
-            resolved_links.append(link)
-
-        # Format links for display
-        formatted_links = [format_link_for_display(link) for link in resolved_links]
-
-        result = {
-            "domain": precomputed.get("domain"),
-            "links": formatted_links,
-            "all_links": formatted_links,
-            "total_found": len(formatted_links),
+        # Not put in the response cache: the lookup is already O(1), and a
+        # reloaded results file must take effect immediately
+        return {
+            "domain": precomputed["domain"],
+            "links": links,
+            "all_links": links,
+            "total_found": len(links),
             "source": "precomputed"
         }
 
-        # Cache the result
-        if not no_cache:
-            set_cached('company_info', cache_params, result, ttl=SEVEN_DAYS)
-
-        return result
-
-    # Trigger background enrichment if company not in database
-    if not is_known_company(company):
-        logger.info(f"New company detected: '{company}' - triggering background enrichment")
-        background_tasks.add_task(sync_enrich_and_save_company, company)
-
-    # PASS 1: Identify company domain (with override check)
-    domain_override = get_domain_override(company)
-    
-    if domain_override:
-        domain = domain_override
-        logger.info(f"Using domain override: {domain}")
-    else:
-        domain = await identify_company_domain(company, BRAVE_API_KEY)
-        if not domain:
-            return {
-                "domain": None,
-                "links": [],
-                "error": "Could not identify company domain"
-            }
-        logger.info(f"Identified domain: {domain}")
-
-    # PASS 2: Build category-specific queries
-    queries = build_company_overview_queries(company, domain, job_title, location_str)
-    logger.info(f"Built {len(queries)} category-specific queries")
-
-    # PASS 3: Execute searches in parallel
-    search_start = time.time()
-
-    # Build tasks for parallel execution
-    tasks = []
-    task_categories = []
-
-    for category, query in queries.items():
-        tasks.append(brave_search(query, BRAVE_API_KEY, category))
-        task_categories.append(category)
-
-    # Execute all searches in parallel
-    results_list = await asyncio.gather(*tasks, return_exceptions=True)
-
-    search_elapsed = time.time() - search_start
-    logger.info(f"Brave searches took {search_elapsed:.2f}s")
-
-    # PASS 4: Organize results by category
-    search_results = {}
-    for category, result_data in zip(task_categories, results_list):
-        if isinstance(result_data, Exception):
-            logger.error(f"Error in category '{category}': {result_data}")
-            search_results[category] = []
-        else:
-            search_results[category] = result_data
-
-    logger.info(f"Got results for {len([c for c, r in search_results.items() if r])} categories")
-
-    # PASS 5: Select top link per category
-    # Order: home, about, social, community, video_or_vertical
-    categorized_links = select_top_link_per_category(search_results, company_name=company, company_domain=domain)
-    logger.info(f"Selected {len(categorized_links)} links (1 per category, filtered by company name in title)")
-
-    # PASS 5.5: Resolve YouTube channel URLs to actual video URLs
-    if "video_or_vertical" in categorized_links:
-        video_slot = categorized_links["video_or_vertical"]
-        if video_slot.get("type") == "video":
-            categorized_links["video_or_vertical"] = await resolve_youtube_channel_to_video(video_slot)
-
-    # PASS 6: Order by priority
-    ordered_links = order_by_priority(categorized_links)
-
-    # PASS 6.5: Deduplicate by URL
-    seen_urls = set()
-    deduped_links = []
-
-    for link in ordered_links:
-        url = link.get('url', '')
-        if url and url not in seen_urls:
-            seen_urls.add(url)
-            deduped_links.append(link)
-        else:
-            logger.info(f"Duplicate URL filtered: {url}")
-
-    logger.info(f"After deduplication: {len(deduped_links)} links (removed {len(ordered_links) - len(deduped_links)} duplicates)")
+    is_new = not is_known_company(company)
 
-    # PASS 7: Drop confirmed dead links (404/410) — parallel HEAD checks, short timeout
-    live_links = await filter_dead_links(deduped_links)
-    logger.info(f"After 404 check: {len(live_links)} live links (dropped {len(deduped_links) - len(live_links)})")
+    result = await build_company_overview(company, job_title, location_str)
 
-    # PASS 8: Format titles for display
-    # Links are already curated (1 per category, domain + company-name validated) and
-    # ordered by priority — skip score-based re-sorting which would destroy the order
-    # and the YouTube 85-threshold which would drop curated video links.
-    formatted_links = [format_link_for_display(link) for link in live_links]
+    # Queue enrichment if company not in database; the overview goes along so
+    # pre-computing the company afterwards doesn't rerun the searches
+    if is_new:
+        logger.info(f"New company detected: '{company}' - queueing enrichment")
+        await enqueue_enrichment(company, overview=result)
 
-    result = {
-        "domain": domain,
-        "links": formatted_links,
-        "all_links": formatted_links,
-        "total_found": len(categorized_links),
-    }
+    if "error" in result:
+        return result
 
     if not no_cache:
         set_cached('company_info', cache_params, result, ttl=SEVEN_DAYS)
 
     total_elapsed = time.time() - start_time
-    logger.info(f"Total company_info took {total_elapsed:.2f}s (search: {search_elapsed:.2f}s)")
+    logger.info(f"Total company_info took {total_elapsed:.2f}s")
 
     return result
 
@@ -816,12 +774,20 @@ async def get_salary_benefits(
 
     logger.info(f"Salary/benefits request: company='{company}', job_title='{job_title}', location='{location_str}'")
 
+    # Company-level benefits links may be pre-computed; then only the
+    # job/location-specific categories (salary, equity) are searched live
+    precomputed = None if no_cache else get_precomputed_store().get(company)
+    benefit_links = precomputed["benefits"] if precomputed else []
+
     # PASS 1: Get company domain (needed for site: searches)
     domain_override = get_domain_override(company)
     
     if domain_override:
         domain = domain_override
         logger.info(f"Using domain override: {domain}")
+    elif precomputed and precomputed["domain"]:
+        domain = precomputed["domain"]
+        logger.info(f"Using pre-computed domain: {domain}")
     else:
         domain = await identify_company_domain(company, BRAVE_API_KEY)
         if not domain:
@@ -834,6 +800,9 @@ async def get_salary_benefits(
     
     # PASS 3: Build category-specific queries
     queries = build_salary_benefits_queries(company, domain, job_title, city_state, state_abbr)
+    if benefit_links:
+        queries = {c: q for c, q in queries.items() if c not in COMPANY_BENEFIT_CATEGORIES}
+        logger.info(f"Using {len(benefit_links)} pre-computed benefits links")
     logger.info(f"Built {len(queries)} salary/benefits queries")
     
     # PASS 4: Execute searches in parallel
@@ -863,6 +832,8 @@ async def get_salary_benefits(
     # PASS 6: Select top link per category (no GPT needed)
     # Filter to only links with company name in title for higher relevance
     categorized_links = select_top_salary_link_per_category(search_results, company_name=company)
+    for link in benefit_links:
+        categorized_links.setdefault(link["category_key"], link)
     logger.info(f"Selected {len(categorized_links)} links (1 per category, filtered by company name in title)")
     
     # PASS 7: Order by priority
@@ -918,15 +889,29 @@ async def get_salary_benefits(
 @router.get("/company-reviews", response_model=dict)
 async def get_company_reviews(
     company: str,
-    max_links: int = 6
+    max_links: int = 6,
+    engine: str = None,
+    no_cache: bool = False
 ):
     """
     Get company reviews and insights across news, culture, and career development.
+    engine: "gpt" or "local" link selection (default: REVIEWS_LINK_ENGINE).
+    no_cache skips the pre-computed results and the response cache.
     """
     start_time = time.time()
-    
+    engine = _resolve_link_engine(engine, REVIEWS_LINK_ENGINE)
+
+    # Pre-computed fast path (generated with the default engine and max_links)
+    precomputed = None if no_cache else get_precomputed_store().get(company)
+    fast = _precomputed_section(precomputed["reviews"] if precomputed else None, engine, max_links)
+    if fast:
+        logger.info(f"Using pre-computed reviews for '{company}' - returned in {time.time() - start_time:.2f}s")
+        return {"company": company, **fast}
+
     cache_params = {'company': company.lower().strip()}
-    cached_result = get_cached('company_reviews', cache_params)
+    if engine != "gpt":
+        cache_params['engine'] = engine
+    cached_result = None if no_cache else get_cached('company_reviews', cache_params)
     print(f"cache key: {cache_params}")
     print(f"cache results: {cached_result}")
     if cached_result:
@@ -993,18 +978,23 @@ async def get_company_reviews(
     filter_elapsed = time.time() - filter_start
     logger.info(f"Pre-filtering took {filter_elapsed:.2f}s")
 
-    # PASS 4: Use GPT to select 6 links
+    # PASS 4: Select 6 links (GPT, or the local ranker + category buckets)
     gpt_start = time.time()
 
-    selected_links = await select_review_links_with_gpt(
-        company,
-        deduplicated_links,
-        OPENAI_API_KEY,
-        max_links
-    )
+    if engine == "local":
+        selected_links = rule_based_review_selection(
+            rank_links(deduplicated_links, company, "reviews"),
+            max_links
+        )
+    else:
+        selected_links = await select_review_links_with_gpt(
+            company,
+            deduplicated_links,
+            max_links
+        )
     
     gpt_elapsed = time.time() - gpt_start
-    logger.info(f"GPT selection took {gpt_elapsed:.2f}s")
+    logger.info(f"Link selection ({engine}) took {gpt_elapsed:.2f}s")
 
     # PASS 5: Score and filter links by quality threshold
     filtered_links, all_scored_links = score_and_filter_links(
@@ -1033,13 +1023,15 @@ async def get_company_reviews(
         "links": formatted_links,
         "all_links": all_formatted_links,
         "total_found": len(all_links),
-        "threshold": DEFAULT_THRESHOLD
+        "threshold": DEFAULT_THRESHOLD,
+        "engine": engine
     }
 
-    set_cached('company_reviews', cache_params, result, ttl=SEVEN_DAYS)
+    if not no_cache:
+        set_cached('company_reviews', cache_params, result, ttl=SEVEN_DAYS)
 
     total_elapsed = time.time() - start_time
-    logger.info(f"Total company_reviews took {total_elapsed:.2f}s (search: {search_elapsed:.2f}s, filter: {filter_elapsed:.2f}s, gpt: {gpt_elapsed:.2f}s)")
+    logger.info(f"Total company_reviews took {total_elapsed:.2f}s (search: {search_elapsed:.2f}s, filter: {filter_elapsed:.2f}s, {engine}: {gpt_elapsed:.2f}s)")
     
     return result
 
@@ -1048,17 +1040,33 @@ async def get_company_reviews(
 async def get_interview_prep(
     company: str,
     job_title: str,
-    max_links: int = 6
+    max_links: int = 6,
+    engine: str = None,
+    no_cache: bool = False
 ):
     start_time = time.time()
+    engine = _resolve_link_engine(engine, INTERVIEW_LINK_ENGINE)
     
     # Check cache first
     cache_params = {
         'company': company.lower().strip(),
         'job_title': job_title.lower().strip()
     }
+    if engine != "gpt":
+        cache_params['engine'] = engine
     
-    cached_result = get_cached('interview_prep', cache_params)
+    # Infer job family
+    job_family = infer_job_family(job_title)
+    logger.info(f"Inferred job family: {job_family}")
+
+    # Pre-computed fast path, per (company, job family)
+    precomputed = None if no_cache else get_precomputed_store().get(company)
+    fast = _precomputed_section(precomputed["interview_prep"].get(job_family) if precomputed else None, engine, max_links)
+    if fast:
+        logger.info(f"Using pre-computed interview prep for '{company}' ({job_family}) - returned in {time.time() - start_time:.2f}s")
+        return {"company": company, "job_title": job_title, "job_family": job_family, **fast}
+
+    cached_result = None if no_cache else get_cached('interview_prep', cache_params)
     if cached_result:
         elapsed = time.time() - start_time
         logger.info(f"Cache hit for interview_prep - returned in {elapsed:.2f}s")
@@ -1066,10 +1074,6 @@ async def get_interview_prep(
     
     logger.info(f"Interview prep request: company='{company}', job_title='{job_title}'")
 
-    # Infer job family
-    job_family = infer_job_family(job_title)
-    logger.info(f"Inferred job family: {job_family}")
-
     # Get job family-specific queries
     queries = get_interview_prep_queries(company, job_title, job_family)
     
@@ -1126,19 +1130,24 @@ async def get_interview_prep(
     filter_elapsed = time.time() - filter_start
     logger.info(f"Pre-filtering took {filter_elapsed:.2f}s")
 
-    # PASS 4: Use GPT to select best links (now with much smaller input)
+    # PASS 4: Select best links (GPT, or the local ranker + priority buckets)
     gpt_start = time.time()
 
-    selected_links = await select_interview_prep_links_with_gpt(
-        company,
-        job_title,
-        deduplicated_links,
-        OPENAI_API_KEY,
-        max_links
-    )
+    if engine == "local":
+        selected_links = rule_based_interview_selection(
+            rank_links(deduplicated_links, company, "interview"),
+            max_links
+        )
+    else:
+        selected_links = await select_interview_prep_links_with_gpt(
+            company,
+            job_title,
+            deduplicated_links,
+            max_links
+        )
     
     gpt_elapsed = time.time() - gpt_start
-    logger.info(f"GPT selection took {gpt_elapsed:.2f}s")
+    logger.info(f"Link selection ({engine}) took {gpt_elapsed:.2f}s")
 
     # PASS 5: Score and filter links by quality threshold
     filtered_links, all_scored_links = score_and_filter_links(
@@ -1169,14 +1178,16 @@ async def get_interview_prep(
         "links": formatted_links,
         "all_links": all_formatted_links,
         "total_found": len(all_links),
-        "threshold": DEFAULT_THRESHOLD
+        "threshold": DEFAULT_THRESHOLD,
+        "engine": engine
     }
 
     # Cache for 1 hour
-    set_cached('interview_prep', cache_params, result, ttl=3600)
+    if not no_cache:
+        set_cached('interview_prep', cache_params, result, ttl=3600)
 
     total_elapsed = time.time() - start_time
-    logger.info(f"Total interview_prep took {total_elapsed:.2f}s (search: {search_elapsed:.2f}s, filter: {filter_elapsed:.2f}s, gpt: {gpt_elapsed:.2f}s)")
+    logger.info(f"Total interview_prep took {total_elapsed:.2f}s (search: {search_elapsed:.2f}s, filter: {filter_elapsed:.2f}s, {engine}: {gpt_elapsed:.2f}s)")
 
     return result
 
@@ -1,16 +1,26 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import httpx
-import os
+import asyncio
 import json
+import os
 import re
 import logging
 
+from app.services.llm_client import complete_text, stream_text, llm_available, LLMError
+from app.services.question_cache import (
+    get_cached_questions, set_cached_questions, normalize_job_description, fingerprint
+)
+from app.services.question_bank import get_bank_questions, is_thin_description
+
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
+# Batch generation: max postings per request, and max concurrent LLM calls
+# across all batch requests in this worker
+QUESTION_BATCH_MAX = int(os.getenv("QUESTION_BATCH_MAX", "50"))
+QUESTION_BATCH_CONCURRENCY = int(os.getenv("QUESTION_BATCH_CONCURRENCY", "5"))
+_batch_semaphore = asyncio.Semaphore(QUESTION_BATCH_CONCURRENCY)
 
 _PROMPT_PREFIX = """\
 You are an expert interview coach. Given a job description, generate exactly 5 behavioral and 5 technical/skills interview questions.
@@ -28,8 +38,22 @@ Job Description:
 """
 
 
+QUESTION_MODES = ("auto", "fast", "llm")
+
+
 class QuestionRequest(BaseModel):
-    job_description: str
+    job_description: str = ""
+    job_title: str | None = None
+    # auto: question bank for title-only/short postings, LLM otherwise
+    # fast: question bank only (no LLM call); llm: always generate
+    mode: str = "auto"
+
+
+class BatchQuestionRequest(BaseModel):
+    job_descriptions: list[str]
+
+
+_PLACEHOLDER = "Question not available — please try regenerating."
 
 
 def _parse_response(content: str) -> dict:
@@ -47,75 +71,300 @@ def _parse_response(content: str) -> dict:
     if not isinstance(behavioral, list) or not isinstance(technical, list):
         raise ValueError("Unexpected response structure from AI")
 
-    placeholder = "Question not available — please try regenerating."
-    behavioral = (behavioral + [placeholder] * 5)[:5]
-    technical = (technical + [placeholder] * 5)[:5]
+    behavioral = (behavioral + [_PLACEHOLDER] * 5)[:5]
+    technical = (technical + [_PLACEHOLDER] * 5)[:5]
 
     return {"behavioral": behavioral, "technical": technical}
 
 
-@router.post("/generate-questions")
-async def generate_questions(body: QuestionRequest):
-    jd = body.job_description.strip()
+def _is_complete(questions: dict) -> bool:
+    """True if no section was padded; partial sets aren't worth caching."""
+    return all(_PLACEHOLDER not in questions[section] for section in ("behavioral", "technical"))
+
+
+class _QuestionStreamParser:
+    """
+    Incrementally extracts completed question strings from a streaming
+    {"behavioral": [...], "technical": [...]} response. feed() returns the
+    (section, question) pairs completed by the new chunk; anything outside the
+    two arrays (markdown fences, other keys) is ignored.
+    """
+
+    SECTIONS = ("behavioral", "technical")
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.last_string = None
+        self.section = None
+
+    def feed(self, chunk: str) -> list[tuple[str, str]]:
+        self.buffer += chunk
+        completed = []
+
+        while self.pos < len(self.buffer):
+            ch = self.buffer[self.pos]
+
+            if ch == '"':
+                end = self._string_end(self.pos)
+                if end is None:
+                    break  # wait for the rest of the string
+                try:
+                    value = json.loads(self.buffer[self.pos:end + 1])
+                except json.JSONDecodeError:
+                    value = self.buffer[self.pos + 1:end]
+                if self.section:
+                    completed.append((self.section, value))
+                else:
+                    self.last_string = value
+                self.pos = end + 1
+                continue
+
+            if ch == '[' and self.section is None and self.last_string in self.SECTIONS:
+                self.section = self.last_string
+            elif ch == ']':
+                self.section = None
+                self.last_string = None
+            self.pos += 1
+
+        return completed
+
+    def _string_end(self, start: int) -> int | None:
+        i = start + 1
+        while i < len(self.buffer):
+            if self.buffer[i] == '\\':
+                i += 2
+                continue
+            if self.buffer[i] == '"':
+                return i
+            i += 1
+        return None
+
+
+def _prepare_job_description(body: QuestionRequest) -> str:
+    if body.mode not in QUESTION_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid mode. Use one of: {', '.join(QUESTION_MODES)}")
+
+    jd = body.job_description.strip() or (body.job_title or "").strip()
 
     if not jd:
         raise HTTPException(status_code=400, detail="Please enter a job description.")
 
-    if len(jd) > 8000:
-        jd = jd[:8000]
+    return jd[:8000]
+
+
+def _ndjson(event: dict) -> str:
+    return json.dumps(event, ensure_ascii=False) + "\n"
+
+
+def _bank_questions(body: QuestionRequest, jd: str) -> dict | None:
+    """Pre-generated set for the role when the mode allows it, else None."""
+    if body.mode == "llm" or (body.mode == "auto" and not is_thin_description(jd)):
+        return None
+    questions = get_bank_questions(jd, body.job_title)
+    if questions is None and body.mode == "fast":
+        raise HTTPException(status_code=404, detail="No pre-generated questions for this job title.")
+    return questions
+
+
+@router.post("/generate-questions")
+async def generate_questions(body: QuestionRequest):
+    jd = _prepare_job_description(body)
+
+    # Title-only or generic posting — serve the pre-generated set
+    banked = _bank_questions(body, jd)
+    if banked:
+        return banked
+
+    # Same or near-identical posting seen before — no LLM call
+    cached = await asyncio.to_thread(get_cached_questions, jd)
+    if cached:
+        return cached
+
+    if not llm_available():
+        raise HTTPException(
+            status_code=503,
+            detail="Question generation is not available on this server (no AI API key configured).",
+        )
 
     try:
-        if ANTHROPIC_API_KEY:
-            return await _call_anthropic(jd)
-        elif OPENAI_API_KEY:
-            return await _call_openai(jd)
-        else:
-            raise HTTPException(
-                status_code=503,
-                detail="Question generation is not available on this server (no AI API key configured).",
-            )
-    except HTTPException:
-        raise
-    except httpx.HTTPStatusError as e:
-        logger.error("AI API HTTP error %s: %s", e.response.status_code, e.response.text[:300])
+        questions = await _generate(jd)
+    except LLMError as e:
+        logger.error("AI API error: %s", e)
         raise HTTPException(status_code=502, detail="The AI service returned an error. Please try again.")
     except Exception as e:
         logger.error("Question generation failed: %s", e)
         raise HTTPException(status_code=500, detail="Failed to generate questions. Please try again.")
 
+    if _is_complete(questions):
+        await asyncio.to_thread(set_cached_questions, jd, questions)
+    return questions
+
+
+async def _generate(jd: str) -> dict:
+    """Claude Haiku first, gpt-4o-mini as fallback (via llm_client)."""
+    content = await complete_text(
+        "questions",
+        _PROMPT_PREFIX + jd,
+        providers=("anthropic", "openai"),
+        openai_model="gpt-4o-mini",
+        anthropic_model="claude-haiku-4-5-20251001",
+        max_tokens=1024,
+        temperature=0.7,
+        timeout=30.0,
+        expect=dict,
+    )
+    return _parse_response(content)
+
+
+@router.post("/generate-questions/stream")
+async def generate_questions_stream(body: QuestionRequest):
+    """
+    Streaming variant of /generate-questions. Emits NDJSON events:
+      {"type": "question", "section": "behavioral"|"technical", "index": n, "question": "..."}
+        — as soon as each question is complete
+      {"type": "done", "behavioral": [...], "technical": [...]}
+        — final, padded set (same shape as /generate-questions)
+      {"type": "error", "detail": "..."}
+        — if generation fails after the stream started
+    """
+    jd = _prepare_job_description(body)
 
-async def _call_openai(jd: str) -> dict:
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.post(
-            "https://api.openai.com/v1/chat/completions",
-            headers={"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": "application/json"},
-            json={
-                "model": "gpt-4o-mini",
-                "messages": [{"role": "user", "content": _PROMPT_PREFIX + jd}],
-                "response_format": {"type": "json_object"},
-                "temperature": 0.7,
-            },
+    cached = _bank_questions(body, jd) or await asyncio.to_thread(get_cached_questions, jd)
+    if not cached and not llm_available():
+        raise HTTPException(
+            status_code=503,
+            detail="Question generation is not available on this server (no AI API key configured).",
         )
-        resp.raise_for_status()
-        content = resp.json()["choices"][0]["message"]["content"]
-        return _parse_response(content)
-
-
-async def _call_anthropic(jd: str) -> dict:
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        resp = await client.post(
-            "https://api.anthropic.com/v1/messages",
-            headers={
-                "x-api-key": ANTHROPIC_API_KEY,
-                "anthropic-version": "2023-06-01",
-                "content-type": "application/json",
-            },
-            json={
-                "model": "claude-haiku-4-5-20251001",
-                "max_tokens": 1024,
-                "messages": [{"role": "user", "content": _PROMPT_PREFIX + jd}],
-            },
+
+    async def events():
+        if cached:
+            for section in _QuestionStreamParser.SECTIONS:
+                for i, question in enumerate(cached[section]):
+                    yield _ndjson({"type": "question", "section": section, "index": i, "question": question})
+            yield _ndjson({"type": "done", **cached})
+            return
+
+        parser = _QuestionStreamParser()
+        streamed = {section: [] for section in _QuestionStreamParser.SECTIONS}
+        content = ""
+        try:
+            async for chunk in stream_text(
+                "questions_stream",
+                _PROMPT_PREFIX + jd,
+                providers=("anthropic", "openai"),
+                openai_model="gpt-4o-mini",
+                anthropic_model="claude-haiku-4-5-20251001",
+                max_tokens=1024,
+                temperature=0.7,
+                timeout=30.0,
+                expect=dict,
+            ):
+                content += chunk
+                for section, question in parser.feed(chunk):
+                    if len(streamed[section]) >= 5:
+                        continue
+                    yield _ndjson({
+                        "type": "question",
+                        "section": section,
+                        "index": len(streamed[section]),
+                        "question": question,
+                    })
+                    streamed[section].append(question)
+        except Exception as e:
+            logger.error("Streaming question generation failed: %s", e)
+            yield _ndjson({"type": "error", "detail": "Failed to generate questions. Please try again."})
+            return
+
+        try:
+            questions = _parse_response(content)
+            cacheable = _is_complete(questions)
+        except Exception as e:
+            logger.warning("Could not parse streamed response (%s); using streamed questions", e)
+            questions = _parse_response(json.dumps(streamed))
+            # Whatever was streamed before the response broke off — don't keep it
+            cacheable = False
+
+        if cacheable:
+            await asyncio.to_thread(set_cached_questions, jd, questions)
+        yield _ndjson({"type": "done", **questions})
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@router.post("/generate-questions/batch")
+async def generate_questions_batch(body: BatchQuestionRequest):
+    """
+    Generate questions for many job descriptions in one request.
+    Duplicate/equivalent postings (same normalized text) are generated once,
+    cached postings are served from the question cache, and LLM calls run
+    with bounded concurrency. Without an LLM configured, cached postings are
+    still served and the rest come back as errors. Results stream back as NDJSON in completion order:
+      {"type": "result", "indices": [0, 3], "behavioral": [...], "technical": [...], "cached": bool}
+      {"type": "error", "indices": [...], "detail": "..."}
+      {"type": "done", "total": n, "unique": u, "errors": e}
+    `indices` are positions in the submitted job_descriptions list.
+    """
+    if not body.job_descriptions:
+        raise HTTPException(status_code=400, detail="Please provide at least one job description.")
+    if len(body.job_descriptions) > QUESTION_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {QUESTION_BATCH_MAX} job descriptions per batch.")
+
+    # Group submissions by normalized fingerprint
+    groups: dict[str, dict] = {}
+    invalid = []
+    for i, raw in enumerate(body.job_descriptions):
+        jd = (raw or "").strip()[:8000]
+        normalized = normalize_job_description(jd)
+        if not normalized:
+            invalid.append(i)
+            continue
+        group = groups.setdefault(fingerprint(normalized), {"jd": jd, "indices": []})
+        group["indices"].append(i)
+
+    async def run(group: dict) -> dict:
+        cached = (
+            (is_thin_description(group["jd"]) and get_bank_questions(group["jd"]))
+            or await asyncio.to_thread(get_cached_questions, group["jd"])
         )
-        resp.raise_for_status()
-        content = resp.json()["content"][0]["text"]
-        return _parse_response(content)
+        if cached:
+            return {"type": "result", "indices": group["indices"], **cached, "cached": True}
+        # Only postings that need generating depend on an LLM being configured
+        if not llm_available():
+            return {
+                "type": "error",
+                "indices": group["indices"],
+                "detail": "Question generation is not available on this server (no AI API key configured).",
+            }
+        try:
+            async with _batch_semaphore:
+                questions = await _generate(group["jd"])
+        except Exception as e:
+            logger.error(f"Batch question generation failed: {e}")
+            return {"type": "error", "indices": group["indices"], "detail": "Failed to generate questions."}
+        if _is_complete(questions):
+            await asyncio.to_thread(set_cached_questions, group["jd"], questions)
+        return {"type": "result", "indices": group["indices"], **questions, "cached": False}
+
+    async def events():
+        errors = 0
+        if invalid:
+            errors += 1
+            yield _ndjson({"type": "error", "indices": invalid, "detail": "Empty job description."})
+
+        tasks = [asyncio.create_task(run(group)) for group in groups.values()]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                event = await next_done
+                if event["type"] == "error":
+                    errors += 1
+                yield _ndjson(event)
+        finally:
+            # Client went away — don't keep spending tokens
+            for task in tasks:
+                task.cancel()
+
+        yield _ndjson({"type": "done", "total": len(body.job_descriptions), "unique": len(groups), "errors": errors})
+
+    logger.info(f"Batch question request: {len(body.job_descriptions)} postings, {len(groups)} unique")
+    return StreamingResponse(events(), media_type="application/x-ndjson")
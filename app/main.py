@@ -7,12 +7,18 @@ from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.base import BaseHTTPMiddleware
 
+import asyncio
 import logging
 
 
 from app.api.routes_autocomplete import router as autocomplete_router
 from app.api.routes_company import router as company_router
 from app.api.routes_questions import router as questions_router
+from app.api.routes_admin import router as admin_router
+from app.utils.http_client import close_http_clients
+from app.services.popularity import start_popularity_flusher, stop_popularity_flusher
+from app.services.enrichment_queue import start_enrichment_workers, stop_enrichment_workers
+from app.services.data_registry import load_data_registry
 
 
 logging.basicConfig(
@@ -59,6 +65,16 @@ async def startup_event():
     logger.info("  - /api/company-reviews")
     logger.info("  - /api/interview-prep")
     logger.info("=" * 50)
+    # Company/job-title indexes and pre-computed results, before the first request
+    await asyncio.to_thread(load_data_registry)
+    start_popularity_flusher()
+    start_enrichment_workers()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await stop_enrichment_workers()
+    await stop_popularity_flusher()
+    await close_http_clients()
 
 @app.get("/")
 async def read_root():
@@ -70,4 +86,5 @@ async def read_root():
 
 app.include_router(autocomplete_router, prefix="/api/autocomplete")
 app.include_router(company_router, prefix="/api")
-app.include_router(questions_router, prefix="/api")
\ No newline at end of file
+app.include_router(questions_router, prefix="/api")
+app.include_router(admin_router, prefix="/api/admin")
\ No newline at end of file
@@ -1,7 +1,7 @@
-import httpx
 import logging
 from urllib.parse import urlparse
 
+from app.utils.http_client import get_http_client
 from app.utils.social_utils import is_social_media_url
 
 logger = logging.getLogger(__name__)
@@ -87,38 +87,38 @@ async def brave_search(query: str, api_key: str, category: str = None):
     }
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://api.search.brave.com/res/v1/web/search",
-                headers=headers,
-                params=params,
-                timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            web_results = data.get("web", {}).get("results", [])
-            output = []
-
-            for r in web_results:
-                url = r.get("url", "")
-
-                # Filter out non-English domains
-                if not is_english_domain(url):
-                    logger.debug(f"Filtered non-English URL: {url}")
-                    continue
-
-                # If category is "social", only include social media URLs
-                if category == "social" and not is_social_media_url(url):
-                    continue
-
-                output.append({
-                    "url": url,
-                    "title": r.get("title", ""),
-                    "description": r.get("description", "")
-                })
-
-            return output
+        client = get_http_client()
+        response = await client.get(
+            "https://api.search.brave.com/res/v1/web/search",
+            headers=headers,
+            params=params,
+            timeout=10
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        web_results = data.get("web", {}).get("results", [])
+        output = []
+
+        for r in web_results:
+            url = r.get("url", "")
+
+            # Filter out non-English domains
+            if not is_english_domain(url):
+                logger.debug(f"Filtered non-English URL: {url}")
+                continue
+
+            # If category is "social", only include social media URLs
+            if category == "social" and not is_social_media_url(url):
+                continue
+
+            output.append({
+                "url": url,
+                "title": r.get("title", ""),
+                "description": r.get("description", "")
+            })
+
+        return output
 
     except Exception as e:
         logger.error(f"Brave search error [{category}]: {e}")
@@ -154,45 +154,45 @@ async def brave_search_videos(query: str, api_key: str, count: int = 3):
     }
 
     try:
-        async with httpx.AsyncClient() as client:
-            logger.info(f"Searching videos: {query}")
-
-            response = await client.get(
-                "https://api.search.brave.com/res/v1/videos/search",
-                headers=headers,
-                params=params,
-                timeout=10
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            video_results = data.get("results", [])
-            output = []
-
-            for r in video_results:
-                url = r.get("url", "")
-
-                # Only include YouTube and Vimeo (embeddable platforms)
-                if not ("youtube.com" in url or "youtu.be" in url or "vimeo.com" in url):
-                    continue
-
-                # Filter out non-English video URLs
-                if not is_english_domain(url):
-                    continue
-
-                output.append({
-                    "url": url,
-                    "title": r.get("title", ""),
-                    "description": r.get("description", ""),
-                    "type": "video"  # Flag for frontend detection
-                })
-
-                # Stop once we have enough
-                if len(output) >= count:
-                    break
-
-            logger.info(f"Found {len(output)} embeddable videos (filtered from {len(video_results)} total)")
-            return output
+        client = get_http_client()
+        logger.info(f"Searching videos: {query}")
+
+        response = await client.get(
+            "https://api.search.brave.com/res/v1/videos/search",
+            headers=headers,
+            params=params,
+            timeout=10
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        video_results = data.get("results", [])
+        output = []
+
+        for r in video_results:
+            url = r.get("url", "")
+
+            # Only include YouTube and Vimeo (embeddable platforms)
+            if not ("youtube.com" in url or "youtu.be" in url or "vimeo.com" in url):
+                continue
+
+            # Filter out non-English video URLs
+            if not is_english_domain(url):
+                continue
+
+            output.append({
+                "url": url,
+                "title": r.get("title", ""),
+                "description": r.get("description", ""),
+                "type": "video"  # Flag for frontend detection
+            })
+
+            # Stop once we have enough
+            if len(output) >= count:
+                break
+
+        logger.info(f"Found {len(output)} embeddable videos (filtered from {len(video_results)} total)")
+        return output
 
     except Exception as e:
         logger.error(f"Brave video search error: {e}")
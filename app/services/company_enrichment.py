@@ -5,85 +5,32 @@ When a new company is searched, this service enriches it with:
 - Official domain
 - Description
 - Related companies
-Then appends to company_info.json and top_companies.json
+Then records it in the company store (see company_store).
+Jobs are scheduled and retried through app.services.enrichment_queue.
 """
 
 import asyncio
-import json
 import os
 import logging
 import httpx
-from pathlib import Path
 from typing import Optional
-import filelock
+
+from app.services.llm_client import complete_json, llm_available
+from app.services.data_registry import get_company_directory, register_company
+from app.services.company_store import append_company
 
 logger = logging.getLogger(__name__)
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 BRAVE_API_KEY = os.getenv("BRAVE_API_KEY")
 
-# Track companies currently being enriched to avoid duplicates
-_enrichment_in_progress = set()
-_enrichment_lock = asyncio.Lock()
-
-# File paths
-DATA_DIR = Path("data")
-COMPANY_INFO_PATH = DATA_DIR / "company_info.json"
-TOP_COMPANIES_PATH = DATA_DIR / "top_companies.json"
-
-# File lock for thread-safe writes
-COMPANY_INFO_LOCK = DATA_DIR / ".company_info.lock"
-
-
-def _load_company_info() -> dict:
-    """Load current company_info.json"""
-    try:
-        with open(COMPANY_INFO_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(f"Error loading company_info.json: {e}")
-        return {}
-
-
-def _load_top_companies() -> list:
-    """Load current top_companies.json"""
-    try:
-        with open(TOP_COMPANIES_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(f"Error loading top_companies.json: {e}")
-        return []
 
-
-def _save_company_info(data: dict):
-    """Save company_info.json with file locking"""
-    lock = filelock.FileLock(str(COMPANY_INFO_LOCK), timeout=10)
-    try:
-        with lock:
-            with open(COMPANY_INFO_PATH, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-    except Exception as e:
-        logger.error(f"Error saving company_info.json: {e}")
-
-
-def _save_top_companies(data: list):
-    """Save top_companies.json"""
+def is_known_company(company_name: str) -> bool:
+    """Check if company is already in our database (in-memory, no disk read)"""
     try:
-        with open(TOP_COMPANIES_PATH, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        return get_company_directory().is_known(company_name)
     except Exception as e:
-        logger.error(f"Error saving top_companies.json: {e}")
-
-
-def is_known_company(company_name: str) -> bool:
-    """Check if company is already in our database"""
-    company_info = _load_company_info()
-    company_lower = company_name.lower().strip()
-
-    for known in company_info.keys():
-        if known.lower() == company_lower:
-            return True
-    return False
+        logger.error(f"Error loading company data: {e}")
+        return False
 
 
 async def enrich_company_via_search(company_name: str) -> Optional[dict]:
@@ -172,8 +119,8 @@ async def enrich_company(company_name: str) -> Optional[dict]:
     Use LLM to enrich company data.
     Returns dict with: full_name, description, industry, domain, related
     """
-    if not OPENAI_API_KEY:
-        logger.warning("OPENAI_API_KEY not set, skipping enrichment")
+    if not llm_available():
+        logger.warning("No LLM API key set, skipping enrichment")
         return None
 
     prompt = f"""You are a business analyst. Provide information about this company: "{company_name}"
@@ -191,45 +138,17 @@ If you don't recognize the company, make your best guess based on the name.
 Return ONLY the JSON object, no markdown, no explanation."""
 
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {OPENAI_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "gpt-3.5-turbo",
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are a business data assistant. Return only valid JSON."
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "temperature": 0.3,
-                    "max_tokens": 300
-                },
-                timeout=15
-            )
-            response.raise_for_status()
-
-            result = response.json()
-            content = result["choices"][0]["message"]["content"].strip()
-
-            # Strip markdown if present
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
-            content = content.strip()
-
-            enriched = json.loads(content)
-            logger.info(f"Enriched company '{company_name}': {enriched.get('industry', 'Unknown')}")
-            return enriched
+        enriched = await complete_json(
+            "enrichment",
+            prompt,
+            system="You are a business data assistant. Return only valid JSON.",
+            expect=dict,
+            max_tokens=300,
+            temperature=0.3,
+            timeout=15
+        )
+        logger.info(f"Enriched company '{company_name}': {enriched.get('industry', 'Unknown')}")
+        return enriched
 
     except Exception as e:
         logger.error(f"Error enriching company via LLM '{company_name}': {e}")
@@ -238,80 +157,50 @@ Return ONLY the JSON object, no markdown, no explanation."""
         return await enrich_company_via_search(company_name)
 
 
-async def enrich_and_save_company(company_name: str):
+def build_company_entry(company_name: str, enriched: dict) -> dict:
+    """company_info.json entry from enrichment output"""
+    company_entry = {
+        "full_name": enriched.get("full_name") or company_name,
+        "description": enriched.get("description", ""),
+    }
+
+    # Add optional fields if present
+    if enriched.get("related"):
+        company_entry["related"] = enriched["related"]
+    if enriched.get("industry"):
+        company_entry["industry"] = enriched["industry"]
+    if enriched.get("domain"):
+        company_entry["domain"] = enriched["domain"]
+    return company_entry
+
+
+async def enrich_and_save_company(company_name: str) -> bool:
     """
-    Main entry point: enrich a company and save to JSON files.
-    Handles deduplication and concurrent access.
+    Enrich a company and save it to the JSON files.
+    Returns True if the company is now known (saved, or already there).
+    Called by the enrichment queue workers, which handle deduplication and retries.
     """
     company_name = company_name.strip()
 
     # Skip if already known
     if is_known_company(company_name):
         logger.debug(f"Company '{company_name}' already in database, skipping enrichment")
-        return
+        return True
 
-    # Skip if enrichment already in progress for this company
-    async with _enrichment_lock:
-        if company_name.lower() in _enrichment_in_progress:
-            logger.debug(f"Enrichment already in progress for '{company_name}'")
-            return
-        _enrichment_in_progress.add(company_name.lower())
+    # Enrich via LLM
+    enriched = await enrich_company(company_name)
 
-    try:
-        # Enrich via LLM
-        enriched = await enrich_company(company_name)
-
-        if not enriched:
-            logger.warning(f"Could not enrich company '{company_name}'")
-            return
-
-        # Prepare company info entry
-        company_entry = {
-            "full_name": enriched.get("full_name", company_name),
-            "description": enriched.get("description", ""),
-        }
-
-        # Add optional fields if present
-        if enriched.get("related"):
-            company_entry["related"] = enriched["related"]
-        if enriched.get("industry"):
-            company_entry["industry"] = enriched["industry"]
-        if enriched.get("domain"):
-            company_entry["domain"] = enriched["domain"]
-
-        # Save to company_info.json
-        company_info = _load_company_info()
-        company_info[company_name] = company_entry
-        _save_company_info(company_info)
-
-        # Add to top_companies.json for autocomplete
-        top_companies = _load_top_companies()
-        if company_name not in top_companies:
-            top_companies.append(company_name)
-            top_companies.sort(key=str.lower)
-            _save_top_companies(top_companies)
-
-        logger.info(f"Added new company to database: '{company_name}' ({enriched.get('industry', 'Unknown')})")
-
-    finally:
-        # Remove from in-progress set
-        async with _enrichment_lock:
-            _enrichment_in_progress.discard(company_name.lower())
-
-
-def sync_enrich_and_save_company(company_name: str):
-    """
-    Synchronous wrapper for background task execution.
-    Called by FastAPI BackgroundTasks.
-    """
-    logger.info(f"Background task started for '{company_name}'")
-    try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(enrich_and_save_company(company_name))
-        loop.close()
-        logger.info(f"Background task completed for '{company_name}'")
-    except Exception as e:
-        logger.error(f"Error in background enrichment for '{company_name}': {e}")
-        import traceback
-        traceback.print_exc()
+    if not enriched:
+        logger.warning(f"Could not enrich company '{company_name}'")
+        return False
+
+    company_entry = build_company_entry(company_name, enriched)
+
+    # Append to the company journal (picked up by autocomplete in every worker)
+    await asyncio.to_thread(append_company, company_name, company_entry)
+
+    # Make it searchable in this worker right away
+    await asyncio.to_thread(register_company, company_name)
+
+    logger.info(f"Added new company to database: '{company_name}' ({enriched.get('industry', 'Unknown')})")
+    return True
@@ -0,0 +1,168 @@
+"""
+Company overview links (the live /company-info pipeline).
+
+Identifies the company domain, runs the category queries in parallel, keeps
+the top link per category and drops dead links. Used by the /company-info
+route on a miss and by the enrichment queue to pre-compute newly enriched
+companies (precompute_company_overview), so they join the fast path —
+reusing the overview /company-info already built when there is one.
+The result doesn't depend on job title or location.
+"""
+
+import os
+import time
+import asyncio
+import logging
+
+from app.services.domain_identifier import identify_company_domain
+from app.services.brave_search import brave_search
+from app.services.data_registry import get_company_directory, register_precomputed
+from app.services.precomputed_results import append_precomputed
+from app.utils.company_queries import build_company_overview_queries
+from app.utils.company_link_selection import select_top_link_per_category, order_by_priority
+from app.utils.domain_overrides import get_domain_override
+from app.utils.link_checker import filter_dead_links
+from app.utils.link_formatting import format_link_for_display
+from app.utils.youtube_resolver import resolve_youtube_channel_to_video
+
+logger = logging.getLogger(__name__)
+
+BRAVE_API_KEY = os.getenv("BRAVE_API_KEY")
+
+
+async def build_company_overview(
+    company: str,
+    job_title: str = None,
+    location_str: str = None,
+    domain: str = None
+) -> dict:
+    """
+    Run the overview pipeline for a company.
+    domain: a domain already known for the company (e.g. from enrichment);
+    a domain override still wins, and without either it is looked up.
+    Returns {"domain", "links", "all_links", "total_found"}, or
+    {"domain": None, "links": [], "error": ...} if no domain was found.
+    """
+    # PASS 1: Identify company domain (with override check)
+    domain_override = get_domain_override(company)
+
+    if domain_override:
+        domain = domain_override
+        logger.info(f"Using domain override: {domain}")
+    elif domain:
+        logger.info(f"Using known domain: {domain}")
+    else:
+        domain = await identify_company_domain(company, BRAVE_API_KEY)
+        if not domain:
+            return {
+                "domain": None,
+                "links": [],
+                "error": "Could not identify company domain"
+            }
+        logger.info(f"Identified domain: {domain}")
+
+    # PASS 2: Build category-specific queries
+    queries = build_company_overview_queries(company, domain, job_title, location_str)
+    logger.info(f"Built {len(queries)} category-specific queries")
+
+    # PASS 3: Execute searches in parallel
+    search_start = time.time()
+
+    # Build tasks for parallel execution
+    tasks = []
+    task_categories = []
+
+    for category, query in queries.items():
+        tasks.append(brave_search(query, BRAVE_API_KEY, category))
+        task_categories.append(category)
+
+    # Execute all searches in parallel
+    results_list = await asyncio.gather(*tasks, return_exceptions=True)
+
+    search_elapsed = time.time() - search_start
+    logger.info(f"Brave searches took {search_elapsed:.2f}s")
+
+    # PASS 4: Organize results by category
+    search_results = {}
+    for category, result_data in zip(task_categories, results_list):
+        if isinstance(result_data, Exception):
+            logger.error(f"Error in category '{category}': {result_data}")
+            search_results[category] = []
+        else:
+            search_results[category] = result_data
+
+    logger.info(f"Got results for {len([c for c, r in search_results.items() if r])} categories")
+
+    # PASS 5: Select top link per category
+    # Order: home, about, social, community, video_or_vertical
+    categorized_links = select_top_link_per_category(search_results, company_name=company, company_domain=domain)
+    logger.info(f"Selected {len(categorized_links)} links (1 per category, filtered by company name in title)")
+
+    # PASS 5.5: Resolve YouTube channel URLs to actual video URLs
+    if "video_or_vertical" in categorized_links:
+        video_slot = categorized_links["video_or_vertical"]
+        if video_slot.get("type") == "video":
+            categorized_links["video_or_vertical"] = await resolve_youtube_channel_to_video(video_slot)
+
+    # PASS 6: Order by priority
+    ordered_links = order_by_priority(categorized_links)
+
+    # PASS 6.5: Deduplicate by URL
+    seen_urls = set()
+    deduped_links = []
+
+    for link in ordered_links:
+        url = link.get('url', '')
+        if url and url not in seen_urls:
+            seen_urls.add(url)
+            deduped_links.append(link)
+        else:
+            logger.info(f"Duplicate URL filtered: {url}")
+
+    logger.info(f"After deduplication: {len(deduped_links)} links (removed {len(ordered_links) - len(deduped_links)} duplicates)")
+
+    # PASS 7: Drop confirmed dead links (404/410) — parallel HEAD checks, short timeout
+    live_links = await filter_dead_links(deduped_links)
+    logger.info(f"After 404 check: {len(live_links)} live links (dropped {len(deduped_links) - len(live_links)})")
+
+    # PASS 8: Format titles for display
+    # Links are already curated (1 per category, domain + company-name validated) and
+    # ordered by priority — skip score-based re-sorting which would destroy the order
+    # and the YouTube 85-threshold which would drop curated video links.
+    formatted_links = [format_link_for_display(link) for link in live_links]
+
+    return {
+        "domain": domain,
+        "links": formatted_links,
+        "all_links": formatted_links,
+        "total_found": len(categorized_links),
+    }
+
+
+async def precompute_company_overview(company: str, overview: dict | None = None) -> bool:
+    """
+    Persist a company's overview as a pre-computed result. Returns False if
+    no links were found. Called by the enrichment queue workers after a
+    company is enriched.
+    overview: {"domain", "links"} already built by a live request; without
+    it the pipeline runs here, with the domain enrichment learned.
+    """
+    if not overview or not overview.get("links"):
+        domain = get_company_directory().info(company).get("domain")
+        overview = await build_company_overview(company, domain=domain)
+    else:
+        logger.info(f"Reusing the live overview for '{company}'")
+    if not overview["links"]:
+        logger.warning(f"No overview links to pre-compute for '{company}'")
+        return False
+
+    result = {
+        "domain": overview["domain"],
+        "link_count": len(overview["links"]),
+        "links": overview["links"],
+    }
+    # Journal append (picked up by every worker) + this worker's store right away
+    await asyncio.to_thread(append_precomputed, company, result)
+    register_precomputed(company, result)
+    logger.info(f"Pre-computed overview for '{company}' ({len(overview['links'])} links, domain: {overview['domain']})")
+    return True
@@ -0,0 +1,172 @@
+"""
+Company data store: top_companies.json + company_info.json plus an
+append-only journal of additions/updates.
+
+Enrichment appends one JSON line per company (O(1), under a file lock so
+workers can't interleave) instead of rewriting both files. Readers load the
+canonical files and replay the journal on top (load_company_data). Once the
+journal passes COMPANY_JOURNAL_COMPACT_BYTES, a background thread folds it
+into the canonical files (atomic rename) and truncates it; compaction holds
+the same lock, so no entry can be appended in between and lost.
+"""
+
+import os
+import json
+import logging
+import threading
+import time
+
+import filelock
+
+from app.utils.file_loader import BASE_DIR
+
+logger = logging.getLogger(__name__)
+
+TOP_COMPANIES_FILE = "data/top_companies.json"
+COMPANY_INFO_FILE = "data/company_info.json"
+COMPANY_JOURNAL_FILE = os.getenv("COMPANY_JOURNAL_PATH", "data/company_journal.jsonl")
+COMPANY_JOURNAL_COMPACT_BYTES = int(os.getenv("COMPANY_JOURNAL_COMPACT_BYTES", str(64 * 1024)))
+
+_TOP_COMPANIES_PATH = BASE_DIR / TOP_COMPANIES_FILE
+_COMPANY_INFO_PATH = BASE_DIR / COMPANY_INFO_FILE
+_JOURNAL_PATH = BASE_DIR / COMPANY_JOURNAL_FILE
+_LOCK_PATH = BASE_DIR / "data" / ".company_store.lock"
+
+_compacting = threading.Lock()
+
+
+def _lock(timeout: float = 10) -> filelock.FileLock:
+    return filelock.FileLock(str(_LOCK_PATH), timeout=timeout)
+
+
+def _read_json(path, default):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def _write_json_atomic(path, data) -> None:
+    """Write via a temp file + rename so readers never see a partial file"""
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    tmp_path.replace(path)
+
+
+def _read_journal() -> list[dict]:
+    entries = []
+    try:
+        with open(_JOURNAL_PATH, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Most likely a write cut short by a crash; the rest is still good
+                    logger.warning(f"Skipping unreadable line {line_no} in {COMPANY_JOURNAL_FILE}")
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def _apply_journal(companies: list, company_info: dict, entries: list[dict]) -> bool:
+    """Replay journal entries onto the loaded data. True if a company was added."""
+    known = set(companies)
+    added = False
+    for entry in entries:
+        name = entry.get("name")
+        if not name:
+            continue
+        if entry.get("info"):
+            company_info[name] = entry["info"]
+        if name not in known:
+            known.add(name)
+            companies.append(name)
+            added = True
+    return added
+
+
+def load_company_data() -> tuple[list, dict]:
+    """(companies, company_info) with the journal applied."""
+    companies = _read_json(_TOP_COMPANIES_PATH, None)
+    if companies is None:
+        raise FileNotFoundError(f"JSON file not found: {_TOP_COMPANIES_PATH}")
+    try:
+        company_info = _read_json(_COMPANY_INFO_PATH, {})
+    except Exception as e:
+        logger.error(f"Error loading company_info.json: {e}")
+        company_info = {}
+    _apply_journal(companies, company_info, _read_journal())
+    return companies, company_info
+
+
+def store_files() -> list[str]:
+    """Files whose changes mean the company data changed (for reload checks)."""
+    return [TOP_COMPANIES_FILE, COMPANY_INFO_FILE, COMPANY_JOURNAL_FILE]
+
+
+def append_company(name: str, info: dict) -> None:
+    """Record a new or updated company (blocking I/O; safe across workers)."""
+    append_companies([(name, info)])
+
+
+def append_companies(companies: list[tuple[str, dict]]) -> None:
+    """Record several companies with a single journal write."""
+    now = time.time()
+    lines = "".join(
+        json.dumps({"name": name, "info": info, "ts": now}, ensure_ascii=False) + "\n"
+        for name, info in companies
+    )
+    with _lock():
+        with open(_JOURNAL_PATH, 'a', encoding='utf-8') as f:
+            f.write(lines)
+            size = f.tell()
+
+    if size >= COMPANY_JOURNAL_COMPACT_BYTES and not _compacting.locked():
+        threading.Thread(target=compact_company_store, daemon=True).start()
+
+
+def compact_company_store(wait: bool = False) -> int:
+    """
+    Fold the journal into the canonical JSON files. Returns the number of entries applied.
+    If a compaction is already running, returns 0 right away unless `wait` is set.
+    """
+    if not _compacting.acquire(blocking=wait):
+        return 0
+    try:
+        with _lock(timeout=60):
+            entries = _read_journal()
+            if not entries:
+                return 0
+            companies = _read_json(_TOP_COMPANIES_PATH, [])
+            company_info = _read_json(_COMPANY_INFO_PATH, {})
+            if _apply_journal(companies, company_info, entries):
+                companies.sort(key=str.lower)
+            _write_json_atomic(_COMPANY_INFO_PATH, company_info)
+            _write_json_atomic(_TOP_COMPANIES_PATH, companies)
+            # Only after both files are replaced; a crash before this just replays
+            # entries that are already applied, which is harmless
+            _JOURNAL_PATH.unlink()
+        logger.info(f"Compacted {len(entries)} company journal entries")
+        return len(entries)
+    except Exception as e:
+        logger.error(f"Error compacting company journal: {e}")
+        return 0
+    finally:
+        _compacting.release()
+
+
+def get_company_store_stats() -> dict:
+    """Return journal state for debugging"""
+    try:
+        journal_bytes = _JOURNAL_PATH.stat().st_size
+    except FileNotFoundError:
+        journal_bytes = 0
+    return {
+        "journal_bytes": journal_bytes,
+        "compact_at_bytes": COMPANY_JOURNAL_COMPACT_BYTES,
+        "compacting": _compacting.locked(),
+    }
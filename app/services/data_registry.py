@@ -0,0 +1,216 @@
+"""
+In-memory registry for the JSON data files and the indexes derived from them.
+
+Every module reads companies / company info / job titles through here, so
+no request parses JSON from disk. Each dataset records its source files'
+mtimes; at most every DATA_RELOAD_INTERVAL seconds a read stats them, and on
+change the derived snapshot is rebuilt in a background thread and swapped in
+atomically — requests keep using the previous snapshot meanwhile. Only the
+very first load blocks.
+
+Company data comes from company_store (canonical files + journal).
+load_data_registry() is called at startup so no request pays for the first
+load; reload_precomputed_store() swaps in a regenerated results file at once
+(other workers follow through the mtime check).
+Snapshots are never modified once published (readers and background
+index builds walk them without locking). Changes made by this worker are
+swapped in as new snapshots: register_company() rebuilds the directory from
+the store right away (concurrent calls share one rebuild), and
+register_precomputed() swaps in a copy of the store with the entry added.
+Other workers follow through the mtime check.
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable
+
+from app.utils.file_loader import load_json_file, BASE_DIR
+from app.utils.autocomplete_index import PrefixIndex
+from app.utils.company_directory import CompanyDirectory
+from app.services.company_store import load_company_data, store_files
+from app.services.precomputed_results import PrecomputedStore, load_precomputed_data, precomputed_files
+
+logger = logging.getLogger(__name__)
+
+DATA_RELOAD_INTERVAL = float(os.getenv("DATA_RELOAD_INTERVAL", "10"))
+
+JOB_FAMILY_FILE = "data/job_family.json"
+
+
+class _Dataset:
+    def __init__(self, name: str, files: list[str], build: Callable[[], Any]):
+        self.name = name
+        self.paths = [BASE_DIR / f for f in files]
+        self.build = build
+        self.snapshot = None
+        self.mtimes = None
+        self.checked = 0.0
+        self.reloads = 0
+        self.lock = threading.Lock()
+        self.rebuilding = False
+        # Serializes rebuilds; refresh() tickets let callers share one
+        self._build_lock = threading.Lock()
+        self._requested = 0
+        self._built = 0
+
+    def _stat(self) -> tuple:
+        mtimes = []
+        for path in self.paths:
+            try:
+                mtimes.append(path.stat().st_mtime_ns)
+            except FileNotFoundError:
+                mtimes.append(None)
+        return tuple(mtimes)
+
+    def get(self):
+        if self.snapshot is None:
+            with self.lock:
+                if self.snapshot is None:
+                    mtimes = self._stat()
+                    self.snapshot = self.build()
+                    self.mtimes = mtimes
+                    self.checked = time.monotonic()
+                    logger.info(f"Loaded {self.name}")
+            return self.snapshot
+
+        now = time.monotonic()
+        if now - self.checked >= DATA_RELOAD_INTERVAL:
+            self.checked = now
+            mtimes = self._stat()
+            if mtimes != self.mtimes and not self.rebuilding:
+                self.rebuilding = True
+                threading.Thread(target=self._rebuild, args=(mtimes,), daemon=True).start()
+        return self.snapshot
+
+    def reload(self) -> None:
+        """Rebuild now and swap in the result (raises if the build fails)."""
+        mtimes = self._stat()
+        snapshot = self.build()
+        with self.lock:
+            self.snapshot = snapshot
+            self.mtimes = mtimes
+            self.checked = time.monotonic()
+            self.reloads += 1
+        logger.info(f"Reloaded {self.name}")
+
+    def refresh(self) -> None:
+        """
+        Rebuild from the files and swap in the result (blocking; raises if the
+        build fails). Returns once a build that started after the call is live,
+        so concurrent callers share one rebuild.
+        """
+        with self.lock:
+            self._requested += 1
+            ticket = self._requested
+        with self._build_lock:
+            if self._built >= ticket:
+                return
+            with self.lock:
+                covered = self._requested
+            mtimes = self._stat()
+            snapshot = self.build()
+            with self.lock:
+                self.snapshot = snapshot
+                self.mtimes = mtimes
+                self.reloads += 1
+            self._built = covered
+
+    def update(self, change: Callable[[Any], Any]) -> None:
+        """Swap in change(snapshot), a modified copy of the current snapshot."""
+        with self.lock:
+            if self.snapshot is not None:
+                self.snapshot = change(self.snapshot)
+
+    def _rebuild(self, mtimes: tuple) -> None:
+        try:
+            with self._build_lock:
+                snapshot = self.build()
+                with self.lock:
+                    self.snapshot = snapshot
+                    self.mtimes = mtimes
+                    self.reloads += 1
+            logger.info(f"Reloaded {self.name} after file change")
+        except Exception as e:
+            # Keep serving the previous snapshot; retry on the next check
+            logger.error(f"Error reloading {self.name}, keeping previous data: {e}")
+        finally:
+            self.rebuilding = False
+
+
+def _build_company_directory() -> CompanyDirectory:
+    return CompanyDirectory(*load_company_data())
+
+
+def _build_job_title_index() -> PrefixIndex:
+    return PrefixIndex(list(load_json_file(JOB_FAMILY_FILE).keys()))
+
+
+def _build_precomputed_store() -> PrecomputedStore:
+    store = PrecomputedStore(load_precomputed_data(), get_company_directory().aliases())
+    logger.info(f"Loaded {len(store)} pre-computed company results")
+    return store
+
+
+_company_directory = _Dataset("company directory", store_files(), _build_company_directory)
+_job_titles = _Dataset("job title index", [JOB_FAMILY_FILE], _build_job_title_index)
+_precomputed = _Dataset("pre-computed results", precomputed_files(), _build_precomputed_store)
+_datasets = (_company_directory, _job_titles, _precomputed)
+
+
+def get_company_directory() -> CompanyDirectory:
+    """Companies + company_info with lookup/autocomplete indexes (see company_directory)."""
+    return _company_directory.get()
+
+
+def get_job_title_index() -> PrefixIndex:
+    """Prefix/substring index over job_family.json titles."""
+    return _job_titles.get()
+
+
+def get_precomputed_store() -> PrecomputedStore:
+    """Pre-computed company results (see precomputed_results)."""
+    return _precomputed.get()
+
+
+def reload_precomputed_store() -> int:
+    """Load a regenerated results file now (blocking); returns the number of companies."""
+    _precomputed.reload()
+    return len(_precomputed.snapshot)
+
+
+def load_data_registry() -> None:
+    """Load every dataset (blocking), so the first requests don't pay for it."""
+    for dataset in _datasets:
+        dataset.get()
+
+
+def register_company(name: str) -> None:
+    """
+    Make a company just written to the company store live in this worker,
+    without waiting for the mtime check. Blocks while the directory is
+    rebuilt — call with asyncio.to_thread from async code.
+    """
+    if _company_directory.snapshot is None:
+        return
+    _company_directory.refresh()
+    logger.info(f"Company directory rebuilt with '{name}'")
+
+
+def register_precomputed(name: str, result: dict) -> None:
+    """Apply a company pre-computed by this worker to the live store without waiting for a reload."""
+    _precomputed.update(lambda store: store.with_result(name, result))
+
+
+def get_data_registry_stats() -> dict:
+    """Return registry state for debugging"""
+    return {
+        dataset.name: {
+            "loaded": dataset.snapshot is not None,
+            "reloads": dataset.reloads,
+            "rebuilding": dataset.rebuilding,
+            "entries": len(dataset.snapshot) if dataset.snapshot is not None else 0,
+        }
+        for dataset in _datasets
+    }
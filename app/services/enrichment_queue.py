@@ -0,0 +1,339 @@
+"""
+Durable queue for company enrichment.
+
+/company-info enqueues companies it doesn't know into a SQLite table shared
+by every gunicorn worker, so pending work survives restarts. Each worker runs
+ENRICHMENT_WORKERS async tasks on its event loop that claim jobs under a
+lease: a company is enriched by one worker at a time, and a job held by a
+crashed worker is picked up again once its lease expires. Failures are
+retried with exponential backoff, up to ENRICHMENT_MAX_ATTEMPTS.
+
+Once a company is enriched, a "precompute" job is queued for it (unless it
+already has pre-computed overview links): it persists the company's overview
+into the pre-computed store, so the next search for the company takes the
+fast path in every worker. /company-info hands the overview it just built to
+enqueue_enrichment; it is kept as the job's payload and passed on to the
+precompute job, which then only runs the overview pipeline if there was
+none. Job keys are the lowercase name, prefixed with the kind for anything
+but enrichment.
+
+Job states: pending → running → done | failed
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import sqlite3
+from contextlib import closing
+
+from app.utils.file_loader import BASE_DIR
+from app.utils.sqlite_store import connect_sqlite
+from app.services.company_enrichment import enrich_and_save_company
+from app.services.company_overview import precompute_company_overview
+from app.services.data_registry import get_precomputed_store
+
+logger = logging.getLogger(__name__)
+
+ENRICHMENT_QUEUE_PATH = BASE_DIR / os.getenv("ENRICHMENT_QUEUE_PATH", "data/enrichment_queue.sqlite3")
+ENRICHMENT_WORKERS = int(os.getenv("ENRICHMENT_WORKERS", "2"))
+ENRICHMENT_MAX_ATTEMPTS = int(os.getenv("ENRICHMENT_MAX_ATTEMPTS", "5"))
+# Seconds before the first retry; doubles per attempt up to ENRICHMENT_RETRY_MAX
+ENRICHMENT_RETRY_BASE = float(os.getenv("ENRICHMENT_RETRY_BASE", "30"))
+ENRICHMENT_RETRY_MAX = float(os.getenv("ENRICHMENT_RETRY_MAX", "3600"))
+# A running job whose worker hasn't finished it by then is handed out again
+ENRICHMENT_LEASE_SECONDS = float(os.getenv("ENRICHMENT_LEASE_SECONDS", "300"))
+# Idle workers poll this often for jobs queued by other workers or retries coming due
+ENRICHMENT_POLL_INTERVAL = float(os.getenv("ENRICHMENT_POLL_INTERVAL", "5"))
+# A finished (done/failed) company may be queued again after this long
+ENRICHMENT_REQUEUE_AFTER = 24 * 3600
+
+_schema_ready = False
+_workers: list[asyncio.Task] = []
+_wake: asyncio.Event | None = None
+# Keys claimed by this process, released back to pending on shutdown
+_active: set[str] = set()
+_stats = {"enqueued": 0, "succeeded": 0, "retried": 0, "failed": 0}
+
+async def _run_enrich(name: str, payload: dict | None) -> bool:
+    return await enrich_and_save_company(name)
+
+
+async def _run_precompute(name: str, payload: dict | None) -> bool:
+    return await precompute_company_overview(name, overview=payload)
+
+
+# Job kind -> coroutine(company name, payload) returning True on success
+_JOB_HANDLERS = {
+    "enrich": _run_enrich,
+    "precompute": _run_precompute,
+}
+
+
+def _job_key(kind: str, name: str) -> str:
+    return name.lower() if kind == "enrich" else f"{kind}:{name.lower()}"
+
+
+def _job_kind(key: str) -> str:
+    kind, sep, _ = key.partition(":")
+    return kind if sep and kind in _JOB_HANDLERS else "enrich"
+
+
+def _connect():
+    global _schema_ready
+    conn = connect_sqlite(ENRICHMENT_QUEUE_PATH)
+    if not _schema_ready:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS enrichment_jobs ("
+            " key TEXT PRIMARY KEY,"
+            " name TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " next_attempt_at REAL NOT NULL,"
+            " lease_until REAL,"
+            " last_error TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_enrichment_due ON enrichment_jobs (status, next_attempt_at)")
+        # Added after the first release; older queue files get the column here
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(enrichment_jobs)")}
+        if "payload" not in columns:
+            try:
+                conn.execute("ALTER TABLE enrichment_jobs ADD COLUMN payload TEXT")
+            except sqlite3.OperationalError:
+                pass  # another worker added it first
+        conn.commit()
+        _schema_ready = True
+    return conn
+
+
+def _enqueue(name: str, kind: str = "enrich", payload: dict | None = None) -> bool:
+    """Insert a pending job unless one is queued/running or finished recently. True if queued."""
+    now = time.time()
+    payload_json = json.dumps(payload, ensure_ascii=False) if payload else None
+    with closing(_connect()) as conn, conn:
+        cursor = conn.execute(
+            "INSERT INTO enrichment_jobs"
+            " (key, name, status, attempts, next_attempt_at, payload, created_at, updated_at)"
+            " VALUES (?, ?, 'pending', 0, ?, ?, ?, ?)"
+            " ON CONFLICT (key) DO UPDATE SET"
+            " name = excluded.name, status = 'pending', attempts = 0, lease_until = NULL, last_error = NULL,"
+            " next_attempt_at = excluded.next_attempt_at, payload = excluded.payload,"
+            " updated_at = excluded.updated_at"
+            " WHERE enrichment_jobs.status IN ('done', 'failed') AND enrichment_jobs.updated_at < ?",
+            (_job_key(kind, name), name, now, payload_json, now, now, now - ENRICHMENT_REQUEUE_AFTER)
+        )
+        return cursor.rowcount > 0
+
+
+def _claim() -> tuple[str, str, int, dict | None] | None:
+    """Lease the next due job: (key, name, attempt number, payload), or None if nothing is due."""
+    now = time.time()
+    with closing(_connect()) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Jobs whose last attempt died with its worker count as failed attempts
+            conn.execute(
+                "UPDATE enrichment_jobs SET status = 'failed', last_error = 'lease expired', updated_at = ?"
+                " WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                (now, now, ENRICHMENT_MAX_ATTEMPTS)
+            )
+            row = conn.execute(
+                "SELECT key, name, attempts, payload FROM enrichment_jobs"
+                " WHERE (status = 'pending' AND next_attempt_at <= ?) OR (status = 'running' AND lease_until < ?)"
+                " ORDER BY next_attempt_at LIMIT 1",
+                (now, now)
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE enrichment_jobs SET status = 'running', attempts = attempts + 1,"
+                    " lease_until = ?, updated_at = ? WHERE key = ?",
+                    (now + ENRICHMENT_LEASE_SECONDS, now, row[0])
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    if row is None:
+        return None
+    key, name, attempts, payload = row
+    return key, name, attempts + 1, json.loads(payload) if payload else None
+
+
+def _finish(key: str, attempt: int, error: str | None) -> str:
+    """Record the outcome of an attempt; returns the job's new status."""
+    now = time.time()
+    if error is None:
+        status, next_attempt_at = "done", now
+    elif attempt >= ENRICHMENT_MAX_ATTEMPTS:
+        status, next_attempt_at = "failed", now
+    else:
+        status = "pending"
+        next_attempt_at = now + min(ENRICHMENT_RETRY_MAX, ENRICHMENT_RETRY_BASE * 2 ** (attempt - 1))
+    with closing(_connect()) as conn, conn:
+        conn.execute(
+            "UPDATE enrichment_jobs SET status = ?, next_attempt_at = ?, lease_until = NULL,"
+            " last_error = ?, updated_at = ? WHERE key = ?",
+            (status, next_attempt_at, error, now, key)
+        )
+    return status
+
+
+def _release(keys: list[str]) -> None:
+    """Hand interrupted jobs back to the queue without counting the attempt."""
+    now = time.time()
+    with closing(_connect()) as conn, conn:
+        conn.executemany(
+            "UPDATE enrichment_jobs SET status = 'pending', attempts = MAX(attempts - 1, 0),"
+            " next_attempt_at = ?, lease_until = NULL, updated_at = ? WHERE key = ? AND status = 'running'",
+            [(now, now, key) for key in keys]
+        )
+
+
+async def _queue_job(company_name: str, kind: str, payload: dict | None = None) -> bool:
+    company_name = company_name.strip()
+    if not company_name:
+        return False
+    try:
+        queued = await asyncio.to_thread(_enqueue, company_name, kind, payload)
+    except Exception as e:
+        logger.error(f"Could not queue {kind} job for '{company_name}': {e}")
+        return False
+    if queued:
+        _stats["enqueued"] += 1
+        logger.info(f"Queued {kind} job for '{company_name}'")
+        if _wake is not None:
+            _wake.set()
+    return queued
+
+
+def _overview_payload(overview: dict | None) -> dict | None:
+    if not overview or not overview.get("links"):
+        return None
+    return {"domain": overview.get("domain"), "links": overview["links"]}
+
+
+async def enqueue_enrichment(company_name: str, overview: dict | None = None) -> bool:
+    """
+    Queue a company for enrichment (deduplicated across workers). Never raises.
+    overview: the company's overview if the caller already built one, so
+    pre-computing it afterwards doesn't repeat the searches.
+    """
+    return await _queue_job(company_name, "enrich", _overview_payload(overview))
+
+
+async def enqueue_precompute(company_name: str, overview: dict | None = None) -> bool:
+    """Queue a company's overview to be pre-computed (deduplicated across workers). Never raises."""
+    return await _queue_job(company_name, "precompute", _overview_payload(overview))
+
+
+def _is_precomputed(name: str) -> bool:
+    try:
+        entry = get_precomputed_store().get(name)
+    except Exception as e:
+        logger.warning(f"Could not check pre-computed results for '{name}': {e}")
+        return False
+    return bool(entry and entry["links"])
+
+
+async def _process(key: str, name: str, attempt: int, payload: dict | None) -> None:
+    kind = _job_kind(key)
+    try:
+        error = None if await _JOB_HANDLERS[kind](name, payload) else f"{kind} produced no data"
+    except Exception as e:
+        error = str(e) or type(e).__name__
+    status = await asyncio.to_thread(_finish, key, attempt, error)
+
+    if status == "done":
+        _stats["succeeded"] += 1
+        # A newly known company joins the fast path without waiting for regenerate_links.py
+        if kind == "enrich" and not _is_precomputed(name):
+            await enqueue_precompute(name, overview=payload)
+    elif status == "pending":
+        _stats["retried"] += 1
+        logger.warning(f"{kind.capitalize()} attempt {attempt} for '{name}' failed ({error}), will retry")
+    else:
+        _stats["failed"] += 1
+        logger.error(f"Giving up on {kind} job for '{name}' after {attempt} attempts: {error}")
+
+
+async def _worker_loop() -> None:
+    while True:
+        # Clear before looking so a wake-up during the claim isn't missed
+        _wake.clear()
+        try:
+            job = await asyncio.to_thread(_claim)
+        except Exception as e:
+            logger.error(f"Error claiming enrichment job: {e}")
+            job = None
+
+        if job is None:
+            try:
+                await asyncio.wait_for(_wake.wait(), ENRICHMENT_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        key, name, attempt, payload = job
+        _active.add(key)
+        try:
+            await _process(key, name, attempt, payload)
+        finally:
+            _active.discard(key)
+
+
+def start_enrichment_workers() -> None:
+    """Start the worker tasks on the running loop (call on startup)."""
+    global _wake
+    if _workers or ENRICHMENT_WORKERS <= 0:
+        return
+    _wake = asyncio.Event()
+    for _ in range(ENRICHMENT_WORKERS):
+        _workers.append(asyncio.create_task(_worker_loop()))
+    logger.info(f"Started {ENRICHMENT_WORKERS} enrichment workers")
+
+
+async def stop_enrichment_workers() -> None:
+    """Cancel the workers and requeue anything they were in the middle of (call on shutdown)."""
+    # Snapshot first: cancelled workers discard their keys on the way out.
+    # A job that finishes before its task is cancelled is no longer 'running',
+    # so _release leaves it alone.
+    interrupted = list(_active)
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+    if interrupted:
+        try:
+            await asyncio.to_thread(_release, interrupted)
+            logger.info(f"Requeued {len(interrupted)} interrupted jobs")
+        except Exception as e:
+            logger.warning(f"Could not requeue interrupted enrichment jobs: {e}")
+    _active.clear()
+
+
+def get_enrichment_queue_stats() -> dict:
+    """Queue depth (shared across workers) plus this process's counters"""
+    now = time.time()
+    stats = {
+        "workers": len(_workers),
+        "active": len(_active),
+        **_stats,
+    }
+    try:
+        with closing(_connect()) as conn:
+            stats["jobs"] = dict(conn.execute(
+                "SELECT status, COUNT(*) FROM enrichment_jobs GROUP BY status"
+            ).fetchall())
+            due, oldest = conn.execute(
+                "SELECT COUNT(*), MIN(created_at) FROM enrichment_jobs"
+                " WHERE status = 'pending' AND next_attempt_at <= ?",
+                (now,)
+            ).fetchone()
+        stats["due"] = due
+        stats["oldest_due_age_seconds"] = round(now - oldest, 1) if oldest else 0
+    except Exception as e:
+        stats["error"] = str(e)
+    return stats
@@ -0,0 +1,454 @@
+"""
+Unified async LLM client used by every LLM consumer (link selectors,
+company enrichment, question generation).
+
+- One pooled HTTP client (app.utils.http_client), per-call timeouts
+- Retries with exponential backoff on timeouts, 429 and 5xx
+- Provider fallback between OpenAI and Anthropic: on error, and ahead of
+  time when a provider is slow or its circuit is open after repeated failures
+- Structured output: OpenAI JSON mode for objects, Anthropic assistant
+  prefill for objects/arrays; markdown fences stripped before parsing
+- Token streaming (stream_text) over both providers' SSE APIs
+- Per-call-site metrics (calls, errors, fallbacks, tokens, latency)
+
+Providers are enabled by OPENAI_API_KEY / ANTHROPIC_API_KEY in .env.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, AsyncIterator
+
+import httpx
+
+from app.utils.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
+
+OPENAI_URL = "https://api.openai.com/v1/chat/completions"
+ANTHROPIC_URL = "https://api.anthropic.com/v1/messages"
+ANTHROPIC_VERSION = "2023-06-01"
+
+DEFAULT_OPENAI_MODEL = "gpt-3.5-turbo"
+DEFAULT_ANTHROPIC_MODEL = "claude-haiku-4-5-20251001"
+
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "1"))
+LLM_RETRY_BACKOFF = float(os.getenv("LLM_RETRY_BACKOFF", "0.5"))
+# A provider whose recent average latency exceeds this is tried second
+LLM_SLOW_SECONDS = float(os.getenv("LLM_SLOW_SECONDS", "8"))
+# After this many consecutive failures a provider is skipped for LLM_COOLDOWN_SECONDS
+LLM_FAILURE_THRESHOLD = int(os.getenv("LLM_FAILURE_THRESHOLD", "3"))
+LLM_COOLDOWN_SECONDS = float(os.getenv("LLM_COOLDOWN_SECONDS", "60"))
+
+_RETRY_STATUSES = {408, 409, 429, 500, 502, 503, 504, 529}
+_EWMA_ALPHA = 0.3
+
+
+class LLMError(Exception):
+    """Raised when no provider produced a usable response."""
+
+
+_provider_health = {
+    name: {"ewma_latency": None, "consecutive_failures": 0, "open_until": 0.0}
+    for name in ("openai", "anthropic")
+}
+
+_stats: dict[str, dict] = defaultdict(lambda: {
+    "calls": 0, "errors": 0, "retries": 0, "fallbacks": 0,
+    "input_tokens": 0, "output_tokens": 0, "latency_total": 0.0,
+    "providers": defaultdict(int),
+})
+
+
+def configured_providers() -> list[str]:
+    """Providers that have an API key configured."""
+    providers = []
+    if OPENAI_API_KEY:
+        providers.append("openai")
+    if ANTHROPIC_API_KEY:
+        providers.append("anthropic")
+    return providers
+
+
+def llm_available() -> bool:
+    return bool(configured_providers())
+
+
+def _provider_order(preferred: tuple[str, ...]) -> list[str]:
+    """Preferred order, filtered to configured providers, demoting open circuits and slow providers."""
+    available = [p for p in preferred if p in configured_providers()]
+    now = time.time()
+
+    def demoted(provider: str) -> int:
+        health = _provider_health[provider]
+        if health["open_until"] > now:
+            return 2
+        if health["ewma_latency"] is not None and health["ewma_latency"] > LLM_SLOW_SECONDS:
+            return 1
+        return 0
+
+    # sorted() is stable, so preference order is kept within each tier
+    return sorted(available, key=demoted)
+
+
+def _record_health(provider: str, ok: bool, latency: float) -> None:
+    health = _provider_health[provider]
+    if ok:
+        previous = health["ewma_latency"]
+        health["ewma_latency"] = latency if previous is None else _EWMA_ALPHA * latency + (1 - _EWMA_ALPHA) * previous
+        health["consecutive_failures"] = 0
+        health["open_until"] = 0.0
+    else:
+        health["consecutive_failures"] += 1
+        if health["consecutive_failures"] >= LLM_FAILURE_THRESHOLD:
+            health["open_until"] = time.time() + LLM_COOLDOWN_SECONDS
+            logger.warning(f"LLM provider '{provider}' failing repeatedly; skipping for {LLM_COOLDOWN_SECONDS:.0f}s")
+
+
+def strip_markdown_fences(content: str) -> str:
+    """Strip ```json fences (some models ignore instructions)."""
+    content = content.strip()
+    if content.startswith("```"):
+        content = content.split("```")[1]
+        if content.startswith("json"):
+            content = content[4:]
+    return content.strip()
+
+
+async def _call_openai(prompt: str, system: str | None, model: str, max_tokens: int,
+                       temperature: float, timeout: float, json_object: bool) -> tuple[str, int, int]:
+    messages = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": prompt})
+
+    payload = {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens}
+    if json_object:
+        payload["response_format"] = {"type": "json_object"}
+
+    response = await get_http_client().post(
+        OPENAI_URL,
+        headers={"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": "application/json"},
+        json=payload,
+        timeout=timeout
+    )
+    response.raise_for_status()
+    data = response.json()
+    usage = data.get("usage", {})
+    content = data["choices"][0]["message"]["content"] or ""
+    return content, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+
+async def _call_anthropic(prompt: str, system: str | None, model: str, max_tokens: int,
+                          temperature: float, timeout: float, prefill: str) -> tuple[str, int, int]:
+    messages = [{"role": "user", "content": prompt}]
+    if prefill:
+        # Prefilling the assistant turn forces the reply to start as JSON
+        messages.append({"role": "assistant", "content": prefill})
+
+    payload = {"model": model, "max_tokens": max_tokens, "temperature": temperature, "messages": messages}
+    if system:
+        payload["system"] = system
+
+    response = await get_http_client().post(
+        ANTHROPIC_URL,
+        headers={
+            "x-api-key": ANTHROPIC_API_KEY,
+            "anthropic-version": ANTHROPIC_VERSION,
+            "content-type": "application/json",
+        },
+        json=payload,
+        timeout=timeout
+    )
+    response.raise_for_status()
+    data = response.json()
+    usage = data.get("usage", {})
+    content = "".join(block.get("text", "") for block in data.get("content", []) if block.get("type") == "text")
+    return prefill + content, usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in _RETRY_STATUSES
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+
+
+async def complete_text(
+    call_site: str,
+    prompt: str,
+    system: str | None = None,
+    *,
+    providers: tuple[str, ...] = ("openai", "anthropic"),
+    openai_model: str = DEFAULT_OPENAI_MODEL,
+    anthropic_model: str = DEFAULT_ANTHROPIC_MODEL,
+    max_tokens: int = 800,
+    temperature: float = 0.3,
+    timeout: float = 15.0,
+    expect: type | None = None,
+) -> str:
+    """
+    Run a completion, retrying and falling back across providers.
+
+    `expect` (dict or list) requests structured output: JSON mode on OpenAI
+    (objects only) and a "{"/"[" prefill on Anthropic.
+    Raises LLMError if every provider fails.
+    """
+    stats = _stats[call_site]
+    stats["calls"] += 1
+    start = time.time()
+
+    order = _provider_order(providers)
+    if not order:
+        stats["errors"] += 1
+        raise LLMError("No LLM provider configured")
+
+    last_error: Exception | None = None
+    for position, provider in enumerate(order):
+        if position > 0:
+            stats["fallbacks"] += 1
+            logger.info(f"[llm:{call_site}] falling back to {provider}")
+
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            attempt_start = time.time()
+            try:
+                if provider == "openai":
+                    content, tokens_in, tokens_out = await _call_openai(
+                        prompt, system, openai_model, max_tokens, temperature, timeout, expect is dict
+                    )
+                else:
+                    prefill = "{" if expect is dict else "[" if expect is list else ""
+                    content, tokens_in, tokens_out = await _call_anthropic(
+                        prompt, system, anthropic_model, max_tokens, temperature, timeout, prefill
+                    )
+            except Exception as e:
+                last_error = e
+                _record_health(provider, False, time.time() - attempt_start)
+                if attempt < LLM_MAX_RETRIES and _is_retryable(e):
+                    stats["retries"] += 1
+                    await asyncio.sleep(LLM_RETRY_BACKOFF * (2 ** attempt))
+                    continue
+                logger.warning(f"[llm:{call_site}] {provider} failed: {e}")
+                break
+
+            latency = time.time() - attempt_start
+            _record_health(provider, True, latency)
+            stats["providers"][provider] += 1
+            stats["input_tokens"] += tokens_in
+            stats["output_tokens"] += tokens_out
+            stats["latency_total"] += time.time() - start
+            logger.info(f"[llm:{call_site}] {provider} ok in {latency:.2f}s ({tokens_in} in / {tokens_out} out tokens)")
+            return content
+
+    stats["errors"] += 1
+    stats["latency_total"] += time.time() - start
+    raise LLMError(f"All LLM providers failed for {call_site}: {last_error}") from last_error
+
+
+async def complete_json(
+    call_site: str,
+    prompt: str,
+    system: str | None = None,
+    *,
+    expect: type = list,
+    **kwargs
+) -> Any:
+    """
+    complete_text + markdown stripping + JSON parsing.
+    Raises LLMError if the response isn't JSON of the expected type.
+    """
+    content = await complete_text(call_site, prompt, system, expect=expect, **kwargs)
+    try:
+        data = json.loads(strip_markdown_fences(content))
+    except json.JSONDecodeError as e:
+        _stats[call_site]["errors"] += 1
+        raise LLMError(f"Invalid JSON from LLM for {call_site}: {e}") from e
+
+    if not isinstance(data, expect):
+        # JSON mode can wrap an array in an object, e.g. {"links": [...]}
+        if expect is list and isinstance(data, dict):
+            wrapped = [v for v in data.values() if isinstance(v, list)]
+            if len(wrapped) == 1:
+                return wrapped[0]
+        _stats[call_site]["errors"] += 1
+        raise LLMError(f"Unexpected JSON type from LLM for {call_site}: {type(data).__name__}")
+
+    return data
+
+
+async def _stream_openai(prompt: str, system: str | None, model: str, max_tokens: int,
+                         temperature: float, timeout: float, json_object: bool, usage: dict) -> AsyncIterator[str]:
+    messages = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": prompt})
+
+    payload = {
+        "model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens,
+        "stream": True, "stream_options": {"include_usage": True},
+    }
+    if json_object:
+        payload["response_format"] = {"type": "json_object"}
+
+    async with get_http_client().stream(
+        "POST",
+        OPENAI_URL,
+        headers={"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": "application/json"},
+        json=payload,
+        timeout=timeout
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            event = json.loads(data)
+            if event.get("usage"):
+                usage["input"] = event["usage"].get("prompt_tokens", 0)
+                usage["output"] = event["usage"].get("completion_tokens", 0)
+            for choice in event.get("choices", []):
+                delta = (choice.get("delta") or {}).get("content")
+                if delta:
+                    yield delta
+
+
+async def _stream_anthropic(prompt: str, system: str | None, model: str, max_tokens: int,
+                            temperature: float, timeout: float, prefill: str, usage: dict) -> AsyncIterator[str]:
+    messages = [{"role": "user", "content": prompt}]
+    if prefill:
+        messages.append({"role": "assistant", "content": prefill})
+
+    payload = {"model": model, "max_tokens": max_tokens, "temperature": temperature,
+               "messages": messages, "stream": True}
+    if system:
+        payload["system"] = system
+
+    async with get_http_client().stream(
+        "POST",
+        ANTHROPIC_URL,
+        headers={
+            "x-api-key": ANTHROPIC_API_KEY,
+            "anthropic-version": ANTHROPIC_VERSION,
+            "content-type": "application/json",
+        },
+        json=payload,
+        timeout=timeout
+    ) as response:
+        response.raise_for_status()
+        if prefill:
+            yield prefill
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            event = json.loads(line[5:].strip())
+            event_type = event.get("type")
+            if event_type == "content_block_delta":
+                text = (event.get("delta") or {}).get("text")
+                if text:
+                    yield text
+            elif event_type == "message_start":
+                usage["input"] = event.get("message", {}).get("usage", {}).get("input_tokens", 0)
+            elif event_type == "message_delta":
+                usage["output"] = (event.get("usage") or {}).get("output_tokens", 0)
+            elif event_type == "error":
+                raise LLMError(f"Anthropic stream error: {event.get('error')}")
+
+
+async def stream_text(
+    call_site: str,
+    prompt: str,
+    system: str | None = None,
+    *,
+    providers: tuple[str, ...] = ("openai", "anthropic"),
+    openai_model: str = DEFAULT_OPENAI_MODEL,
+    anthropic_model: str = DEFAULT_ANTHROPIC_MODEL,
+    max_tokens: int = 800,
+    temperature: float = 0.3,
+    timeout: float = 30.0,
+    expect: type | None = None,
+) -> AsyncIterator[str]:
+    """
+    Stream completion text deltas. Falls back to the next provider only if
+    the current one fails before producing any output; a failure mid-stream
+    raises LLMError (the caller has already consumed partial text).
+    """
+    stats = _stats[call_site]
+    stats["calls"] += 1
+    start = time.time()
+
+    order = _provider_order(providers)
+    if not order:
+        stats["errors"] += 1
+        raise LLMError("No LLM provider configured")
+
+    last_error: Exception | None = None
+    for position, provider in enumerate(order):
+        if position > 0:
+            stats["fallbacks"] += 1
+            logger.info(f"[llm:{call_site}] falling back to {provider} (stream)")
+
+        usage = {"input": 0, "output": 0}
+        if provider == "openai":
+            chunks = _stream_openai(prompt, system, openai_model, max_tokens, temperature, timeout, expect is dict, usage)
+        else:
+            prefill = "{" if expect is dict else "[" if expect is list else ""
+            chunks = _stream_anthropic(prompt, system, anthropic_model, max_tokens, temperature, timeout, prefill, usage)
+
+        started = False
+        try:
+            async for chunk in chunks:
+                if not started:
+                    started = True
+                    logger.info(f"[llm:{call_site}] {provider} first token in {time.time() - start:.2f}s")
+                yield chunk
+        except Exception as e:
+            last_error = e
+            _record_health(provider, False, time.time() - start)
+            logger.warning(f"[llm:{call_site}] {provider} stream failed: {e}")
+            if started:
+                stats["errors"] += 1
+                raise LLMError(f"LLM stream interrupted for {call_site}: {e}") from e
+            continue
+
+        latency = time.time() - start
+        _record_health(provider, True, latency)
+        stats["providers"][provider] += 1
+        stats["input_tokens"] += usage["input"]
+        stats["output_tokens"] += usage["output"]
+        stats["latency_total"] += latency
+        return
+
+    stats["errors"] += 1
+    stats["latency_total"] += time.time() - start
+    raise LLMError(f"All LLM providers failed for {call_site}: {last_error}") from last_error
+
+
+def get_llm_stats() -> dict:
+    """Return per-call-site and per-provider metrics for debugging"""
+    call_sites = {}
+    for call_site, stats in _stats.items():
+        completed = stats["calls"]
+        call_sites[call_site] = {
+            **{k: v for k, v in stats.items() if k not in ("providers", "latency_total")},
+            "providers": dict(stats["providers"]),
+            "avg_latency": round(stats["latency_total"] / completed, 3) if completed else None,
+        }
+    return {
+        "call_sites": call_sites,
+        "providers": {
+            name: {
+                "configured": name in configured_providers(),
+                "ewma_latency": round(h["ewma_latency"], 3) if h["ewma_latency"] is not None else None,
+                "consecutive_failures": h["consecutive_failures"],
+                "circuit_open": h["open_until"] > time.time(),
+            }
+            for name, h in _provider_health.items()
+        },
+    }
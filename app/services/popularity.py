@@ -0,0 +1,209 @@
+"""
+Search / selection counters used to rank autocomplete suggestions.
+
+Recording is an in-memory counter increment. A background task flushes the
+deltas to SQLite every POPULARITY_FLUSH_INTERVAL seconds (upserts add to the
+shared totals, so counts from all workers merge) and reloads the top
+POPULARITY_TOP_N names per kind, which autocomplete ranks first.
+
+Kinds: "company", "job_title".
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import Counter
+from contextlib import closing
+
+from app.utils.file_loader import BASE_DIR
+from app.utils.sqlite_store import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+POPULARITY_ENABLED = os.getenv("POPULARITY_ENABLED", "true").lower() != "false"
+POPULARITY_PATH = BASE_DIR / os.getenv("POPULARITY_PATH", "data/popularity.sqlite3")
+POPULARITY_FLUSH_INTERVAL = float(os.getenv("POPULARITY_FLUSH_INTERVAL", "60"))
+POPULARITY_TOP_N = int(os.getenv("POPULARITY_TOP_N", "500"))
+
+# A picked suggestion says more about intent than a search
+SELECTION_WEIGHT = 3
+SEARCH_WEIGHT = 1
+
+KINDS = ("company", "job_title")
+
+_pending_searches: Counter = Counter()
+_pending_selections: Counter = Counter()
+# kind → [(lowercase name, name)] ordered by score, highest first
+_top: dict[str, list[tuple[str, str]]] = {kind: [] for kind in KINDS}
+_scores: dict[str, dict[str, int]] = {kind: {} for kind in KINDS}
+# Bumped whenever a top list changes, so cached rankings can be invalidated
+_version = 0
+_schema_ready = False
+_flush_task: asyncio.Task | None = None
+_last_flush = 0.0
+
+
+def _connect():
+    global _schema_ready
+    conn = connect_sqlite(POPULARITY_PATH)
+    if not _schema_ready:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS popularity ("
+            " kind TEXT NOT NULL,"
+            " name TEXT NOT NULL,"
+            " searches INTEGER NOT NULL DEFAULT 0,"
+            " selections INTEGER NOT NULL DEFAULT 0,"
+            " score INTEGER NOT NULL DEFAULT 0,"
+            " updated_at REAL NOT NULL,"
+            " PRIMARY KEY (kind, name))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_popularity_score ON popularity (kind, score DESC)")
+        conn.commit()
+        _schema_ready = True
+    return conn
+
+
+def record_search(kind: str, name: str) -> None:
+    if POPULARITY_ENABLED and kind in KINDS and name:
+        _pending_searches[(kind, name)] += 1
+
+
+def record_selection(kind: str, name: str) -> None:
+    if POPULARITY_ENABLED and kind in KINDS and name:
+        _pending_selections[(kind, name)] += 1
+
+
+def _take_pending() -> tuple[Counter, Counter]:
+    """Swap out the pending counters (runs on the event loop, so no increments are lost)."""
+    global _pending_searches, _pending_selections
+    taken = (_pending_searches, _pending_selections)
+    _pending_searches, _pending_selections = Counter(), Counter()
+    return taken
+
+
+def _write_counts(searches: Counter, selections: Counter) -> bool:
+    """Add counts to the shared totals and reload the top lists. Returns False on failure."""
+    global _last_flush, _version
+    now = time.time()
+    keys = set(searches) | set(selections)
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.executemany(
+                "INSERT INTO popularity (kind, name, searches, selections, score, updated_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (kind, name) DO UPDATE SET"
+                " searches = searches + excluded.searches,"
+                " selections = selections + excluded.selections,"
+                " score = score + excluded.score,"
+                " updated_at = excluded.updated_at",
+                [
+                    (kind, name, searches[(kind, name)], selections[(kind, name)],
+                     searches[(kind, name)] * SEARCH_WEIGHT + selections[(kind, name)] * SELECTION_WEIGHT, now)
+                    for kind, name in keys
+                ]
+            )
+            for kind in KINDS:
+                rows = conn.execute(
+                    "SELECT name, score FROM popularity WHERE kind = ? ORDER BY score DESC LIMIT ?",
+                    (kind, POPULARITY_TOP_N)
+                ).fetchall()
+                top = [(name.lower(), name) for name, _ in rows]
+                _scores[kind] = dict(rows)
+                if top != _top[kind]:
+                    _top[kind] = top
+                    _version += 1
+    except Exception as e:
+        logger.warning(f"Popularity flush failed: {e}")
+        return False
+
+    _last_flush = now
+    if keys:
+        logger.debug(f"Flushed popularity counts for {len(keys)} names")
+    return True
+
+
+async def flush_popularity() -> None:
+    """Write pending counts to SQLite and reload the merged top lists. Never raises."""
+    if not POPULARITY_ENABLED:
+        return
+    searches, selections = _take_pending()
+    if not await asyncio.to_thread(_write_counts, searches, selections):
+        # Keep the counts for the next attempt
+        _pending_searches.update(searches)
+        _pending_selections.update(selections)
+
+
+def popular_matches(kind: str, query: str, limit: int = 10) -> tuple[list[str], list[str]]:
+    """
+    Popular names matching `query`, highest score first, split into
+    (starts-with matches, contains matches).
+    """
+    query = query.strip().lower()
+    prefix, contains = [], []
+    if not query:
+        return prefix, contains
+    for lower, name in _top.get(kind, []):
+        if lower.startswith(query):
+            if len(prefix) < limit:
+                prefix.append(name)
+        elif query in lower and len(contains) < limit:
+            contains.append(name)
+        if len(prefix) >= limit and len(contains) >= limit:
+            break
+    return prefix, contains
+
+
+def popular_names(kind: str, limit: int) -> list[str]:
+    """Most popular names of a kind, highest score first."""
+    return [name for _, name in _top.get(kind, [])[:limit]]
+
+
+def rank_suggestions(kind: str, query: str, prefix: list[str], contains: list[str], limit: int = 10) -> list[str]:
+    """Merge index results with popular names: popular prefix, prefix, popular contains, contains."""
+    popular_prefix, popular_contains = popular_matches(kind, query, limit)
+    results = []
+    seen = set()
+    for name in popular_prefix + prefix + popular_contains + contains:
+        if name not in seen:
+            seen.add(name)
+            results.append(name)
+            if len(results) >= limit:
+                break
+    return results
+
+
+def get_popularity_version() -> int:
+    return _version
+
+
+def get_popularity_stats() -> dict:
+    """Return counter statistics for debugging"""
+    return {
+        "enabled": POPULARITY_ENABLED,
+        "pending": len(_pending_searches) + len(_pending_selections),
+        "top": {kind: [(name, _scores[kind].get(name)) for _, name in _top[kind][:10]] for kind in KINDS},
+        "last_flush": _last_flush,
+    }
+
+
+async def _flush_loop() -> None:
+    while True:
+        await flush_popularity()
+        await asyncio.sleep(POPULARITY_FLUSH_INTERVAL)
+
+
+def start_popularity_flusher() -> None:
+    """Start the periodic flush task (call on startup)."""
+    global _flush_task
+    if POPULARITY_ENABLED and _flush_task is None:
+        _flush_task = asyncio.create_task(_flush_loop())
+
+
+async def stop_popularity_flusher() -> None:
+    """Stop the flush task and write out anything pending (call on shutdown)."""
+    global _flush_task
+    if _flush_task is not None:
+        _flush_task.cancel()
+        _flush_task = None
+    await flush_popularity()
@@ -1,76 +1,271 @@
 """
-Service for loading pre-computed company results from full-links-results.json.
-Falls back to live search if company not found.
+Pre-computed company results from full-links-results.json (written by
+scripts/regenerate_links.py). Per company it can hold the /company-info
+overview links, the /company-reviews response, the company-level benefits
+links of /salary-benefits, and /interview-prep responses per job family;
+the routes serve these instead of running the live search when covered.
+
+Companies pre-computed by the server itself (after enrichment, see
+company_overview) are appended to a journal next to the file, under a file
+lock, and replayed on load (load_precomputed_data) — the same scheme as
+company_store. Past PRECOMPUTED_JOURNAL_COMPACT_BYTES the journal is folded
+into the results file in a background thread. regenerate_links.py
+checkpoints each company to its own append-only file instead and folds it
+in with one final compaction.
+
+PrecomputedStore is built once per file version: entries are indexed by
+lowercase name and company_info aliases, and links are already passed
+through format_link_for_display, so a request is one dict lookup. The live
+instance is owned by app.services.data_registry, which loads it at startup
+and swaps in a regenerated file without a restart.
 """
 
+import os
+import copy
 import json
 import logging
-from pathlib import Path
-from typing import Optional
+import threading
+import time
+
+import filelock
+
+from app.utils.file_loader import BASE_DIR
+from app.utils.link_formatting import format_link_for_display
 
 logger = logging.getLogger(__name__)
 
-# Path to pre-computed results
-PRECOMPUTED_PATH = Path("notes/full-links-results.json")
+# Relative to the project root
+PRECOMPUTED_FILE = "notes/full-links-results.json"
+PRECOMPUTED_JOURNAL_FILE = os.getenv("PRECOMPUTED_JOURNAL_PATH", "notes/full-links-journal.jsonl")
+PRECOMPUTED_JOURNAL_COMPACT_BYTES = int(os.getenv("PRECOMPUTED_JOURNAL_COMPACT_BYTES", str(256 * 1024)))
+
+_PRECOMPUTED_PATH = BASE_DIR / PRECOMPUTED_FILE
+_JOURNAL_PATH = BASE_DIR / PRECOMPUTED_JOURNAL_FILE
+_LOCK_PATH = BASE_DIR / "notes" / ".full-links.lock"
+
+_compacting = threading.Lock()
 
-# Cache the loaded data
-_precomputed_cache = None
 
+def _needs_youtube_resolution(link: dict) -> bool:
+    # Same links resolve_youtube_links() acts on
+    return link.get("type") == "video" and "youtube.com" in link.get("url", "")
+
+
+def _section(result: dict) -> dict | None:
+    """A stored reviews / interview-prep response, links formatted for display."""
+    if not result or "error" in result or not result.get("links"):
+        return None
+    return {
+        "links": [format_link_for_display(link) for link in result["links"]],
+        "all_links": [format_link_for_display(link) for link in result.get("all_links", [])],
+        "total_found": result.get("total_found", 0),
+        "engine": result.get("engine"),
+        # Requests asking for more links than were generated go live
+        "max_links": result.get("max_links", len(result["links"])),
+    }
+
+
+def _build_entry(name: str, result: dict) -> dict | None:
+    # "error" marks a failed overview; other sections may still be there
+    links = [] if "error" in result else [format_link_for_display(link) for link in result.get("links", [])]
+    interview_prep = {}
+    for family, prep in result.get("interview_prep", {}).items():
+        section = _section(prep)
+        if section:
+            interview_prep[family] = section
+    entry = {
+        "name": name,
+        "domain": result.get("domain"),
+        "links": links,
+        # Channel links still have to be resolved per request (cached)
+        "has_youtube": any(_needs_youtube_resolution(link) for link in links),
+        "reviews": _section(result.get("reviews")),
+        # Top link per company-level benefits category (salary/equity stay live)
+        "benefits": result.get("benefits") or [],
+        # Keyed by job family (app.utils.job_family)
+        "interview_prep": interview_prep,
+    }
+    if links or entry["reviews"] or entry["benefits"] or interview_prep:
+        return entry
+    return None
 
-def _load_precomputed() -> dict:
-    """Load pre-computed results, with caching."""
-    global _precomputed_cache
 
-    if _precomputed_cache is not None:
-        return _precomputed_cache
+class PrecomputedStore:
+    def __init__(self, data: dict, aliases: list[tuple[str, str]] = ()):
+        self._entries: dict[str, dict] = {}
+        for name, result in data.get("companies", {}).items():
+            entry = _build_entry(name, result)
+            if entry:
+                self._entries[name.lower()] = entry
+        self._count = len(self._entries)
 
+        for alias, name in aliases:
+            entry = self._entries.get(name.lower())
+            if entry is not None:
+                self._entries.setdefault(alias.lower(), entry)
+
+        self.generated_at = data.get("completed_at") or data.get("started_at")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def get(self, company_name: str) -> dict | None:
+        """
+        Entry for a company (case-insensitive, aliases included), or None:
+        {"name", "domain", "links" (display-formatted), "has_youtube",
+         "reviews", "benefits", "interview_prep": {job family: section}}
+        Sections are None/empty when they weren't generated for the company.
+        """
+        return self._entries.get(company_name.strip().lower())
+
+    def with_result(self, name: str, result: dict) -> "PrecomputedStore":
+        """
+        Copy of the store with a company's entry added or replaced (result as
+        stored in the results file); the store itself is left untouched.
+        """
+        entry = _build_entry(name, result)
+        if entry is None:
+            return self
+        store = copy.copy(self)
+        store._entries = dict(self._entries)
+        if name.lower() not in store._entries:
+            store._count += 1
+        store._entries[name.lower()] = entry
+        return store
+
+
+def _lock(timeout: float = 10) -> filelock.FileLock:
+    return filelock.FileLock(str(_LOCK_PATH), timeout=timeout)
+
+
+def _read_journal(path=None) -> list[dict]:
+    path = path or _JOURNAL_PATH
+    entries = []
     try:
-        if PRECOMPUTED_PATH.exists():
-            with open(PRECOMPUTED_PATH, 'r', encoding='utf-8') as f:
-                _precomputed_cache = json.load(f)
-                logger.info(f"Loaded {len(_precomputed_cache.get('companies', {}))} pre-computed company results")
-                return _precomputed_cache
-        else:
-            logger.warning(f"Pre-computed results file not found: {PRECOMPUTED_PATH}")
-            _precomputed_cache = {"companies": {}}
-            return _precomputed_cache
-    except Exception as e:
-        logger.error(f"Error loading pre-computed results: {e}")
-        _precomputed_cache = {"companies": {}}
-        return _precomputed_cache
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Most likely a write cut short by a crash; the rest is still good
+                    logger.warning(f"Skipping unreadable line {line_no} in {path}")
+    except FileNotFoundError:
+        pass
+    return entries
+
 
+def _apply_journal(data: dict, entries: list[dict]) -> None:
+    """Replay journal entries onto the results; journaled sections replace stored ones."""
+    companies = data.setdefault("companies", {})
+    for entry in entries:
+        name = entry.get("name")
+        if name and entry.get("result"):
+            result = {**companies.get(name, {}), **entry["result"]}
+            if "links" in entry["result"]:
+                result.pop("error", None)
+            companies[name] = result
 
-def get_precomputed_company_info(company_name: str) -> Optional[dict]:
+
+def _read_results() -> dict:
+    try:
+        with open(_PRECOMPUTED_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def load_precomputed_data(checkpoint=None) -> dict:
+    """
+    The results file with the journal applied ({} companies if neither exists).
+    checkpoint: path of a regeneration checkpoint (see append_precomputed) to apply on top.
     """
-    Get pre-computed company info if available.
+    data = _read_results()
+    if not data:
+        logger.warning(f"Pre-computed results file not found: {PRECOMPUTED_FILE}")
+    _apply_journal(data, _read_journal())
+    if checkpoint:
+        _apply_journal(data, _read_journal(checkpoint))
+    return data
+
 
-    Returns:
-        Dict with 'domain' and 'links' if found, None otherwise.
+def precomputed_files() -> list[str]:
+    """Files whose changes mean the pre-computed results changed (for reload checks)."""
+    return [PRECOMPUTED_FILE, PRECOMPUTED_JOURNAL_FILE]
+
+
+def _write_results(data: dict) -> None:
+    """Write via a temp file + rename so readers never see a partial file"""
+    tmp_path = _PRECOMPUTED_PATH.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    tmp_path.replace(_PRECOMPUTED_PATH)
+
+
+def append_precomputed(name: str, result: dict, checkpoint=None) -> None:
     """
-    data = _load_precomputed()
-    companies = data.get("companies", {})
-
-    # Try exact match first
-    if company_name in companies:
-        result = companies[company_name]
-        if "error" not in result and result.get("links"):
-            logger.info(f"Found pre-computed results for '{company_name}': {len(result.get('links', []))} links")
-            return result
-
-    # Try case-insensitive match
-    company_lower = company_name.lower()
-    for name, result in companies.items():
-        if name.lower() == company_lower:
-            if "error" not in result and result.get("links"):
-                logger.info(f"Found pre-computed results for '{company_name}' (matched '{name}'): {len(result.get('links', []))} links")
-                return result
-
-    logger.info(f"No pre-computed results for '{company_name}'")
-    return None
+    Record a company's pre-computed sections (blocking I/O; safe across workers).
+    checkpoint: append to this file instead of the journal the server replays —
+    regenerate_links.py checkpoints there and folds it in once at the end.
+    """
+    line = json.dumps({"name": name, "result": result, "ts": time.time()}, ensure_ascii=False) + "\n"
+    if checkpoint:
+        with open(checkpoint, 'a', encoding='utf-8') as f:
+            f.write(line)
+        return
+
+    with _lock():
+        with open(_JOURNAL_PATH, 'a', encoding='utf-8') as f:
+            f.write(line)
+            size = f.tell()
+
+    if size >= PRECOMPUTED_JOURNAL_COMPACT_BYTES and not _compacting.locked():
+        threading.Thread(target=compact_precomputed_results, daemon=True).start()
+
+
+def compact_precomputed_results(wait: bool = False, checkpoint=None, metadata: dict = None) -> int:
+    """
+    Fold the journal into the results file. Returns the number of entries applied.
+    If a compaction is already running, returns 0 right away unless `wait` is set.
+    checkpoint: a regeneration checkpoint to fold in after the journal (then deleted);
+    metadata: top-level fields (timestamps, summary) to set in the results file.
+    """
+    if not _compacting.acquire(blocking=wait):
+        return 0
+    try:
+        with _lock(timeout=60):
+            entries = _read_journal()
+            checkpoint_entries = _read_journal(checkpoint) if checkpoint else []
+            if not entries and not checkpoint_entries and not metadata:
+                return 0
+            data = _read_results()
+            _apply_journal(data, entries)
+            _apply_journal(data, checkpoint_entries)
+            data.update(metadata or {})
+            _write_results(data)
+            # Replaying already-applied entries after a crash here is harmless
+            _JOURNAL_PATH.unlink(missing_ok=True)
+            if checkpoint:
+                checkpoint.unlink(missing_ok=True)
+        entries += checkpoint_entries
+        logger.info(f"Compacted {len(entries)} pre-computed journal entries")
+        return len(entries)
+    except Exception as e:
+        logger.error(f"Error compacting pre-computed journal: {e}")
+        return 0
+    finally:
+        _compacting.release()
 
 
-def reload_precomputed():
-    """Force reload of pre-computed results (e.g., after regenerating)."""
-    global _precomputed_cache
-    _precomputed_cache = None
-    _load_precomputed()
+def get_precomputed_journal_stats() -> dict:
+    """Return journal state for debugging"""
+    try:
+        journal_bytes = _JOURNAL_PATH.stat().st_size
+    except FileNotFoundError:
+        journal_bytes = 0
+    return {
+        "journal_bytes": journal_bytes,
+        "compact_at_bytes": PRECOMPUTED_JOURNAL_COMPACT_BYTES,
+        "compacting": _compacting.locked(),
+    }
@@ -0,0 +1,133 @@
+"""
+Pre-generated interview questions per canonical job title.
+
+scripts/generate_question_bank.py builds a pool of behavioral/technical
+questions for every title in data/job_family.json and stores them in
+data/question_bank.json. /generate-questions serves from that pool without
+an LLM call when the submission is just a title or a short/generic posting
+(or when mode="fast"), re-ranking the pool against keywords in the posting.
+"""
+
+import os
+import re
+import json
+import time
+import logging
+
+from app.utils.file_loader import BASE_DIR
+from app.services.question_cache import normalize_job_description
+
+logger = logging.getLogger(__name__)
+
+QUESTION_BANK_PATH = BASE_DIR / os.getenv("QUESTION_BANK_PATH", "data/question_bank.json")
+
+# Submissions with fewer normalized words than this count as "thin" and are
+# answered from the bank in auto mode when a title matches
+THIN_DESCRIPTION_WORDS = int(os.getenv("QUESTION_BANK_THIN_WORDS", "40"))
+
+QUESTIONS_PER_SECTION = 5
+SECTIONS = ("behavioral", "technical")
+
+_STAT_INTERVAL = 5.0
+
+_STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has', 'have', 'in', 'is', 'it',
+    'of', 'on', 'or', 'our', 'that', 'the', 'their', 'this', 'to', 'was', 'we', 'will', 'with', 'you',
+    'your', 'role', 'job', 'position', 'team', 'work', 'working', 'experience', 'years', 'skills',
+    'ability', 'strong', 'looking', 'candidate', 'responsibilities', 'requirements', 'including',
+    'describe', 'time', 'when', 'how', 'what', 'tell', 'about', 'would', 'did', 'do', 'can', 'us',
+}
+
+_bank: dict | None = None
+_bank_mtime: float | None = None
+_last_stat = 0.0
+# Normalized title → canonical title, longest first for containment matching
+_title_index: list[tuple[str, str]] = []
+
+
+def _load_bank() -> dict:
+    """Return the bank's titles dict, reloading the file when it changes (stat throttled)."""
+    global _bank, _bank_mtime, _last_stat, _title_index
+    now = time.monotonic()
+    if _bank is not None and now - _last_stat < _STAT_INTERVAL:
+        return _bank
+    _last_stat = now
+
+    try:
+        mtime = QUESTION_BANK_PATH.stat().st_mtime
+    except FileNotFoundError:
+        mtime = None
+
+    if mtime != _bank_mtime or _bank is None:
+        _bank_mtime = mtime
+        _bank = {}
+        if mtime is not None:
+            try:
+                with open(QUESTION_BANK_PATH, 'r', encoding='utf-8') as f:
+                    _bank = json.load(f).get('titles', {})
+                logger.info(f"Loaded question bank with {len(_bank)} titles")
+            except Exception as e:
+                logger.error(f"Error loading question bank: {e}")
+        _title_index = sorted(
+            ((normalize_job_description(title), title) for title in _bank),
+            key=lambda item: len(item[0]), reverse=True
+        )
+    return _bank
+
+
+def _keywords(text: str) -> set[str]:
+    return {w for w in text.split() if len(w) > 2 and w not in _STOPWORDS}
+
+
+def is_thin_description(jd: str) -> bool:
+    """True for title-only or very short postings."""
+    return len(normalize_job_description(jd).split()) < THIN_DESCRIPTION_WORDS
+
+
+def match_job_title(text: str) -> str | None:
+    """
+    Canonical title for a submitted title or posting: exact (normalized) match
+    first, then the longest canonical title appearing in the first line.
+    """
+    if not _load_bank() or not text.strip():
+        return None
+    normalized = normalize_job_description(text)
+    for key, title in _title_index:
+        if key == normalized:
+            return title
+
+    first_line = f" {normalize_job_description(text.strip().splitlines()[0])} "
+    for key, title in _title_index:
+        if key and f" {key} " in first_line:
+            return title
+    return None
+
+
+def get_bank_questions(jd: str, job_title: str = None) -> dict | None:
+    """
+    Stored question set for the role, re-ranked so questions sharing keywords
+    with the posting come first. None if no canonical title matches.
+    """
+    bank = _load_bank()
+    title = match_job_title(job_title) if job_title else None
+    title = title or match_job_title(jd)
+    if not title:
+        return None
+
+    entry = bank[title]
+    keywords = _keywords(normalize_job_description(jd)) - _keywords(normalize_job_description(title))
+    result = {}
+    for section in SECTIONS:
+        pool = entry.get(section, [])
+        # Stable sort keeps the generator's order among equally relevant questions
+        ranked = sorted(pool, key=lambda q: -len(keywords & _keywords(normalize_job_description(q))))
+        result[section] = ranked[:QUESTIONS_PER_SECTION]
+
+    logger.info(f"Question bank hit for '{title}'")
+    return result
+
+
+def get_question_bank_stats() -> dict:
+    """Return bank statistics for debugging"""
+    bank = _load_bank()
+    return {"path": str(QUESTION_BANK_PATH), "titles": len(bank), "loaded_mtime": _bank_mtime}
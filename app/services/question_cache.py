@@ -0,0 +1,300 @@
+"""
+Similarity-aware cache for /api/generate-questions.
+
+Users resubmit the same postings with small whitespace/boilerplate changes, so
+lookups go in two steps:
+1. Exact: SHA-256 of the normalized job description
+2. Near-duplicate: 64-bit SimHash over word 3-shingles. The hash is split
+   into 8 × 8-bit bands stored as indexed columns, so any stored posting
+   within SIMHASH_MAX_DISTANCE bits shares at least one band and is found
+   with an index lookup instead of a scan. Candidates are then verified by
+   word-set Jaccard similarity, so postings that share boilerplate but ask
+   for different skills don't reuse each other's questions.
+
+Entries live in SQLite (shared by all workers, survives restarts) and are
+evicted by TTL and least-recent use beyond QUESTION_CACHE_MAX_ENTRIES.
+Lookups and writes block on SQLite, so routes run them with asyncio.to_thread;
+each thread keeps one open connection. Hits only touch memory: last-use times
+and hit counts are written back in one batch at most every
+_TOUCH_FLUSH_INTERVAL seconds (and before eviction), so a cache hit doesn't
+take the write lock.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+
+from app.utils.file_loader import BASE_DIR
+from app.utils.sqlite_store import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+_CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() != "false"
+_QUESTION_CACHE_ENABLED = _CACHE_ENABLED and os.getenv("QUESTION_CACHE_ENABLED", "true").lower() != "false"
+
+QUESTION_CACHE_PATH = BASE_DIR / os.getenv("QUESTION_CACHE_PATH", "data/question_cache.sqlite3")
+QUESTION_CACHE_TTL = int(os.getenv("QUESTION_CACHE_TTL", str(30 * 86400)))
+QUESTION_CACHE_MAX_ENTRIES = int(os.getenv("QUESTION_CACHE_MAX_ENTRIES", "5000"))
+
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 8
+SIMHASH_MAX_DISTANCE = 6
+NEAR_DUP_MIN_JACCARD = 0.95
+# Near-duplicate matching is unreliable for very short texts; exact match only
+MIN_TOKENS_FOR_NEAR_DUP = 30
+
+_BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+_EVICT_EVERY = 100
+_TOUCH_FLUSH_INTERVAL = 60
+
+# Sentences containing these are boilerplate that varies between reposts
+_BOILERPLATE_MARKERS = (
+    'equal opportunity', 'eeo', 'without regard to', 'reasonable accommodation',
+    'e-verify', 'privacy notice', 'background check', 'drug-free', 'drug free',
+    'apply now', 'click apply', 'follow us', 'pay transparency',
+)
+
+_schema_ready = False
+_local = threading.local()
+_writes = 0
+# fingerprint -> [last used at, hits] not yet written back
+_pending_touches: dict[str, list] = {}
+_touch_lock = threading.Lock()
+_last_touch_flush = 0.0
+_stats = {"exact_hits": 0, "near_hits": 0, "misses": 0, "writes": 0, "errors": 0}
+
+
+def normalize_job_description(jd: str) -> str:
+    """Lowercase, drop URLs/emails/boilerplate sentences, strip punctuation, collapse whitespace."""
+    text = jd.lower()
+    text = re.sub(r'https?://\S+|www\.\S+|\S+@\S+', ' ', text)
+    sentences = re.split(r'(?<=[.!?])\s+|\n+', text)
+    text = ' '.join(s for s in sentences if not any(m in s for m in _BOILERPLATE_MARKERS))
+    text = re.sub(r'[^a-z0-9+#]+', ' ', text)
+    return ' '.join(text.split())
+
+
+def fingerprint(normalized: str) -> str:
+    return hashlib.sha256(normalized.encode()).hexdigest()[:32]
+
+
+def simhash(normalized: str) -> int:
+    """64-bit SimHash over word 3-shingles."""
+    tokens = normalized.split()
+    shingles = [' '.join(tokens[i:i + 3]) for i in range(max(1, len(tokens) - 2))]
+    counts = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'big')
+        for bit in range(SIMHASH_BITS):
+            counts[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit in range(SIMHASH_BITS) if counts[bit] > 0)
+
+
+def _bands(value: int) -> list[int]:
+    mask = (1 << _BAND_BITS) - 1
+    return [(value >> (i * _BAND_BITS)) & mask for i in range(SIMHASH_BANDS)]
+
+
+def _to_signed(value: int) -> int:
+    """SQLite integers are signed 64-bit."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _to_unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+def _jaccard(a: str, b: str) -> float:
+    words_a, words_b = set(a.split()), set(b.split())
+    union = words_a | words_b
+    return len(words_a & words_b) / len(union) if union else 1.0
+
+
+def _connect():
+    """This thread's connection (opened on first use)."""
+    global _schema_ready
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        return conn
+    conn = connect_sqlite(QUESTION_CACHE_PATH)
+    _local.conn = conn
+    if not _schema_ready:
+        band_columns = ''.join(f", b{i} INTEGER NOT NULL" for i in range(SIMHASH_BANDS))
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS question_cache ("
+            " fingerprint TEXT PRIMARY KEY,"
+            " simhash INTEGER NOT NULL,"
+            " tokens INTEGER NOT NULL"
+            f"{band_columns},"
+            " normalized TEXT NOT NULL,"
+            " questions TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_used_at REAL NOT NULL,"
+            " hits INTEGER NOT NULL DEFAULT 0)"
+        )
+        for i in range(SIMHASH_BANDS):
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_question_cache_b{i} ON question_cache (b{i})")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_question_cache_used ON question_cache (last_used_at)")
+        conn.commit()
+        _schema_ready = True
+    return conn
+
+
+def _reset_connection() -> None:
+    """Drop this thread's connection after an error so the next call reopens it."""
+    conn = getattr(_local, "conn", None)
+    _local.conn = None
+    if conn is not None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def _record_touch(key: str, now: float) -> None:
+    with _touch_lock:
+        touch = _pending_touches.setdefault(key, [now, 0])
+        touch[0] = now
+        touch[1] += 1
+
+
+def _flush_touches(conn, now: float, force: bool = False) -> None:
+    """Write buffered last-use times and hit counts in one transaction."""
+    global _pending_touches, _last_touch_flush
+    with _touch_lock:
+        if not _pending_touches or (not force and now - _last_touch_flush < _TOUCH_FLUSH_INTERVAL):
+            return
+        touches, _pending_touches = _pending_touches, {}
+        _last_touch_flush = now
+    with conn:
+        conn.executemany(
+            "UPDATE question_cache SET last_used_at = MAX(last_used_at, ?), hits = hits + ? WHERE fingerprint = ?",
+            [(used_at, hits, key) for key, (used_at, hits) in touches.items()]
+        )
+
+
+def get_cached_questions(jd: str) -> dict | None:
+    """Return the stored question set for `jd` or a near-identical posting, else None."""
+    if not _QUESTION_CACHE_ENABLED:
+        return None
+
+    normalized = normalize_job_description(jd)
+    if not normalized:
+        return None
+    key = fingerprint(normalized)
+    now = time.time()
+    min_created = now - QUESTION_CACHE_TTL
+
+    try:
+        conn = _connect()
+        row = conn.execute(
+            "SELECT fingerprint, questions FROM question_cache WHERE fingerprint = ? AND created_at >= ?",
+            (key, min_created)
+        ).fetchone()
+        kind = "exact_hits"
+
+        if row is None and len(normalized.split()) >= MIN_TOKENS_FOR_NEAR_DUP:
+            value = simhash(normalized)
+            band_clause = " OR ".join(f"b{i} = ?" for i in range(SIMHASH_BANDS))
+            candidates = conn.execute(
+                f"SELECT fingerprint, questions, simhash, normalized FROM question_cache"
+                f" WHERE ({band_clause}) AND created_at >= ? AND tokens >= ?",
+                (*_bands(value), min_created, MIN_TOKENS_FOR_NEAR_DUP)
+            ).fetchall()
+            best = None
+            for fp, questions, stored, stored_text in candidates:
+                distance = bin(value ^ _to_unsigned(stored)).count('1')
+                if distance > SIMHASH_MAX_DISTANCE or (best and distance >= best[0]):
+                    continue
+                if _jaccard(normalized, stored_text) >= NEAR_DUP_MIN_JACCARD:
+                    best = (distance, fp, questions)
+            if best:
+                row = (best[1], best[2])
+                kind = "near_hits"
+
+        if row is None:
+            _stats["misses"] += 1
+            return None
+    except Exception as e:
+        _stats["errors"] += 1
+        _reset_connection()
+        logger.warning(f"Question cache read failed: {e}")
+        return None
+
+    # Last-use bookkeeping is buffered; a failed flush doesn't lose the hit
+    _record_touch(row[0], now)
+    try:
+        _flush_touches(conn, now)
+    except Exception as e:
+        _reset_connection()
+        logger.warning(f"Question cache touch flush failed: {e}")
+
+    _stats[kind] += 1
+    logger.info(f"Question cache {kind.replace('_hits', '')} hit ({key[:8]})")
+    return json.loads(row[1])
+
+
+def set_cached_questions(jd: str, questions: dict) -> None:
+    """Store the question set for `jd`. Never raises."""
+    global _writes
+    if not _QUESTION_CACHE_ENABLED:
+        return
+
+    normalized = normalize_job_description(jd)
+    if not normalized:
+        return
+    value = simhash(normalized)
+    now = time.time()
+
+    try:
+        conn = _connect()
+        with conn:
+            band_names = ''.join(f", b{i}" for i in range(SIMHASH_BANDS))
+            placeholders = ", ?" * SIMHASH_BANDS
+            conn.execute(
+                f"INSERT OR REPLACE INTO question_cache"
+                f" (fingerprint, simhash, tokens{band_names}, normalized, questions, created_at, last_used_at)"
+                f" VALUES (?, ?, ?{placeholders}, ?, ?, ?, ?)",
+                (fingerprint(normalized), _to_signed(value), len(normalized.split()), *_bands(value),
+                 normalized, json.dumps(questions, ensure_ascii=False), now, now)
+            )
+            _writes += 1
+            evict = _writes % _EVICT_EVERY == 0
+        if evict:
+            # Eviction is by last use, so write the buffered touches first
+            _flush_touches(conn, now, force=True)
+            with conn:
+                _evict(conn, now)
+        _stats["writes"] += 1
+    except Exception as e:
+        _stats["errors"] += 1
+        _reset_connection()
+        logger.warning(f"Question cache write failed: {e}")
+
+
+def _evict(conn, now: float) -> None:
+    """Drop expired entries, then least-recently-used ones beyond the size cap."""
+    conn.execute("DELETE FROM question_cache WHERE created_at < ?", (now - QUESTION_CACHE_TTL,))
+    conn.execute(
+        "DELETE FROM question_cache WHERE fingerprint IN ("
+        " SELECT fingerprint FROM question_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+        (QUESTION_CACHE_MAX_ENTRIES,)
+    )
+
+
+def get_question_cache_stats() -> dict:
+    """Return cache statistics for debugging"""
+    stats = dict(_stats, enabled=_QUESTION_CACHE_ENABLED)
+    if not _QUESTION_CACHE_ENABLED:
+        return stats
+    try:
+        stats["entries"] = _connect().execute("SELECT COUNT(*) FROM question_cache").fetchone()[0]
+        stats["pending_touches"] = len(_pending_touches)
+    except Exception as e:
+        _reset_connection()
+        logger.warning(f"Question cache stats failed: {e}")
+    return stats
@@ -0,0 +1,179 @@
+"""
+Autocomplete answers for companies and job titles.
+
+suggest() is the live path: prefix + substring matches ranked by popularity,
+plus typo matches for companies. Most traffic is 1–3 character prefixes, so
+the answers for every such prefix of an indexed name are precomputed into a
+table of pre-serialized JSON bodies with ETags; routes serve those with
+Cache-Control so browsers/CDNs can revalidate with a 304.
+
+A table is tied to the index object + its version and the popularity
+version. When either changes the table is rebuilt in a background thread;
+until it's ready, requests use the live path.
+
+The client index packages names, aliases and titles into a compact,
+content-versioned JSON document (plus a gzip copy) that the browser
+downloads once and matches against locally. The version depends only on the
+data files, so every worker serves the same one (and builds it on request if
+the manifest came from another worker); the per-worker popularity order is
+sent with the manifest instead.
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import logging
+import threading
+
+from app.services.data_registry import get_company_directory, get_job_title_index
+from app.services.popularity import rank_suggestions, get_popularity_version, popular_names
+
+logger = logging.getLogger(__name__)
+
+SUGGESTION_LIMIT = 10
+SHORT_PREFIX_MAX_LENGTH = 3
+
+# Per-request time budget for typo-tolerant matching
+FUZZY_BUDGET_MS = float(os.getenv("AUTOCOMPLETE_FUZZY_BUDGET_MS", "10"))
+
+
+def _index_for(kind: str):
+    return get_company_directory().prefix if kind == "company" else get_job_title_index()
+
+
+def _ranked(kind: str, index, query: str) -> list[str]:
+    """Prefix matches first, then contains; popular names first within each."""
+    prefix = index.starts_with(query, limit=SUGGESTION_LIMIT)
+    contains = index.contains(query, limit=SUGGESTION_LIMIT, exclude=set(prefix))
+    return rank_suggestions(kind, query, prefix, contains, limit=SUGGESTION_LIMIT)
+
+
+def suggest(kind: str, query: str) -> list[str]:
+    """Live autocomplete answer for `query`."""
+    if kind == "company":
+        directory = get_company_directory()
+        results = _ranked(kind, directory.prefix, query)
+        if len(results) < SUGGESTION_LIMIT:
+            fuzzy = directory.fuzzy.search(
+                query, limit=SUGGESTION_LIMIT - len(results), prefix=True,
+                budget_ms=FUZZY_BUDGET_MS, exclude=set(results)
+            )
+            results += [name for name, _ in fuzzy]
+        return results
+    return _ranked(kind, get_job_title_index(), query)
+
+
+class _ShortPrefixTable:
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.answers: dict[str, tuple[bytes, str]] = {}
+        self.key = None
+        self.building = False
+        # Keep the index alive so its id() can't be reused by a new one
+        self.index = None
+
+    def _current_key(self, index) -> tuple:
+        return (id(index), index.version, get_popularity_version())
+
+    def get(self, query: str) -> tuple[bytes, str] | None:
+        index = _index_for(self.kind)
+        key = self._current_key(index)
+        if key != self.key:
+            if not self.building:
+                self.building = True
+                threading.Thread(target=self._build, args=(index, key), daemon=True).start()
+            return None
+        return self.answers.get(query.lower())
+
+    def _build(self, index, key: tuple) -> None:
+        try:
+            answers = {}
+            for prefix in index.key_prefixes(SHORT_PREFIX_MAX_LENGTH):
+                body = json.dumps(_ranked(self.kind, index, prefix), ensure_ascii=False).encode()
+                answers[prefix] = (body, '"' + hashlib.sha1(body).hexdigest()[:16] + '"')
+            self.answers, self.key, self.index = answers, key, index
+            logger.info(f"Built {self.kind} short-prefix table ({len(answers)} prefixes)")
+        except Exception as e:
+            logger.error(f"Error building {self.kind} short-prefix table: {e}")
+        finally:
+            self.building = False
+
+
+_tables = {"company": _ShortPrefixTable("company"), "job_title": _ShortPrefixTable("job_title")}
+
+
+def short_prefix_answer(kind: str, query: str) -> tuple[bytes, str] | None:
+    """(JSON body, ETag) for a precomputed 1–3 character query, or None."""
+    if not 0 < len(query) <= SHORT_PREFIX_MAX_LENGTH:
+        return None
+    return _tables[kind].get(query)
+
+
+# Client-side index: popular names shipped per kind
+CLIENT_INDEX_POPULAR = int(os.getenv("CLIENT_INDEX_POPULAR", "200"))
+# Keep the previous build so clients holding the old manifest still load
+_CLIENT_INDEX_KEEP = 2
+
+# version -> (JSON body, gzipped body, company ids, job title ids)
+_client_indexes: dict[str, tuple[bytes, bytes, dict, dict]] = {}
+_client_index_key = None
+_client_index_version = None
+_client_index_lock = threading.Lock()
+
+
+def _build_client_index() -> tuple[str, tuple[bytes, bytes, dict, dict]]:
+    # Only data every worker shares goes in, so all workers serve the same
+    # version for the same files; popularity (per worker) is in the manifest
+    directory = get_company_directory()
+    companies = directory.companies
+    titles = get_job_title_index().names()
+    company_ids = {name: i for i, name in enumerate(companies)}
+    title_ids = {name: i for i, name in enumerate(titles)}
+
+    document = {
+        "companies": companies,
+        "aliases": [[alias, company_ids[name]] for alias, name in directory.aliases()],
+        "job_titles": titles,
+    }
+    body = json.dumps(document, ensure_ascii=False, separators=(',', ':')).encode()
+    version = hashlib.sha1(body).hexdigest()[:16]
+    return version, (body, gzip.compress(body, compresslevel=9), company_ids, title_ids)
+
+
+def client_index_version() -> str:
+    """Current client index version, rebuilding the document if the data changed."""
+    global _client_index_key, _client_index_version
+    company_index = get_company_directory().prefix
+    title_index = get_job_title_index()
+    key = (company_index, company_index.version, title_index, title_index.version)
+    if key != _client_index_key:
+        with _client_index_lock:
+            if key != _client_index_key:
+                version, built = _build_client_index()
+                if version not in _client_indexes:
+                    _client_indexes[version] = built
+                    while len(_client_indexes) > _CLIENT_INDEX_KEEP:
+                        _client_indexes.pop(next(iter(_client_indexes)))
+                    logger.info(f"Built client autocomplete index {version} "
+                                f"({len(built[0]) // 1024} KB, {len(built[1]) // 1024} KB gzipped)")
+                _client_index_key, _client_index_version = key, version
+    return _client_index_version
+
+
+def client_index(version: str) -> tuple[bytes, bytes] | None:
+    """(JSON body, gzipped body) for a served version, or None if it's unknown/expired."""
+    document = _client_indexes.get(version)
+    # The manifest may have come from another worker: build the current version here
+    if document is None and version == client_index_version():
+        document = _client_indexes.get(version)
+    return document[:2] if document else None
+
+
+def client_index_popular(version: str) -> dict:
+    """Most popular names per kind, as indexes into that version's lists (for the manifest)."""
+    _, _, company_ids, title_ids = _client_indexes[version]
+    return {
+        "company": [company_ids[n] for n in popular_names("company", CLIENT_INDEX_POPULAR) if n in company_ids],
+        "job_title": [title_ids[n] for n in popular_names("job_title", CLIENT_INDEX_POPULAR) if n in title_ids],
+    }
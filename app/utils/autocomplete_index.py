@@ -0,0 +1,291 @@
+"""
+In-memory prefix / substring index for autocomplete.
+
+Built once per name list, so a keystroke costs a bisect plus a walk over at
+most `limit` results instead of lowercasing and scanning every name:
+- prefix: sorted array of lowercase keys, bisect to the start of the range
+- contains: n-gram postings (1-, 2- and 3-grams) holding keys in sorted
+  order; queries of 3+ chars scan the rarest trigram's postings and verify
+Both support add() for names registered after the index was built.
+
+Aliases (e.g. also_known_as from company_info.json) are indexed as extra
+keys that resolve to their canonical name.
+
+FuzzyIndex adds typo tolerance ("Goldmann Sachs", "Deloite"): padded word
+trigram postings pick candidates, which are then scored by bounded edit
+distance within a per-query time budget. rapidfuzz is used for the distance
+when installed; otherwise a pure-Python banded Levenshtein.
+"""
+
+__all__ = ['PrefixIndex', 'FuzzyIndex', 'bounded_levenshtein']
+
+import re
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+
+try:
+    from rapidfuzz.distance import Levenshtein as _rf_levenshtein
+except ImportError:
+    _rf_levenshtein = None
+
+_MAX_GRAM = 3
+
+
+class PrefixIndex:
+    def __init__(self, names: list[str], aliases: dict[str, list[str]] = None):
+        entries = {}
+        for name in names:
+            entries.setdefault(name.lower(), []).append(name)
+        for name, alias_list in (aliases or {}).items():
+            for alias in alias_list or []:
+                targets = entries.setdefault(alias.lower(), [])
+                if name not in targets:
+                    targets.append(name)
+
+        self._keys = sorted(entries)
+        self._names = entries
+        self._exact = {name.lower(): name for name in names}
+        # Bumped by add(); lets derived caches tell the index changed
+        self.version = 0
+
+        # Postings are appended in key order, so each list stays sorted
+        self._postings: dict[str, list[str]] = {}
+        for key in self._keys:
+            for gram in self._grams(key):
+                self._postings.setdefault(gram, []).append(key)
+
+    @staticmethod
+    def _grams(key: str) -> set[str]:
+        return {key[i:i + n] for n in range(1, _MAX_GRAM + 1) for i in range(len(key) - n + 1)}
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    def add(self, name: str, aliases: list[str] = ()) -> None:
+        """Index a new name (and its aliases) in place, keeping every list sorted."""
+        self._exact.setdefault(name.lower(), name)
+        for key in [name.lower()] + [alias.lower() for alias in aliases or []]:
+            targets = self._names.get(key)
+            if targets is None:
+                targets = self._names[key] = []
+                insort(self._keys, key)
+                for gram in self._grams(key):
+                    insort(self._postings.setdefault(gram, []), key)
+            if name not in targets:
+                targets.append(name)
+        self.version += 1
+
+    def names(self) -> list[str]:
+        """Indexed canonical names (aliases excluded), in insertion order."""
+        return list(self._exact.values())
+
+    def key_prefixes(self, max_length: int) -> set[str]:
+        """Every prefix (up to max_length chars) of an indexed key."""
+        return {key[:n] for key in self._keys for n in range(1, min(max_length, len(key)) + 1)}
+
+    def lookup(self, query: str) -> str | None:
+        """Canonical name equal to `query` (case-insensitive), aliases excluded."""
+        return self._exact.get(query.strip().lower())
+
+    def keys_starting_with(self, query: str):
+        """Lowercase keys (aliases included) starting with `query`, alphabetically."""
+        query = query.lower()
+        for i in range(bisect_left(self._keys, query), len(self._keys)):
+            key = self._keys[i]
+            if not key.startswith(query):
+                break
+            yield key
+
+    def keys_containing(self, query: str):
+        """Lowercase keys (aliases included) containing `query` but not starting with it, alphabetically."""
+        query = query.lower()
+        if not query:
+            return
+
+        if len(query) <= _MAX_GRAM:
+            candidates = self._postings.get(query, [])
+            verify = False
+        else:
+            grams = [query[i:i + _MAX_GRAM] for i in range(len(query) - _MAX_GRAM + 1)]
+            candidates = min((self._postings.get(g, []) for g in grams), key=len)
+            verify = True
+
+        for key in candidates:
+            if key.startswith(query) or (verify and query not in key):
+                continue
+            yield key
+
+    def starts_with(self, query: str, limit: int = 10, exclude_exact: bool = False) -> list[str]:
+        """Names (or aliases) starting with `query`, in alphabetical order of the key."""
+        query = query.lower()
+        results = []
+        seen = set()
+        for key in self.keys_starting_with(query):
+            if exclude_exact and key == query:
+                continue
+            if self._collect(key, results, seen, limit):
+                break
+        return results
+
+    def contains(self, query: str, limit: int = 10, exclude: set = None) -> list[str]:
+        """Names containing `query` but not starting with it, in alphabetical order of the key."""
+        results = []
+        seen = set(exclude or ())
+        for key in self.keys_containing(query):
+            if self._collect(key, results, seen, limit):
+                break
+        return results
+
+    def search(self, query: str, limit: int = 10) -> list[str]:
+        """Prefix matches first, then substring matches."""
+        results = self.starts_with(query, limit)
+        if len(results) < limit:
+            results += self.contains(query, limit - len(results), exclude=set(results))
+        return results
+
+    def _collect(self, key: str, results: list, seen: set, limit: int) -> bool:
+        """Append the key's names to results; True once `limit` is reached."""
+        for name in self._names[key]:
+            if name not in seen:
+                seen.add(name)
+                results.append(name)
+                if len(results) >= limit:
+                    return True
+        return False
+
+
+def bounded_levenshtein(a: str, b: str, max_distance: int) -> int:
+    """Edit distance between a and b, or max_distance + 1 if it exceeds max_distance."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if _rf_levenshtein is not None:
+        return _rf_levenshtein.distance(a, b, score_cutoff=max_distance)
+
+    # Only cells within max_distance of the diagonal can stay under the bound
+    too_far = max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        lo, hi = max(1, i - max_distance), min(len(b), i + max_distance)
+        current = [too_far] * (len(b) + 1)
+        current[0] = i if i <= max_distance else too_far
+        for j in range(lo, hi + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+        if min(current[lo - 1:hi + 1]) > max_distance:
+            return too_far
+        previous = current
+    return min(previous[len(b)], too_far)
+
+
+def _fuzzy_key(text: str) -> str:
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text.lower()).split())
+
+
+def _trigrams(key: str) -> set[str]:
+    grams = set()
+    for word in key.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class FuzzyIndex:
+    """
+    Typo-tolerant lookup over names + aliases.
+
+    search() returns [(name, distance)] best-first. Allowed distance scales
+    with query length (1 per FUZZY_CHARS_PER_EDIT chars, at most MAX_EDITS);
+    with prefix=True a query also matches the start of a longer name, for
+    as-you-type suggestions. Scoring stops when budget_ms is used up.
+    """
+
+    MIN_QUERY_LENGTH = 4
+    # Fuzzy prefix matching of shorter queries mostly finds unrelated names
+    MIN_PREFIX_LENGTH = 6
+    FUZZY_CHARS_PER_EDIT = 4
+    MAX_EDITS = 3
+    MAX_CANDIDATES = 200
+
+    def __init__(self, names: list[str], aliases: dict[str, list[str]] = None):
+        entries = {}
+        for name in names:
+            entries.setdefault(_fuzzy_key(name), []).append(name)
+        for name, alias_list in (aliases or {}).items():
+            for alias in alias_list or []:
+                targets = entries.setdefault(_fuzzy_key(alias), [])
+                if name not in targets:
+                    targets.append(name)
+        entries.pop('', None)
+
+        self._keys = list(entries)
+        self._key_ids = {key: key_id for key_id, key in enumerate(self._keys)}
+        self._names = [entries[key] for key in self._keys]
+        self._postings: dict[str, list[int]] = {}
+        for key_id, key in enumerate(self._keys):
+            for gram in _trigrams(key):
+                self._postings.setdefault(gram, []).append(key_id)
+
+    def add(self, name: str, aliases: list[str] = ()) -> None:
+        """Index a new name (and its aliases) in place."""
+        for key in [_fuzzy_key(name)] + [_fuzzy_key(alias) for alias in aliases or []]:
+            if not key:
+                continue
+            key_id = self._key_ids.get(key)
+            if key_id is None:
+                key_id = self._key_ids[key] = len(self._keys)
+                self._keys.append(key)
+                self._names.append([])
+                for gram in _trigrams(key):
+                    self._postings.setdefault(gram, []).append(key_id)
+            if name not in self._names[key_id]:
+                self._names[key_id].append(name)
+
+    def search(self, query: str, limit: int = 5, prefix: bool = False,
+               budget_ms: float = 10.0, exclude: set = None) -> list[tuple[str, int]]:
+        deadline = time.perf_counter() + budget_ms / 1000
+        query = _fuzzy_key(query)
+        if len(query) < self.MIN_QUERY_LENGTH:
+            return []
+        max_distance = min(self.MAX_EDITS, max(1, len(query) // self.FUZZY_CHARS_PER_EDIT))
+
+        # Candidates share enough trigrams with the query: one edit breaks at most 3,
+        # and at least a third must survive to be worth scoring
+        grams = _trigrams(query)
+        min_shared = max(1, len(grams) - 3 * max_distance, len(grams) // 3)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+        candidates = [(count, key_id) for key_id, count in shared.items() if count >= min_shared]
+        candidates.sort(reverse=True)
+
+        scored = []
+        for count, key_id in candidates[:self.MAX_CANDIDATES]:
+            if time.perf_counter() > deadline:
+                break
+            key = self._keys[key_id]
+            distance = bounded_levenshtein(query, key, max_distance)
+            if prefix and distance > max_distance and len(key) > len(query) >= self.MIN_PREFIX_LENGTH:
+                # Typo in a partially typed name: compare against the key's start,
+                # one edit stricter since short prefixes match too easily
+                prefix_distance = max(1, max_distance - 1)
+                distance = min(
+                    bounded_levenshtein(query, key[:n], prefix_distance)
+                    for n in range(len(query) - 1, len(query) + 2)
+                )
+                if distance > prefix_distance:
+                    continue
+            if distance <= max_distance:
+                scored.append((distance, -count, key, key_id))
+
+        scored.sort()
+        results = []
+        seen = set(exclude or ())
+        for distance, _, _, key_id in scored:
+            for name in self._names[key_id]:
+                if name not in seen:
+                    seen.add(name)
+                    results.append((name, distance))
+            if len(results) >= limit:
+                break
+        return results[:limit]
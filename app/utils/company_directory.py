@@ -0,0 +1,144 @@
+"""
+Company lookup indexes for autocomplete and /company-confirm.
+
+Built once from top_companies.json + company_info.json so a confirm request
+is a handful of dict lookups instead of rescanning every company:
+- lowercase name → canonical name
+- acronym (initials) → companies
+- alias / related name → companies whose company_info lists it
+- word → companies, for partial multi-word matches
+plus the prefix/substring and fuzzy indexes from autocomplete_index.
+Confirm suggestions keep the curated order of top_companies.json:
+names_starting_with / names_containing rank matches by list position.
+A directory is immutable once built; the live instance is owned by
+app.services.data_registry, which swaps in a rebuilt one when companies
+are added.
+"""
+
+__all__ = ['CompanyDirectory', 'company_initials']
+
+import heapq
+
+from app.utils.autocomplete_index import PrefixIndex, FuzzyIndex
+
+
+def company_initials(name: str) -> str:
+    """First letter of each word, uppercased ("Texas Instruments" → "TI")."""
+    words = name.replace('&', ' ').replace('-', ' ').split()
+    return ''.join(word[0].upper() for word in words if word)
+
+
+def _words(name: str) -> set[str]:
+    return set(name.lower().replace('&', ' ').replace('-', ' ').split())
+
+
+class CompanyDirectory:
+    def __init__(self, companies: list[str], company_info: dict):
+        self.companies = list(companies)
+        self.company_info = dict(company_info)
+        known = set(self.companies)
+        aliases = {
+            name: info.get("also_known_as", [])
+            for name, info in self.company_info.items() if name in known
+        }
+        self._info_keys = {name.lower(): name for name in self.company_info}
+        self.prefix = PrefixIndex(self.companies, aliases)
+        self.fuzzy = FuzzyIndex(self.companies, aliases)
+
+        # Ordinal = position in companies; keeps word-match results in list order
+        self._ordinal = {}
+        self._acronyms: dict[str, list[str]] = {}
+        self._words: dict[str, list[tuple[int, str]]] = {}
+        self._listed_by: dict[str, list[str]] = {}
+        for name in self.companies:
+            self._index_name(name)
+        for name, info in self.company_info.items():
+            self._index_info(name, info)
+
+    def __len__(self) -> int:
+        return len(self.companies)
+
+    def _index_name(self, name: str) -> None:
+        if name in self._ordinal:
+            return
+        ordinal = len(self._ordinal)
+        self._ordinal[name] = ordinal
+        self._acronyms.setdefault(company_initials(name), []).append(name)
+        for word in _words(name):
+            self._words.setdefault(word, []).append((ordinal, name))
+
+    def _index_info(self, name: str, info: dict) -> None:
+        """Register `name` under every alias/related name its entry lists (exact strings)."""
+        canonical = self.prefix.lookup(name)
+        if not canonical:
+            return
+        for listed in set(info.get("related", [])) | set(info.get("also_known_as", [])):
+            names = self._listed_by.setdefault(listed, [])
+            if canonical not in names:
+                names.append(canonical)
+
+    def aliases(self) -> list[tuple[str, str]]:
+        """(alias, company) pairs from also_known_as, for companies in the list."""
+        return [
+            (alias, name)
+            for name in self.companies
+            for alias in self.company_info.get(name, {}).get("also_known_as", [])
+        ]
+
+    def lookup(self, name: str) -> str | None:
+        """Canonical company name for a case-insensitive exact match."""
+        return self.prefix.lookup(name)
+
+    def is_known(self, name: str) -> bool:
+        """True if the company has a company_info entry (case-insensitive)."""
+        return name.strip().lower() in self._info_keys
+
+    def info(self, name: str) -> dict:
+        return self.company_info.get(name, {})
+
+    def by_acronym(self, query: str) -> list[str]:
+        """Companies whose initials equal `query` (IBM, PwC, ibm all work)."""
+        return list(self._acronyms.get(query.strip().upper(), []))
+
+    def listed_by(self, query: str) -> list[str]:
+        """Companies whose company_info lists `query` as related or also_known_as."""
+        return list(self._listed_by.get(query.strip(), []))
+
+    def _in_list_order(self, keys, limit: int, exclude: set) -> list[str]:
+        """Companies whose own name is one of `keys` (aliases skipped), first `limit` in list order."""
+        ranked = (
+            (self._ordinal[name], name)
+            for name in map(self.prefix.lookup, keys)
+            if name and name not in exclude
+        )
+        return [name for _, name in heapq.nsmallest(limit, ranked)]
+
+    def names_starting_with(self, query: str, limit: int = 5, exclude: set = None) -> list[str]:
+        """Companies whose name starts with `query`, in list order (aliases not matched)."""
+        return self._in_list_order(self.prefix.keys_starting_with(query), limit, set(exclude or ()))
+
+    def names_containing(self, query: str, limit: int = 3, exclude: set = None) -> list[str]:
+        """Companies whose name contains `query` but doesn't start with it, in list order."""
+        return self._in_list_order(self.prefix.keys_containing(query), limit, set(exclude or ()))
+
+    def word_matches(self, query: str, limit: int = 2) -> list[str]:
+        """
+        Companies sharing a word with a multi-word query but not matching it
+        as a prefix/substring, in list order.
+        """
+        query_lower = query.strip().lower()
+        query_words = set(query_lower.split())
+        if len(query_words) < 2:
+            return []
+
+        postings = [self._words.get(word, []) for word in query_words]
+        results = []
+        for _, name in heapq.merge(*postings):
+            c_lower = name.lower()
+            if name in results or query_lower in c_lower:
+                continue
+            results.append(name)
+            if len(results) >= limit:
+                break
+        return results
+
@@ -0,0 +1,38 @@
+"""
+Shared, pooled httpx.AsyncClient.
+
+Creating an AsyncClient per request throws away the connection pool (new TCP
++ TLS handshake every call). get_http_client() returns one long-lived client
+per event loop instead; per-request timeouts are still passed on each call.
+"""
+
+__all__ = ['get_http_client', 'close_http_clients']
+
+import asyncio
+import weakref
+
+import httpx
+
+_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30.0)
+_DEFAULT_TIMEOUT = httpx.Timeout(15.0, connect=5.0)
+
+# One client per event loop (background threads run their own loops)
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the pooled client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(limits=_LIMITS, timeout=_DEFAULT_TIMEOUT)
+        _clients[loop] = client
+    return client
+
+
+async def close_http_clients() -> None:
+    """Close the running loop's pooled client (call on shutdown)."""
+    loop = asyncio.get_running_loop()
+    client = _clients.pop(loop, None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
@@ -0,0 +1,209 @@
+"""
+Local learned link ranker — a zero-latency alternative to GPT link selection.
+
+A small logistic model over the features link_scoring already computes, plus
+domain/category signals, predicts how likely GPT would be to pick a link.
+Routes rank candidates with it and then apply the usual per-category
+bucketing, so reviews/interview-prep finish right after search.
+
+Weights are trained offline from logged GPT selections:
+    python scripts/train_link_ranker.py
+and stored in data/link_ranker_model.json. Built-in defaults (roughly the
+hand-tuned link score) are used until a trained model exists.
+
+The selection log is appended under a file lock (callers run
+log_link_selection with asyncio.to_thread) and rotated to
+link_selections.jsonl.1 once it reaches LINK_SELECTION_LOG_MAX_MB.
+"""
+
+__all__ = [
+    'extract_link_features',
+    'rank_links',
+    'log_link_selection',
+    'selection_log_files',
+    'load_ranker_model',
+    'RANKER_MODEL_PATH',
+    'SELECTION_LOG_PATH'
+]
+
+import os
+import json
+import math
+import time
+import logging
+from pathlib import Path
+
+import filelock
+
+from app.utils.file_loader import BASE_DIR
+from app.utils.link_scoring import score_link, _extract_domain
+from app.utils.trusted_domains import get_domain_confidence
+
+logger = logging.getLogger(__name__)
+
+RANKER_MODEL_PATH = BASE_DIR / os.getenv("LINK_RANKER_MODEL_PATH", "data/link_ranker_model.json")
+SELECTION_LOG_PATH = BASE_DIR / os.getenv("LINK_SELECTION_LOG_PATH", "data/link_selections.jsonl")
+# The log rotates to <name>.1 (one generation kept) at this size
+SELECTION_LOG_MAX_BYTES = int(float(os.getenv("LINK_SELECTION_LOG_MAX_MB", "50")) * 1024 * 1024)
+_SELECTION_LOG_BACKUP_PATH = SELECTION_LOG_PATH.with_name(SELECTION_LOG_PATH.name + ".1")
+_SELECTION_LOCK_PATH = SELECTION_LOG_PATH.with_name(f".{SELECTION_LOG_PATH.name}.lock")
+
+# Set LINK_SELECTION_LOG=false in .env to stop collecting training data
+_SELECTION_LOG_ENABLED = os.getenv("LINK_SELECTION_LOG", "true").lower() != "false"
+
+# Domain groups used as binary signals
+_DOMAIN_SIGNALS = {
+    'review_site': {'glassdoor.com', 'indeed.com', 'comparably.com', 'blind.com', 'teamblind.com',
+                    'fishbowlapp.com', 'fairygodboss.com', 'inhersight.com', 'vault.com', 'themuse.com'},
+    'interview_site': {'glassdoor.com', 'teamblind.com', 'blind.com', 'interviewquery.com',
+                       'leetcode.com', 'hackerrank.com', 'levels.fyi'},
+    'community_site': {'reddit.com', 'quora.com', 'linkedin.com'},
+    'news_site': {'reuters.com', 'bloomberg.com', 'cnbc.com', 'wsj.com', 'forbes.com', 'nytimes.com',
+                  'businessinsider.com', 'fortune.com', 'techcrunch.com', 'theverge.com', 'yahoo.com'},
+    'video_site': {'youtube.com', 'vimeo.com'},
+}
+
+# Keyword groups matched against title + URL
+_KEYWORD_SIGNALS = {
+    'kw_interview': ['interview', 'questions', 'hiring process'],
+    'kw_review': ['review', 'rating', 'employees say', 'pros and cons'],
+    'kw_culture': ['culture', 'work-life', 'work life', 'values', 'diversity'],
+    'kw_career': ['career', 'promotion', 'training', 'development', 'growth'],
+    'kw_news': ['earnings', 'acquisition', 'acquire', 'merger', 'quarter', 'results', 'news'],
+    'kw_tech': ['engineering', 'tech stack', 'architecture', 'developer', 'github'],
+    'kw_job_posting': ['/job/', '/jobs/', 'apply now', 'job opening', 'hiring now'],
+    'kw_generic_tips': ['tips', 'how to', 'top 10', 'best answers'],
+}
+
+FEATURE_NAMES = (
+    ['domain', 'company_match', 'title_relevance', 'description', 'freshness', 'url_quality',
+     'domain_confidence', 'is_pdf']
+    + list(_DOMAIN_SIGNALS)
+    + list(_KEYWORD_SIGNALS)
+)
+
+# Used until a trained model exists: approximates the hand-tuned link score
+_DEFAULT_MODEL = {
+    'bias': -4.0,
+    'weights': {
+        'domain': 1.5, 'company_match': 2.0, 'title_relevance': 1.2, 'description': 0.8,
+        'freshness': 0.6, 'url_quality': 0.3, 'domain_confidence': 0.8, 'is_pdf': -1.5,
+        'review_site': 0.6, 'interview_site': 0.6, 'kw_interview': 0.4, 'kw_review': 0.4,
+        'kw_job_posting': -2.0, 'kw_generic_tips': -0.5,
+    }
+}
+
+# Score-breakdown maxima (see link_scoring.score_link) for normalization
+_BREAKDOWN_MAX = {'domain': 25, 'company_match': 25, 'title_relevance': 20,
+                  'description': 15, 'freshness': 10, 'url_quality': 5}
+
+_model_cache: dict | None = None
+_model_mtime: float | None = None
+
+
+def _domain_in(domain: str, group: set) -> bool:
+    return any(domain == d or domain.endswith('.' + d) for d in group)
+
+
+def extract_link_features(link: dict, company_name: str = None, category: str = None) -> dict[str, float]:
+    """Feature vector (name → value in [0, 1]) for a candidate link."""
+    url = link.get('url', '')
+    text = f"{link.get('title', '')} {url}".lower()
+    domain = _extract_domain(url)
+
+    breakdown = score_link(link, company_name, category)['score_breakdown']
+    features = {name: breakdown[name] / _BREAKDOWN_MAX[name] for name in _BREAKDOWN_MAX}
+    features['domain_confidence'] = get_domain_confidence(url) / 10
+    features['is_pdf'] = 1.0 if url.lower().endswith('.pdf') else 0.0
+
+    for name, group in _DOMAIN_SIGNALS.items():
+        features[name] = 1.0 if _domain_in(domain, group) else 0.0
+    for name, keywords in _KEYWORD_SIGNALS.items():
+        features[name] = 1.0 if any(kw in text for kw in keywords) else 0.0
+
+    return features
+
+
+def load_ranker_model(endpoint: str) -> dict:
+    """Return {'bias', 'weights'} for `endpoint`, reloading the model file if it changed."""
+    global _model_cache, _model_mtime
+    try:
+        mtime = RANKER_MODEL_PATH.stat().st_mtime
+    except FileNotFoundError:
+        mtime = None
+
+    if mtime != _model_mtime:
+        _model_mtime = mtime
+        _model_cache = None
+        if mtime is not None:
+            try:
+                with open(RANKER_MODEL_PATH, 'r', encoding='utf-8') as f:
+                    _model_cache = json.load(f)
+                logger.info(f"Loaded link ranker model from {RANKER_MODEL_PATH}")
+            except Exception as e:
+                logger.error(f"Error loading link ranker model: {e}")
+
+    if _model_cache and endpoint in _model_cache.get('endpoints', {}):
+        return _model_cache['endpoints'][endpoint]
+    return _DEFAULT_MODEL
+
+
+def rank_links(links: list[dict], company_name: str, endpoint: str) -> list[dict]:
+    """
+    Sort candidates by predicted selection probability (highest first).
+    Each returned link is a copy with 'rank_score' attached.
+    """
+    model = load_ranker_model(endpoint)
+    weights = model.get('weights', {})
+    bias = model.get('bias', 0.0)
+
+    ranked = []
+    for link in links:
+        features = extract_link_features(link, company_name, endpoint)
+        z = bias + sum(weights.get(name, 0.0) * value for name, value in features.items())
+        ranked.append({**link, 'rank_score': round(1 / (1 + math.exp(-z)), 4)})
+
+    ranked.sort(key=lambda l: l['rank_score'], reverse=True)
+    return ranked
+
+
+def log_link_selection(endpoint: str, company: str, candidates: list[dict], selected: list[dict]) -> None:
+    """
+    Append one GPT selection (training example) to the selection log. Never raises.
+    Blocks on file I/O — call with asyncio.to_thread from async code.
+    """
+    if not _SELECTION_LOG_ENABLED or not candidates:
+        return
+    record = {
+        'ts': time.time(),
+        'endpoint': endpoint,
+        'company': company,
+        'candidates': [
+            {k: link.get(k, '') for k in ('url', 'title', 'description')}
+            for link in candidates
+        ],
+        'selected': [
+            {'url': link.get('url', ''), 'category': link.get('category', '')}
+            for link in selected if isinstance(link, dict)
+        ],
+    }
+    try:
+        SELECTION_LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+        # Locked so workers don't append to a file another worker is rotating
+        with filelock.FileLock(str(_SELECTION_LOCK_PATH), timeout=5):
+            try:
+                size = SELECTION_LOG_PATH.stat().st_size
+            except FileNotFoundError:
+                size = 0
+            if size >= SELECTION_LOG_MAX_BYTES:
+                os.replace(SELECTION_LOG_PATH, _SELECTION_LOG_BACKUP_PATH)
+                logger.info(f"Rotated link selection log ({size} bytes)")
+            with open(SELECTION_LOG_PATH, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    except Exception as e:
+        logger.warning(f"Could not log link selection: {e}")
+
+
+def selection_log_files() -> list[Path]:
+    """Existing selection log files, oldest first (rotated generation, then current)."""
+    return [path for path in (_SELECTION_LOG_BACKUP_PATH, SELECTION_LOG_PATH) if path.exists()]
@@ -0,0 +1,178 @@
+"""
+Content-addressed, disk-backed cache for LLM link-selection responses.
+
+Keys are a hash of (selector, prompt version, company, normalized candidate
+URLs), so an identical candidate set is only ever ranked once — even after
+the endpoint cache entry expired, in another worker, or after a restart.
+Bump the selector's prompt version whenever its prompt changes.
+
+Lookups and writes block on SQLite, so async callers run them with
+asyncio.to_thread; each thread keeps one open connection.
+
+Set LLM_CACHE_ENABLED=false (or CACHE_ENABLED=false) in .env to disable.
+"""
+
+__all__ = [
+    'make_llm_cache_key',
+    'get_llm_cached',
+    'set_llm_cached',
+    'get_llm_cache_stats',
+    'LLM_CACHE_TTL'
+]
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any
+from urllib.parse import urlsplit, urlunsplit
+
+from app.utils.file_loader import BASE_DIR
+from app.utils.sqlite_store import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+_CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() != "false"
+_LLM_CACHE_ENABLED = _CACHE_ENABLED and os.getenv("LLM_CACHE_ENABLED", "true").lower() != "false"
+
+LLM_CACHE_PATH = BASE_DIR / os.getenv("LLM_CACHE_PATH", "data/llm_cache.sqlite3")
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(30 * 86400)))
+
+# Purge expired rows every N writes
+_PURGE_EVERY = 200
+
+_schema_ready = False
+_local = threading.local()
+_writes = 0
+_stats = {"hits": 0, "misses": 0, "writes": 0, "errors": 0}
+
+
+def _connect():
+    """This thread's connection (opened on first use)."""
+    global _schema_ready
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        return conn
+    conn = connect_sqlite(LLM_CACHE_PATH)
+    _local.conn = conn
+    if not _schema_ready:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY,"
+            " namespace TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        conn.commit()
+        _schema_ready = True
+    return conn
+
+
+def _reset_connection() -> None:
+    """Drop this thread's connection after an error so the next call reopens it."""
+    conn = getattr(_local, "conn", None)
+    _local.conn = None
+    if conn is not None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def _normalize_url(url: str) -> str:
+    """Lowercase scheme/host, drop www., fragment and trailing slash."""
+    try:
+        parts = urlsplit(url.strip())
+        netloc = parts.netloc.lower()
+        if netloc.startswith("www."):
+            netloc = netloc[4:]
+        path = parts.path.rstrip("/")
+        return urlunsplit((parts.scheme.lower(), netloc, path, parts.query, ""))
+    except Exception:
+        return url.strip()
+
+
+def make_llm_cache_key(
+    namespace: str,
+    prompt_version: int | str,
+    company: str,
+    links: list[dict],
+    extra: dict | None = None
+) -> str:
+    """
+    Build a content-addressed key. Candidate order doesn't matter; any other
+    prompt inputs (job title, max_links, ...) go in `extra`.
+    """
+    urls = sorted({_normalize_url(link.get("url", "")) for link in links if link.get("url")})
+    payload = json.dumps(
+        [namespace, str(prompt_version), company.lower().strip(), extra or {}, urls],
+        sort_keys=True
+    )
+    return f"{namespace}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+
+def get_llm_cached(key: str) -> Any | None:
+    """Return the cached response for `key`, or None on miss/expiry/disabled."""
+    if not _LLM_CACHE_ENABLED:
+        return None
+    try:
+        row = _connect().execute(
+            "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+        ).fetchone()
+    except Exception as e:
+        _stats["errors"] += 1
+        _reset_connection()
+        logger.warning(f"LLM cache read failed: {e}")
+        return None
+
+    if row and time.time() < row[1]:
+        _stats["hits"] += 1
+        return json.loads(row[0])
+
+    _stats["misses"] += 1
+    return None
+
+
+def set_llm_cached(key: str, value: Any, ttl: int = LLM_CACHE_TTL) -> None:
+    """Store `value` (JSON-serializable) under `key`. Never raises."""
+    global _writes
+    if not _LLM_CACHE_ENABLED:
+        return
+    now = time.time()
+    namespace = key.split(":", 1)[0]
+    try:
+        conn = _connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, namespace, value, created_at, expires_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, namespace, json.dumps(value, ensure_ascii=False), now, now + ttl)
+            )
+            _writes += 1
+            if _writes % _PURGE_EVERY == 0:
+                conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (now,))
+        _stats["writes"] += 1
+    except Exception as e:
+        _stats["errors"] += 1
+        _reset_connection()
+        logger.warning(f"LLM cache write failed: {e}")
+
+
+def get_llm_cache_stats() -> dict:
+    """Return cache statistics for debugging"""
+    stats = dict(_stats, enabled=_LLM_CACHE_ENABLED)
+    if not _LLM_CACHE_ENABLED:
+        return stats
+    try:
+        rows = _connect().execute(
+            "SELECT namespace, COUNT(*) FROM llm_cache WHERE expires_at >= ? GROUP BY namespace",
+            (time.time(),)
+        ).fetchall()
+        stats["entries"] = dict(rows)
+    except Exception as e:
+        _reset_connection()
+        logger.warning(f"LLM cache stats failed: {e}")
+    return stats
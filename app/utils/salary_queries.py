@@ -7,11 +7,25 @@ from app.utils.job_family import infer_job_family
 from app.utils.exact_match_companies import format_company_for_search
 
 __all__ = [
+    'COMPANY_BENEFIT_CATEGORIES',
     'build_salary_benefits_queries',
     'build_salary_fallback_query',
     'format_salary_category_name'
 ]
 
+# Categories whose queries don't depend on job title or location, so their
+# results can be pre-computed per company (salary and equity can't)
+COMPANY_BENEFIT_CATEGORIES = (
+    'benefits_landing',
+    'perks',
+    'erg_groups',
+    'health_insurance',
+    'insurance_cost',
+    'retirement_401k',
+    'pay_increases',
+    'benefits_comparison',
+)
+
 
 def format_salary_category_name(category_key: str) -> str:
     """Convert category_key to display name"""
@@ -0,0 +1,25 @@
+"""
+Small helpers for the SQLite files we use as shared, on-disk stores.
+SQLite in WAL mode lets every gunicorn worker read and write the same file
+safely, and the data survives restarts.
+"""
+
+__all__ = ['connect_sqlite']
+
+import sqlite3
+from pathlib import Path
+
+BUSY_TIMEOUT_SECONDS = 5.0
+
+
+def connect_sqlite(path: Path | str) -> sqlite3.Connection:
+    """
+    Open a connection to `path` (creating parent dirs), in WAL mode.
+    Callers should close it when done: `with closing(connect_sqlite(p)) as conn`.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
@@ -11,19 +11,47 @@ renders them as a plain link rather than an embed).
 To enable: add YOUTUBE_API_KEY=... to your .env
 Get a free key at console.cloud.google.com (10,000 quota units/day; this
 function uses only 2 units per call — channels.list + playlistItems.list).
+
+Resolved channels are cached in-process (channel → latest video) for
+YOUTUBE_CACHE_TTL seconds, concurrent lookups of the same channel share one
+API call, and a daily quota accountant stops calling the API once
+YOUTUBE_DAILY_QUOTA units have been spent (channel links are kept as-is).
+Quota usage is counted in a SQLite table shared by every gunicorn worker,
+so the budget holds for the whole deployment, not per process.
 """
 
 import re
 import os
+import time
+import asyncio
 import logging
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
 
 import httpx
 from urllib.parse import urlparse
 
+from app.utils.file_loader import BASE_DIR
+from app.utils.sqlite_store import connect_sqlite
+
 logger = logging.getLogger(__name__)
 
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
+# Channel → latest video cache. Failed lookups are cached for a shorter time
+# so a broken channel doesn't burn quota on every request.
+YOUTUBE_CACHE_TTL = int(os.getenv("YOUTUBE_CACHE_TTL", str(12 * 3600)))
+YOUTUBE_NEGATIVE_CACHE_TTL = int(os.getenv("YOUTUBE_NEGATIVE_CACHE_TTL", "3600"))
+
+# Daily quota budget (the free tier is 10,000 units/day, reset at midnight Pacific)
+YOUTUBE_DAILY_QUOTA = int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000"))
+YOUTUBE_QUOTA_PATH = BASE_DIR / os.getenv("YOUTUBE_QUOTA_PATH", "data/youtube_quota.sqlite3")
+
+_channel_cache: dict[tuple, dict] = {}
+_inflight: dict[tuple, asyncio.Future] = {}
+_schema_ready = False
+_stats = {"cache_hits": 0, "cache_misses": 0, "api_calls": 0}
+
 
 _CHANNEL_SUFFIX = r"(?:/(?:videos|about|featured|shorts|playlists|community|channels|streams))?"
 
@@ -68,6 +96,67 @@ def _uploads_playlist_id(channel_id: str) -> str:
     return channel_id
 
 
+def _quota_day():
+    """Quota day boundary (YouTube resets at midnight Pacific; UTC-8 is close enough)."""
+    return (datetime.now(timezone.utc) - timedelta(hours=8)).date()
+
+
+def _connect():
+    global _schema_ready
+    conn = connect_sqlite(YOUTUBE_QUOTA_PATH)
+    if not _schema_ready:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS youtube_quota ("
+            " day TEXT PRIMARY KEY,"
+            " used INTEGER NOT NULL DEFAULT 0,"
+            " denied INTEGER NOT NULL DEFAULT 0)"
+        )
+        conn.commit()
+        _schema_ready = True
+    return conn
+
+
+def _consume_quota(units: int) -> bool:
+    """Reserve `units` of today's shared quota. Returns False if the budget is exhausted."""
+    today = str(_quota_day())
+    with closing(_connect()) as conn, conn:
+        conn.execute("INSERT OR IGNORE INTO youtube_quota (day) VALUES (?)", (today,))
+        # Check and reserve in one statement so concurrent workers can't overspend
+        reserved = conn.execute(
+            "UPDATE youtube_quota SET used = used + ? WHERE day = ? AND used + ? <= ?",
+            (units, today, units, YOUTUBE_DAILY_QUOTA)
+        ).rowcount > 0
+        if not reserved:
+            conn.execute("UPDATE youtube_quota SET denied = denied + 1 WHERE day = ?", (today,))
+    return reserved
+
+
+def _quota_units(id_type: str) -> int:
+    """channel_id skips the channels.list lookup; everything else costs 2 units."""
+    return 1 if id_type == "channel_id" else 2
+
+
+def get_youtube_resolver_stats() -> dict:
+    """Return cache statistics (this process) and today's quota usage (shared) for debugging"""
+    now = time.time()
+    stats = {
+        "cached_channels": sum(1 for e in _channel_cache.values() if now < e["expires_at"]),
+        "cache_hits": _stats["cache_hits"],
+        "cache_misses": _stats["cache_misses"],
+        "api_calls": _stats["api_calls"],
+        "quota_limit": YOUTUBE_DAILY_QUOTA,
+    }
+    today = str(_quota_day())
+    try:
+        with closing(_connect()) as conn:
+            row = conn.execute("SELECT used, denied FROM youtube_quota WHERE day = ?", (today,)).fetchone()
+        used, denied = row or (0, 0)
+        stats.update(quota_day=today, quota_used=used, quota_denied=denied)
+    except Exception as e:
+        stats["quota_error"] = str(e)
+    return stats
+
+
 async def _resolve_via_api(identifier: str, id_type: str, api_key: str):
     """
     Use the YouTube Data API to get the most recent video from a channel.
@@ -137,6 +226,61 @@ async def _resolve_via_api(identifier: str, id_type: str, api_key: str):
         return None
 
 
+async def _resolve_cached(identifier: str, id_type: str):
+    """
+    Cached, coalesced wrapper around _resolve_via_api.
+    Returns the resolved video dict, or None (failure or quota exhausted).
+    """
+    # Channel IDs are case-sensitive; handles/usernames are not
+    key = (id_type, identifier if id_type == "channel_id" else identifier.lower())
+
+    entry = _channel_cache.get(key)
+    if entry:
+        if time.time() < entry["expires_at"]:
+            _stats["cache_hits"] += 1
+            return entry["video"]
+        del _channel_cache[key]
+
+    # Another request is already resolving this channel — share its result
+    waiter = _inflight.get(key)
+    if waiter is not None:
+        try:
+            return await asyncio.shield(waiter)
+        except asyncio.CancelledError:
+            if waiter.cancelled():
+                return None
+            raise
+
+    _stats["cache_misses"] += 1
+
+    # Registered before the quota check, which yields to the loop
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        try:
+            allowed = await asyncio.to_thread(_consume_quota, _quota_units(id_type))
+        except Exception as e:
+            logger.warning("Could not reserve YouTube quota (%s); keeping channel link", e)
+            allowed = False
+        else:
+            if not allowed:
+                logger.warning("YouTube daily quota exhausted (%s units); keeping channel link", YOUTUBE_DAILY_QUOTA)
+        if not allowed:
+            future.set_result(None)
+            return None
+
+        _stats["api_calls"] += 1
+        resolved = await _resolve_via_api(identifier, id_type, YOUTUBE_API_KEY)
+        ttl = YOUTUBE_CACHE_TTL if resolved else YOUTUBE_NEGATIVE_CACHE_TTL
+        _channel_cache[key] = {"video": resolved, "expires_at": time.time() + ttl}
+        future.set_result(resolved)
+        return resolved
+    finally:
+        if not future.done():
+            future.cancel()
+        _inflight.pop(key, None)
+
+
 async def resolve_youtube_channel_to_video(link: dict) -> dict:
     """
     If `link` is a YouTube channel URL, attempt to resolve it to the most
@@ -163,7 +307,7 @@ async def resolve_youtube_channel_to_video(link: dict) -> dict:
         return link
 
     identifier, id_type = parsed
-    resolved = await _resolve_via_api(identifier, id_type, YOUTUBE_API_KEY)
+    resolved = await _resolve_cached(identifier, id_type)
 
     if resolved is None:
         logger.info("Could not resolve channel URL to video, keeping channel link: %s", url)
@@ -183,3 +327,19 @@ async def resolve_youtube_channel_to_video(link: dict) -> dict:
         updated.get("title", "")[:60],
     )
     return updated
+
+
+async def resolve_youtube_links(links: list[dict]) -> list[dict]:
+    """
+    Resolve every YouTube channel link (type == "video") in `links` concurrently.
+    Order is preserved; non-video links are returned unchanged.
+    """
+    if not links:
+        return []
+
+    async def _resolve(link: dict) -> dict:
+        if link.get("type") == "video" and "youtube.com" in link.get("url", ""):
+            return await resolve_youtube_channel_to_video(link)
+        return link
+
+    return list(await asyncio.gather(*[_resolve(link) for link in links]))
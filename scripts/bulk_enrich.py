@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Bulk-enrich a list of company names (e.g. an ATS employer export) into the
+company store.
+
+Names the server already knows are skipped. The rest are sent to the LLM in
+batches of --batch-size (20–40 works well; capped so the answer fits the
+model's output token limit) per call, so the instructions are
+paid for once per batch instead of once per company; batches run
+concurrently up to --concurrency. Names a batch fails on, or leaves out, fall
+back to Brave search enrichment. All results are written in one go at the
+end (one journal append + compaction), and running servers pick them up
+without a restart.
+
+Input: a text file with one name per line, or a JSON array of names.
+
+Usage:
+    python scripts/bulk_enrich.py employers.txt
+    python scripts/bulk_enrich.py employers.json --batch-size 40 --concurrency 6
+    python scripts/bulk_enrich.py employers.txt --dry-run
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+PROMPT = """\
+You are a business analyst. Provide information about each company in the numbered list below.
+
+Return ONLY a JSON array with one object per company, in the same order, each with these fields:
+{{
+    "name": "The company name exactly as given in the list",
+    "full_name": "Official full company name",
+    "description": "Brief 10-15 word description of what the company does",
+    "industry": "Primary industry (e.g., Technology, Finance, Healthcare, Retail, Consulting, etc.)",
+    "domain": "Official website domain (e.g., google.com, not www.google.com)",
+    "related": ["Up to 3 similar/competitor companies"]
+}}
+
+If you don't recognize a company, make your best guess based on the name.
+Return ONLY the JSON array, no markdown, no explanation.
+
+Companies:
+{companies}
+"""
+
+# Output tokens budgeted per company in a batch
+TOKENS_PER_COMPANY = 90
+# Output token limit of the smallest default model (gpt-3.5-turbo)
+MAX_OUTPUT_TOKENS = 4096
+# Largest batch whose answer fits in MAX_OUTPUT_TOKENS
+MAX_BATCH_SIZE = (MAX_OUTPUT_TOKENS - 200) // TOKENS_PER_COMPANY
+
+
+def load_names(path: Path) -> list[str]:
+    """Names from a JSON array or a one-per-line text file, deduplicated case-insensitively."""
+    text = path.read_text(encoding='utf-8')
+    if path.suffix == ".json":
+        raw = json.loads(text)
+    else:
+        raw = text.splitlines()
+
+    names = []
+    seen = set()
+    for name in raw:
+        name = str(name).strip()
+        if name and name.lower() not in seen:
+            seen.add(name.lower())
+            names.append(name)
+    return names
+
+
+async def enrich_batch(names: list[str]) -> dict[str, dict]:
+    """One LLM call for a batch; returns {name: enrichment} for the names it answered."""
+    from app.services.llm_client import complete_json
+
+    data = await complete_json(
+        "bulk_enrichment",
+        PROMPT.format(companies="\n".join(f"{i}. {name}" for i, name in enumerate(names, 1))),
+        system="You are a business data assistant. Return only valid JSON.",
+        expect=list,
+        max_tokens=min(MAX_OUTPUT_TOKENS, 200 + TOKENS_PER_COMPANY * len(names)),
+        temperature=0.3,
+        timeout=90.0,
+    )
+
+    by_lower = {name.lower(): name for name in names}
+    results = {}
+    unmatched = []
+    for i, item in enumerate(data):
+        if not isinstance(item, dict) or not item.get("description"):
+            continue
+        # Match on the echoed name first; a repeat of a matched name is dropped,
+        # since it belongs to that company rather than to whatever sits at its position
+        name = by_lower.get(str(item.get("name", "")).strip().lower())
+        if name is None:
+            unmatched.append((i, item))
+        elif name not in results:
+            results[name] = item
+
+    # Fall back to position only for items whose echoed name matched nothing
+    if len(data) == len(names):
+        for i, item in unmatched:
+            if names[i] not in results:
+                results[names[i]] = item
+    return results
+
+
+async def run(names: list[str], batch_size: int, concurrency: int, search_concurrency: int) -> dict[str, dict]:
+    from app.services.company_enrichment import enrich_company_via_search, build_company_entry
+
+    llm_semaphore = asyncio.Semaphore(concurrency)
+    search_semaphore = asyncio.Semaphore(search_concurrency)
+    entries: dict[str, dict] = {}
+    stats = {"llm": 0, "search": 0, "failed": 0}
+    batches = [names[i:i + batch_size] for i in range(0, len(names), batch_size)]
+
+    async def search_fallback(name: str):
+        async with search_semaphore:
+            enriched = await enrich_company_via_search(name)
+        if enriched:
+            entries[name] = build_company_entry(name, enriched)
+            stats["search"] += 1
+        else:
+            stats["failed"] += 1
+            print(f"  ✗ {name}")
+
+    async def worker(number: int, batch: list[str]):
+        async with llm_semaphore:
+            try:
+                results = await enrich_batch(batch)
+            except Exception as e:
+                print(f"  ! batch {number}: {e}")
+                results = {}
+        for name, enriched in results.items():
+            entries[name] = build_company_entry(name, enriched)
+        stats["llm"] += len(results)
+        missing = [name for name in batch if name not in results]
+        print(f"  ✓ batch {number}/{len(batches)}: {len(results)} enriched, {len(missing)} to search fallback")
+        await asyncio.gather(*(search_fallback(name) for name in missing))
+
+    await asyncio.gather(*(worker(i, batch) for i, batch in enumerate(batches, 1)))
+
+    from app.utils.http_client import close_http_clients
+    await close_http_clients()
+    print(f"\nLLM: {stats['llm']}, search fallback: {stats['search']}, failed: {stats['failed']}")
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-enrich company names into the company store")
+    parser.add_argument("input", type=Path, help="Text file (one name per line) or JSON array of names")
+    parser.add_argument("--batch-size", type=int, default=25,
+                        help=f"Companies per LLM call (20-{MAX_BATCH_SIZE})")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent LLM calls")
+    parser.add_argument("--search-concurrency", type=int, default=2,
+                        help="Concurrent Brave searches for the fallback")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which names would be enriched")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv(ROOT_DIR / ".env")
+
+    from app.services.company_enrichment import is_known_company
+    from app.services.company_store import append_companies, compact_company_store
+    from app.services.llm_client import llm_available
+
+    names = load_names(args.input)
+    todo = [name for name in names if not is_known_company(name)]
+    print(f"{len(names)} names, {len(names) - len(todo)} already known, {len(todo)} to enrich")
+    if args.dry_run or not todo:
+        return
+
+    if not llm_available():
+        print("ERROR: no OPENAI_API_KEY or ANTHROPIC_API_KEY configured")
+        sys.exit(1)
+
+    start = time.time()
+    batch_size = max(1, args.batch_size)
+    if batch_size > MAX_BATCH_SIZE:
+        print(f"Batch size {batch_size} wouldn't fit the output token limit; using {MAX_BATCH_SIZE}")
+        batch_size = MAX_BATCH_SIZE
+    entries = asyncio.run(run(todo, batch_size, args.concurrency, args.search_concurrency))
+    if entries:
+        append_companies(list(entries.items()))
+        compact_company_store(wait=True)
+
+    print(f"Done in {time.time() - start:.0f}s: added {len(entries)} of {len(todo)} companies")
+    if len(entries) < len(todo):
+        print("Re-run with the same file to retry the rest (known names are skipped)")
+
+
+if __name__ == "__main__":
+    main()
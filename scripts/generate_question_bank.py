@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Build data/question_bank.json: pre-generated interview questions for every
+canonical job title in data/job_family.json.
+
+Each title gets a pool of 10 behavioral and 10 technical questions; the
+server serves 5 of each (re-ranked against the submitted posting) for
+title-only or short submissions without calling an LLM. The server picks up
+a rewritten bank without a restart.
+
+Usage:
+    python scripts/generate_question_bank.py
+    python scripts/generate_question_bank.py --resume --concurrency 8
+    python scripts/generate_question_bank.py --titles "Software Engineer" "Accountant"
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+JOB_FAMILY_FILE = ROOT_DIR / "data" / "job_family.json"
+POOL_SIZE = 10
+SAVE_EVERY = 20
+
+PROMPT = """\
+You are an expert interview coach. Generate interview questions for the job title below.
+
+Write exactly {n} behavioral questions using STAR-method prompts (cover leadership, teamwork, conflict resolution, adaptability, problem-solving, ownership, communication and prioritization).
+Write exactly {n} technical/skills questions covering the core skills, tools and responsibilities typical for this role, from fundamentals to advanced. Keep each question self-contained and name specific skills or tools where relevant.
+
+Respond ONLY with valid JSON — no explanation, no markdown fences:
+{{"behavioral": ["..."], "technical": ["..."]}}
+
+Job title: {title} ({family})
+"""
+
+
+def load_existing(path: Path) -> dict:
+    if path.exists():
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f).get("titles", {})
+        except Exception:
+            pass
+    return {}
+
+
+def save(path: Path, titles: dict) -> None:
+    """Write the bank atomically so the server never reads a partial file."""
+    data = {"generated_at": datetime.now().isoformat(), "pool_size": POOL_SIZE, "titles": titles}
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    tmp_path.replace(path)
+
+
+async def generate_for_title(title: str, family: str) -> dict:
+    from app.services.llm_client import complete_json
+
+    data = await complete_json(
+        "question_bank",
+        PROMPT.format(n=POOL_SIZE, title=title, family=family),
+        providers=("anthropic", "openai"),
+        openai_model="gpt-4o-mini",
+        anthropic_model="claude-haiku-4-5-20251001",
+        max_tokens=2048,
+        temperature=0.7,
+        timeout=60.0,
+        expect=dict,
+    )
+    entry = {"family": family}
+    for section in ("behavioral", "technical"):
+        questions = [q.strip() for q in data.get(section, []) if isinstance(q, str) and q.strip()]
+        if len(questions) < 5:
+            raise ValueError(f"only {len(questions)} {section} questions")
+        entry[section] = questions[:POOL_SIZE]
+    return entry
+
+
+async def run(titles: dict, bank: dict, output: Path, concurrency: int) -> int:
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+    done = 0
+
+    async def worker(title: str, family: str):
+        nonlocal failures, done
+        async with semaphore:
+            try:
+                bank[title] = await generate_for_title(title, family)
+                print(f"  ✓ {title}")
+            except Exception as e:
+                failures += 1
+                print(f"  ✗ {title}: {e}")
+        done += 1
+        if done % SAVE_EVERY == 0:
+            save(output, bank)
+
+    await asyncio.gather(*(worker(title, family) for title, family in titles.items()))
+
+    from app.utils.http_client import close_http_clients
+    await close_http_clients()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the per-title question bank")
+    parser.add_argument("--output", type=Path, default=ROOT_DIR / "data" / "question_bank.json")
+    parser.add_argument("--resume", action="store_true", help="Skip titles already in the bank")
+    parser.add_argument("--concurrency", type=int, default=5, help="Concurrent LLM calls")
+    parser.add_argument("--titles", nargs="+", help="Only (re)generate these titles")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv(ROOT_DIR / ".env")
+
+    from app.services.llm_client import llm_available
+    if not llm_available():
+        print("ERROR: no OPENAI_API_KEY or ANTHROPIC_API_KEY configured")
+        sys.exit(1)
+
+    with open(JOB_FAMILY_FILE, 'r', encoding='utf-8') as f:
+        job_families = json.load(f)
+
+    bank = load_existing(args.output) if (args.resume or args.titles) else {}
+    if args.titles:
+        todo = {t: job_families.get(t, "General") for t in args.titles}
+    else:
+        todo = {t: family for t, family in job_families.items() if t not in bank}
+
+    print(f"Generating questions for {len(todo)} titles ({len(bank)} already in bank)")
+    start = time.time()
+    failures = asyncio.run(run(todo, bank, args.output, args.concurrency))
+    save(args.output, bank)
+
+    print(f"\nDone in {time.time() - start:.0f}s: {len(bank)} titles in bank, {failures} failed")
+    print(f"Saved to {args.output}")
+    if failures:
+        print("Re-run with --resume to retry failed titles")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,104 @@
 #!/usr/bin/env python3
 """
-Regenerate full-links-results.json by calling the company-info API for all companies.
-Run this script with the server running on the specified port.
+Regenerate full-links-results.json for all companies.
+
+By default the endpoints' pipelines run in this process (no server needed),
+sharing one HTTP client pool and the domain lookups between sections. With
+--port, the API of a running server is called instead.
+
+Sections (--sections, default all):
+    overview   /api/company-info links + domain
+    reviews    /api/company-reviews response
+    benefits   company-level benefits links from /api/salary-benefits
+               (salary/equity depend on job title and location, so stay live)
+    interview  /api/interview-prep response per job family, generated with
+               a representative title for each family (--families to limit)
+
+Companies are processed concurrently. Every API call first reserves the
+Brave queries it will make from a --brave-qps budget (leave headroom for
+live traffic), and at most --concurrency calls are in flight. Each finished
+company is appended to a checkpoint file; one compaction at the end folds
+the checkpoint into the results file. An interrupted run continues with
+--resume, which also skips sections a company already has.
 
 Usage:
+    python scripts/regenerate_links.py
+    python scripts/regenerate_links.py --resume
+    python scripts/regenerate_links.py --brave-qps 15 --concurrency 24
+    python scripts/regenerate_links.py --resolve-youtube
+    python scripts/regenerate_links.py --sections reviews interview --families "Legal"
     python scripts/regenerate_links.py --port 8000
-    python scripts/regenerate_links.py --port 8001 --resume
+
+--resolve-youtube converts YouTube channel links to their latest video watch
+URL before saving (requires YOUTUBE_API_KEY), so the precomputed fast path
+doesn't have to resolve them per request.
 """
 
 import argparse
+import asyncio
 import json
+import os
 import time
 import sys
 from datetime import datetime
 from pathlib import Path
 
-import requests
+import httpx
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
 
 # Files
-DATA_DIR = Path(__file__).parent.parent / "data"
-NOTES_DIR = Path(__file__).parent.parent / "notes"
+DATA_DIR = ROOT_DIR / "data"
+NOTES_DIR = ROOT_DIR / "notes"
 COMPANIES_FILE = DATA_DIR / "top_companies.json"
 OUTPUT_FILE = NOTES_DIR / "full-links-results.json"
+CHECKPOINT_FILE = NOTES_DIR / "full-links-checkpoint.jsonl"
 
 YOUTUBE_THRESHOLD = 85
 
+SECTIONS = ("overview", "reviews", "benefits", "interview")
+
+# Default job title for link generation where the section doesn't depend on it
+DEFAULT_JOB_TITLE = "Software Engineer"
+# Max links requested for reviews / interview prep (the endpoints' defaults);
+# requests asking for more go live
+SECTION_MAX_LINKS = 6
+
+# Brave queries one no_cache call of each endpoint makes (domain lookup included;
+# it is cached, so it's usually paid once per company)
+BRAVE_QUERIES = {
+    "company-info": 7,
+    "company-reviews": 3,
+    "salary-benefits": 11,
+    "interview-prep": 5,
+}
+DEFAULT_BRAVE_QPS = float(os.getenv("REGENERATE_BRAVE_QPS", "10"))
+
+# Preferred title per job family for interview prep queries; used only if it
+# maps back to the family (otherwise the family's first keyword that does)
+PREFERRED_FAMILY_TITLES = {
+    "Technology & Engineering": "Software Engineer",
+    "Finance & Accounting": "Accountant",
+    "Healthcare & Medical": "Registered Nurse",
+    "Sales & Marketing": "Marketing Manager",
+    "Operations & Supply Chain": "Operations Manager",
+    "Legal": "Lawyer",
+    "Human Resources": "HR Manager",
+    "Customer Service & Support": "Customer Success Manager",
+    "Data & Analytics": "Data Analyst",
+    "Design & Creative": "Graphic Designer",
+    "Education & Training": "Teacher",
+    "Consulting": "Management Consultant",
+    "Retail & Hospitality": "Store Manager",
+    "Manufacturing & Engineering": "Plant Manager",
+    "Research & Science": "Research Scientist",
+    "Real Estate & Property": "Real Estate Agent",
+    "Media & Entertainment": "Editor",
+    "Non-Profit & Government": "Policy Analyst",
+    "Transportation & Logistics": "Truck Driver",
+}
+
 
 def load_companies() -> list:
     """Load company list from JSON file."""
@@ -33,129 +107,353 @@ def load_companies() -> list:
 
 
 def load_existing_results() -> dict:
-    """Load existing results for resume functionality."""
-    if OUTPUT_FILE.exists():
-        try:
-            with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except:
-            pass
-    return {"companies": {}}
-
-
-def get_company_info(company: str, port: int, timeout: int = 30) -> dict:
-    """Call the company-info API endpoint."""
-    url = f"http://127.0.0.1:{port}/api/company-info"
-    params = {
-        "company": company,
-        "job_title": "Software Engineer",  # Default job title for link generation
-        "no_cache": "true"  # Skip cache to get fresh results
-    }
-
+    """Load existing results (server pre-computed companies and the checkpoint included)."""
+    from app.services.precomputed_results import load_precomputed_data
     try:
-        response = requests.get(url, params=params, timeout=timeout)
+        return load_precomputed_data(checkpoint=CHECKPOINT_FILE)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"WARNING: could not read existing results or checkpoint ({e}); every company will be regenerated")
+        return {"companies": {}}
+
+
+def family_titles() -> dict:
+    """A job title per job family that infer_job_family maps back to that family."""
+    from app.utils.job_family import JOB_FAMILIES, infer_job_family
+
+    titles = {}
+    for family, keywords in JOB_FAMILIES.items():
+        candidates = [PREFERRED_FAMILY_TITLES.get(family)] + [k.title() for k in keywords]
+        for title in candidates:
+            if title and infer_job_family(title) == family:
+                titles[family] = title
+                break
+    return titles
+
+
+class BraveBudget:
+    """Paces API calls so the Brave queries they trigger stay under `qps` on average."""
+
+    def __init__(self, qps: float):
+        self.interval = 1.0 / qps
+        self.next_free = time.monotonic()
+        self.queries = 0
+
+    async def reserve(self, queries: int) -> None:
+        now = time.monotonic()
+        start = max(now, self.next_free)
+        self.next_free = start + queries * self.interval
+        self.queries += queries
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class ApiBackend:
+    """Calls the endpoints of a running server."""
+
+    def __init__(self, port: int, timeout: float):
+        self.client = httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=timeout)
+
+    async def prepare(self, company: str) -> None:
+        pass
+
+    async def call(self, path: str, params: dict) -> dict:
+        response = await self.client.get(f"/api/{path}", params={**params, "no_cache": "true"})
         response.raise_for_status()
         return response.json()
-    except Exception as e:
-        return {"error": str(e)[:50]}
 
+    async def close(self) -> None:
+        await self.client.aclose()
 
-def save_results(results: dict):
-    """Save results to JSON file."""
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
 
+class InProcessBackend:
+    """Runs the endpoints' pipelines in this process, with the app's shared clients and caches."""
 
-def main():
+    def __init__(self):
+        from app.api import routes_company
+
+        self.handlers = {
+            "company-reviews": routes_company.get_company_reviews,
+            "salary-benefits": routes_company.get_salary_benefits,
+            "interview-prep": routes_company.get_interview_prep,
+        }
+
+    async def prepare(self, company: str) -> None:
+        """Look up the domain once (cached) so overview and benefits don't both search for it."""
+        from app.services.domain_identifier import identify_company_domain
+        from app.utils.domain_overrides import get_domain_override
+
+        if not get_domain_override(company):
+            await identify_company_domain(company, os.getenv("BRAVE_API_KEY"))
+
+    async def call(self, path: str, params: dict) -> dict:
+        if path == "company-info":
+            # The pipeline behind /company-info, without the route's popularity/enrichment side effects
+            from app.services.company_overview import build_company_overview
+            return await build_company_overview(params["company"], params["job_title"], "Remote")
+        return await self.handlers[path](**params, no_cache=True)
+
+    async def close(self) -> None:
+        from app.utils.http_client import close_http_clients
+        await close_http_clients()
+
+
+class Regenerator:
+    def __init__(self, backend, args, titles: dict):
+        self.backend = backend
+        self.args = args
+        self.titles = titles
+        self.budget = BraveBudget(args.brave_qps)
+        self.in_flight = asyncio.Semaphore(args.concurrency)
+
+    async def call_api(self, path: str, params: dict) -> dict:
+        """Call an endpoint, bypassing the caches and pre-computed results."""
+        await self.budget.reserve(BRAVE_QUERIES[path])
+        try:
+            async with self.in_flight:
+                return await asyncio.wait_for(self.backend.call(path, params), self.args.timeout)
+        except Exception as e:
+            return {"error": (str(e) or type(e).__name__)[:50]}
+
+    async def overview(self, company: str) -> dict:
+        data = await self.call_api("company-info", {"company": company, "job_title": DEFAULT_JOB_TITLE})
+        if "error" in data:
+            return data
+        links = data.get("links", [])
+        if self.args.resolve_youtube:
+            from app.utils.youtube_resolver import resolve_youtube_links
+            links = await resolve_youtube_links(links)
+        return {"domain": data.get("domain"), "link_count": len(links), "links": links}
+
+    async def section(self, path: str, params: dict) -> dict:
+        """What the server needs to answer reviews / interview-prep requests."""
+        data = await self.call_api(path, params)
+        if "error" in data:
+            return data
+        if not data.get("links"):
+            # Not stored, so --resume tries again
+            return {"error": "no links"}
+        return {
+            "links": data.get("links", []),
+            "all_links": data.get("all_links", []),
+            "total_found": data.get("total_found", 0),
+            "engine": data.get("engine"),
+            "max_links": SECTION_MAX_LINKS,
+        }
+
+    async def benefits(self, company: str):
+        """Top link per company-level benefits category, or an error dict."""
+        from app.utils.salary_queries import COMPANY_BENEFIT_CATEGORIES
+
+        data = await self.call_api("salary-benefits", {"company": company, "job_title": DEFAULT_JOB_TITLE})
+        if "error" in data:
+            return data
+        links = [link for link in data.get("all_links", []) if link.get("category_key") in COMPANY_BENEFIT_CATEGORIES]
+        return links or {"error": "no links"}
+
+    async def process_company(self, company: str, entry: dict) -> tuple[dict, list]:
+        """
+        Generate the selected sections (with --resume, only those the entry is
+        missing); returns (new sections, failed sections).
+        """
+        sections = self.args.sections
+        refresh = not self.args.resume
+        jobs = {}
+
+        if "overview" in sections and (refresh or "links" not in entry or "error" in entry):
+            jobs["overview"] = self.overview(company)
+        if "reviews" in sections and (refresh or "reviews" not in entry or "error" in entry["reviews"]):
+            jobs["reviews"] = self.section("company-reviews", {"company": company})
+        if "benefits" in sections and (refresh or "benefits" not in entry):
+            jobs["benefits"] = self.benefits(company)
+        if "interview" in sections:
+            prep = entry.get("interview_prep", {})
+            for family, title in self.titles.items():
+                if refresh or family not in prep or "error" in prep[family]:
+                    jobs[f"interview:{family}"] = self.section(
+                        "interview-prep", {"company": company, "job_title": title}
+                    )
+
+        if "overview" in jobs and "benefits" in jobs:
+            try:
+                await self.backend.prepare(company)
+            except Exception as e:
+                print(f"  ! domain lookup for {company}: {e}")
+        outcomes = dict(zip(jobs, await asyncio.gather(*jobs.values())))
+        result = {}
+        failed = []
+        for name, outcome in outcomes.items():
+            if isinstance(outcome, dict) and "error" in outcome:
+                failed.append(name)
+            elif name.startswith("interview:"):
+                family = name.partition(":")[2]
+                # Journal entries replace whole sections, so carry over the families already there
+                result.setdefault("interview_prep", dict(entry.get("interview_prep", {})))[family] = outcome
+            elif name == "overview":
+                result.update(outcome)
+            else:
+                result[name] = outcome
+        return result, failed
+
+
+async def run(companies: list, existing: dict, args, titles: dict) -> dict:
+    from app.services.precomputed_results import append_precomputed
+
+    total = len(companies)
+    stats = {"done": 0, "success": 0, "errors": 0, "skipped": 0}
+    start_time = time.time()
+    # Queue companies gradually so the pacing budget isn't taken up front by one section
+    pending = asyncio.Semaphore(args.concurrency * 2)
+
+    backend = ApiBackend(args.port, args.timeout) if args.port else InProcessBackend()
+    regenerator = Regenerator(backend, args, titles)
+    try:
+
+        async def handle(company: str):
+            async with pending:
+                result, failed = await regenerator.process_company(company, existing.get(company, {}))
+            if result:
+                # Per-company checkpoint: an interrupted run loses at most the companies in flight
+                await asyncio.to_thread(append_precomputed, company, result, CHECKPOINT_FILE)
+
+            stats["done"] += 1
+            if failed:
+                stats["errors"] += 1
+                status = f"ERROR in {', '.join(failed)}"
+            elif result:
+                stats["success"] += 1
+                if "links" in result:
+                    status = f"OK ({result['link_count']} links, domain: {result.get('domain')})"
+                else:
+                    status = f"OK ({', '.join(result)})"
+            else:
+                stats["skipped"] += 1
+                status = "already complete"
+
+            elapsed = time.time() - start_time
+            rate = stats["done"] / elapsed if elapsed else 0
+            eta = (total - stats["done"]) / rate if rate else 0
+            # Handle unicode in company names
+            safe_name = company.encode('ascii', 'replace').decode('ascii')
+            print(
+                f"[{stats['done']}/{total}] {safe_name}: {status} | "
+                f"{rate * 60:.1f}/min, {regenerator.budget.queries} Brave queries, ETA {eta / 60:.1f} min",
+                flush=True
+            )
+
+        await asyncio.gather(*(handle(company) for company in companies))
+    finally:
+        await backend.close()
+        if args.resolve_youtube:
+            from app.utils.http_client import close_http_clients
+            await close_http_clients()
+    return stats
+
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Regenerate full-links-results.json")
-    parser.add_argument("--port", type=int, default=8000, help="Server port (default: 8000)")
+    parser.add_argument("--port", type=int, help="Call the API of a server on this port instead of running in-process")
     parser.add_argument("--resume", action="store_true", help="Resume from existing results")
-    parser.add_argument("--timeout", type=int, default=30, help="Request timeout in seconds")
-    args = parser.parse_args()
+    parser.add_argument("--timeout", type=int, default=60, help="Request timeout in seconds")
+    parser.add_argument("--brave-qps", type=float, default=DEFAULT_BRAVE_QPS,
+                        help=f"Brave queries per second to spend (default: {DEFAULT_BRAVE_QPS:g})")
+    parser.add_argument("--concurrency", type=int, default=16, help="Max API calls in flight (default: 16)")
+    parser.add_argument("--resolve-youtube", action="store_true",
+                        help="Resolve YouTube channel links to video watch URLs before saving")
+    parser.add_argument("--sections", nargs="+", choices=SECTIONS, default=list(SECTIONS),
+                        help="Sections to generate (default: all)")
+    parser.add_argument("--families", nargs="+", help="Job families for interview prep (default: all)")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+
+    # Before any app import: API keys are read at import time
+    from dotenv import load_dotenv
+    load_dotenv(ROOT_DIR / ".env")
+
+    if args.resolve_youtube:
+        from app.utils import youtube_resolver
+        if not youtube_resolver.YOUTUBE_API_KEY:
+            print("WARNING: --resolve-youtube set but YOUTUBE_API_KEY is not configured; channel links kept")
+
+    titles = family_titles()
+    if args.families:
+        unknown = set(args.families) - set(titles)
+        if unknown:
+            print(f"ERROR: unknown job families: {', '.join(sorted(unknown))}")
+            sys.exit(1)
+        titles = {family: titles[family] for family in args.families}
 
     # Load companies
     companies = load_companies()
     total = len(companies)
     print(f"Loaded {total} companies from {COMPANIES_FILE}")
+    print(f"Sections: {', '.join(args.sections)}")
 
-    # Check server is running
-    try:
-        requests.get(f"http://127.0.0.1:{args.port}/api/status", timeout=5)
-        print(f"Server is running on port {args.port}")
-    except:
-        print(f"ERROR: Server not running on port {args.port}")
-        print(f"Start the server first: uvicorn app.main:app --port {args.port}")
+    if args.port:
+        # Check server is running
+        try:
+            httpx.get(f"http://127.0.0.1:{args.port}/", timeout=5)
+            print(f"Server is running on port {args.port}")
+        except httpx.HTTPError as e:
+            print(f"ERROR: Server not running on port {args.port} ({e})")
+            print(f"Start the server first: uvicorn app.main:app --port {args.port}")
+            sys.exit(1)
+    elif not os.getenv("BRAVE_API_KEY"):
+        print("ERROR: BRAVE_API_KEY is not configured")
         sys.exit(1)
+    else:
+        print("Running in-process")
 
-    # Load existing results if resuming
+    # Existing results: skipped when resuming, otherwise only kept for the
+    # sections / job families this run doesn't regenerate
     if args.resume:
-        results = load_existing_results()
-        existing = set(results.get("companies", {}).keys())
+        existing = load_existing_results().get("companies", {})
         print(f"Resuming with {len(existing)} existing results")
     else:
-        results = {
-            "started_at": datetime.now().isoformat(),
-            "total_companies": total,
-            "youtube_threshold": YOUTUBE_THRESHOLD,
-            "companies": {}
-        }
-        existing = set()
+        # A fresh run starts a fresh checkpoint
+        CHECKPOINT_FILE.unlink(missing_ok=True)
+        existing = load_existing_results().get("companies", {})
 
-    # Process each company
-    start_time = time.time()
-    success_count = 0
-    error_count = 0
-
-    for i, company in enumerate(companies, 1):
-        # Skip if already processed (resume mode)
-        if company in existing:
-            result = results["companies"][company]
-            if "error" not in result:
-                success_count += 1
-            else:
-                error_count += 1
-            continue
+    # Rough upper bound, for the maintenance window
+    per_company = (
+        BRAVE_QUERIES["company-info"] * ("overview" in args.sections)
+        + BRAVE_QUERIES["company-reviews"] * ("reviews" in args.sections)
+        + BRAVE_QUERIES["salary-benefits"] * ("benefits" in args.sections)
+        + BRAVE_QUERIES["interview-prep"] * len(titles) * ("interview" in args.sections)
+    )
+    print(f"Up to {per_company} Brave queries per company at {args.brave_qps:g}/s: "
+          f"~{per_company * total / args.brave_qps / 60:.0f} min for a full run")
 
-        # Get company info (handle unicode in company names)
-        safe_name = company.encode('ascii', 'replace').decode('ascii')
-        print(f"[{i}/{total}] {safe_name}...", end=" ", flush=True)
-        data = get_company_info(company, args.port, args.timeout)
+    started_at = datetime.now().isoformat()
+    start_time = time.time()
+    stats = asyncio.run(run(companies, existing, args, titles))
 
-        if "error" in data:
-            print(f"ERROR: {data['error']}")
-            results["companies"][company] = {"error": data["error"]}
-            error_count += 1
-        else:
-            link_count = len(data.get("links", []))
-            domain = data.get("domain")
-            results["companies"][company] = {
-                "domain": domain,
-                "link_count": link_count,
-                "links": data.get("links", [])
-            }
-            print(f"OK ({link_count} links, domain: {domain})")
-            success_count += 1
-
-        # Save periodically (every 10 companies)
-        if i % 10 == 0:
-            save_results(results)
-
-        # Rate limiting - small delay to avoid hammering
-        time.sleep(0.1)
-
-    # Final save
-    results["completed_at"] = datetime.now().isoformat()
-    results["summary"] = {
-        "total": total,
-        "success": success_count,
-        "errors": error_count
+    # Single compaction: fold the checkpoint into the results file
+    from app.services.precomputed_results import compact_precomputed_results
+    metadata = {
+        "completed_at": datetime.now().isoformat(),
+        "total_companies": total,
+        "youtube_threshold": YOUTUBE_THRESHOLD,
+        "summary": {
+            "total": total,
+            "success": stats["success"],
+            "errors": stats["errors"],
+            "skipped": stats["skipped"],
+        },
     }
-    save_results(results)
+    if not args.resume:
+        metadata["started_at"] = started_at
+    compact_precomputed_results(wait=True, checkpoint=CHECKPOINT_FILE, metadata=metadata)
 
     elapsed = time.time() - start_time
     print(f"\nCompleted in {elapsed:.1f}s")
-    print(f"Success: {success_count}, Errors: {error_count}")
+    print(f"Success: {stats['success']}, Errors: {stats['errors']}, Already complete: {stats['skipped']}")
     print(f"Results saved to {OUTPUT_FILE}")
+    if stats["errors"]:
+        print("Re-run with --resume to retry the failed sections")
+    print("Running servers pick it up within DATA_RELOAD_INTERVAL, or at once via POST /api/admin/reload-precomputed")
 
 
 if __name__ == "__main__":
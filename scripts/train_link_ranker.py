@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Train the local link ranker from logged GPT selections.
+
+Every successful GPT selection for company-reviews / interview-prep is
+appended to data/link_selections.jsonl (candidates + chosen URLs; the
+rotated link_selections.jsonl.1 is read too). This
+script fits one logistic-regression model per endpoint (label = "GPT picked
+this candidate") and writes data/link_ranker_model.json, which the server
+picks up without a restart.
+
+Usage:
+    python scripts/train_link_ranker.py
+    python scripts/train_link_ranker.py --epochs 300 --l2 0.01
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from app.utils.link_ranker import (  # noqa: E402
+    extract_link_features, FEATURE_NAMES, RANKER_MODEL_PATH, selection_log_files
+)
+
+MIN_EXAMPLES = 50
+
+
+def load_examples(log_paths: list[Path]) -> dict:
+    """Return {endpoint: [(features, label), ...]} from the selection log files."""
+    examples = defaultdict(list)
+    for log_path in log_paths:
+        with open(log_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                endpoint = record.get('endpoint')
+                selected = {s.get('url') for s in record.get('selected', [])}
+                for link in record.get('candidates', []):
+                    features = extract_link_features(link, record.get('company'), endpoint)
+                    examples[endpoint].append((features, 1.0 if link.get('url') in selected else 0.0))
+    return examples
+
+
+def train(examples: list, epochs: int, lr: float, l2: float) -> dict:
+    """Plain full-batch gradient descent on the logistic loss."""
+    weights = {name: 0.0 for name in FEATURE_NAMES}
+    bias = 0.0
+    n = len(examples)
+
+    for _ in range(epochs):
+        grad_w = {name: 0.0 for name in FEATURE_NAMES}
+        grad_b = 0.0
+        for features, label in examples:
+            z = bias + sum(weights[name] * features.get(name, 0.0) for name in FEATURE_NAMES)
+            error = 1 / (1 + math.exp(-z)) - label
+            grad_b += error
+            for name in FEATURE_NAMES:
+                grad_w[name] += error * features.get(name, 0.0)
+        bias -= lr * grad_b / n
+        for name in FEATURE_NAMES:
+            weights[name] -= lr * (grad_w[name] / n + l2 * weights[name])
+
+    return {'bias': round(bias, 4), 'weights': {k: round(v, 4) for k, v in weights.items()}}
+
+
+def evaluate(model: dict, examples: list) -> float:
+    """Accuracy at the 0.5 threshold."""
+    correct = 0
+    for features, label in examples:
+        z = model['bias'] + sum(model['weights'][name] * features.get(name, 0.0) for name in FEATURE_NAMES)
+        correct += (z >= 0) == (label == 1.0)
+    return correct / len(examples) if examples else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the local link ranker")
+    parser.add_argument("--log", type=Path, default=None,
+                        help="Selection log (JSONL); default: data/link_selections.jsonl and its rotated .1")
+    parser.add_argument("--output", type=Path, default=RANKER_MODEL_PATH, help="Model output path")
+    parser.add_argument("--epochs", type=int, default=200)
+    parser.add_argument("--lr", type=float, default=0.5)
+    parser.add_argument("--l2", type=float, default=0.001)
+    args = parser.parse_args()
+
+    log_paths = [args.log] if args.log else selection_log_files()
+    if not log_paths or not all(path.exists() for path in log_paths):
+        print(f"ERROR: selection log not found: {args.log or 'data/link_selections.jsonl'}")
+        sys.exit(1)
+
+    examples = load_examples(log_paths)
+    model = {"trained_at": datetime.now().isoformat(), "endpoints": {}}
+
+    for endpoint, rows in examples.items():
+        if len(rows) < MIN_EXAMPLES:
+            print(f"[{endpoint}] only {len(rows)} examples, skipping (need {MIN_EXAMPLES})")
+            continue
+
+        random.seed(0)
+        random.shuffle(rows)
+        split = int(len(rows) * 0.8)
+        trained = train(rows[:split], args.epochs, args.lr, args.l2)
+        accuracy = evaluate(trained, rows[split:])
+        positives = sum(1 for _, label in rows if label)
+        print(f"[{endpoint}] {len(rows)} examples ({positives} selected), holdout accuracy {accuracy:.1%}")
+
+        model["endpoints"][endpoint] = train(rows, args.epochs, args.lr, args.l2)
+
+    if not model["endpoints"]:
+        print("No endpoint had enough data; model not written")
+        sys.exit(1)
+
+    tmp_path = args.output.with_suffix(".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(model, f, indent=2)
+    tmp_path.replace(args.output)
+    print(f"Model saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -152,6 +152,107 @@ document.addEventListener('DOMContentLoaded', function() {
             }, delay);
         };
     }
+
+    // ========== CLIENT-SIDE AUTOCOMPLETE INDEX ==========
+    // Company names, aliases and job titles are downloaded once (content-versioned,
+    // cached by the browser) and matched locally with the same ranking as the server.
+    // The server is only asked while the index loads, or for typo suggestions when
+    // nothing matches locally.
+    const SUGGESTION_LIMIT = 10;
+    let localIndex = null;
+
+    function buildLocalEntries(names, aliases) {
+        const entries = names.map(name => ({ key: name.toLowerCase(), name: name }));
+        aliases.forEach(([alias, i]) => entries.push({ key: alias.toLowerCase(), name: names[i] }));
+        entries.sort((a, b) => (a.key < b.key ? -1 : a.key > b.key ? 1 : 0));
+        return entries;
+    }
+
+    async function loadLocalIndex() {
+        try {
+            const manifest = await (await fetch('/api/autocomplete/index')).json();
+            const doc = await (await fetch(manifest.url)).json();
+            localIndex = {
+                company: {
+                    entries: buildLocalEntries(doc.companies, doc.aliases),
+                    popular: manifest.popular.company.map(i => doc.companies[i])
+                },
+                job_title: {
+                    entries: buildLocalEntries(doc.job_titles, []),
+                    popular: manifest.popular.job_title.map(i => doc.job_titles[i])
+                }
+            };
+        } catch (error) {
+            console.error('Autocomplete index unavailable, using server search:', error);
+        }
+    }
+
+    // Prefix matches, then contains; popular names first within each
+    function localSuggest(kind, query) {
+        const { entries, popular } = localIndex[kind];
+        const q = query.toLowerCase();
+
+        // Binary search for the first key >= q; prefix matches follow it
+        let lo = 0, hi = entries.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >> 1;
+            if (entries[mid].key < q) lo = mid + 1; else hi = mid;
+        }
+        const prefix = new Set();
+        for (let i = lo; i < entries.length && entries[i].key.startsWith(q) && prefix.size < SUGGESTION_LIMIT; i++) {
+            prefix.add(entries[i].name);
+        }
+        const contains = new Set();
+        for (let i = 0; i < entries.length && contains.size < SUGGESTION_LIMIT; i++) {
+            const entry = entries[i];
+            if (!entry.key.startsWith(q) && entry.key.includes(q) && !prefix.has(entry.name)) contains.add(entry.name);
+        }
+        const popularPrefix = [];
+        const popularContains = [];
+        popular.forEach(name => {
+            const key = name.toLowerCase();
+            if (key.startsWith(q)) popularPrefix.push(name);
+            else if (key.includes(q)) popularContains.push(name);
+        });
+
+        const results = [];
+        for (const name of [...popularPrefix, ...prefix, ...popularContains, ...contains]) {
+            if (!results.includes(name)) results.push(name);
+            if (results.length >= SUGGESTION_LIMIT) break;
+        }
+        return results;
+    }
+
+    async function getSuggestions(kind, query) {
+        if (localIndex) {
+            const results = localSuggest(kind, query);
+            // Typo-tolerant matching only exists on the server
+            if (results.length > 0 || kind !== 'company' || query.length < 4) {
+                return results;
+            }
+        }
+        const endpoint = kind === 'company' ? 'company' : 'job-title';
+        const response = await fetch(`/api/autocomplete/${endpoint}?q=${encodeURIComponent(query)}`);
+        return response.json();
+    }
+
+    loadLocalIndex();
+
+    // Tell the server which suggestion was picked (feeds popularity ranking).
+    // sendBeacon doesn't block navigation and survives page unload.
+    function recordSelection(kind, value) {
+        const body = JSON.stringify({ kind: kind, value: value });
+        if (navigator.sendBeacon) {
+            navigator.sendBeacon('/api/autocomplete/select', new Blob([body], { type: 'application/json' }));
+        } else {
+            fetch('/api/autocomplete/select', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: body,
+                keepalive: true
+            }).catch(() => {});
+        }
+    }
     
     
     // ========== AUTOCOMPLETE SEARCH ==========
@@ -173,11 +274,7 @@ document.addEventListener('DOMContentLoaded', function() {
         }
         
         try {
-            const url = `/api/autocomplete/job-title?q=${encodeURIComponent(query)}`;
-            
-            const response = await fetch(url);
-            
-            const results = await response.json();
+            const results = await getSuggestions('job_title', query);
             
             if (results.length === 0) {
                 dropdown.classList.add('hidden');
@@ -203,6 +300,7 @@ document.addEventListener('DOMContentLoaded', function() {
                     const selectedValue = this.textContent.trim();
                     jobTitleInput.value = selectedValue;
                     dropdown.classList.add('hidden');
+                    recordSelection('job_title', selectedValue);
                 });
             });
             
@@ -241,9 +339,7 @@ document.addEventListener('DOMContentLoaded', function() {
             }
 
             try {
-                const url = `/api/autocomplete/company?q=${encodeURIComponent(query)}`;
-                const response = await fetch(url);
-                const results = await response.json();
+                const results = await getSuggestions('company', query);
 
                 if (results.length === 0) {
                     companyDropdown.classList.add('hidden');
@@ -269,6 +365,7 @@ document.addEventListener('DOMContentLoaded', function() {
                         const selectedValue = this.textContent.trim();
                         companyNameInput.value = selectedValue;
                         companyDropdown.classList.add('hidden');
+                        recordSelection('company', selectedValue);
                     });
                 });
 
@@ -1113,6 +1210,24 @@ document.addEventListener('DOMContentLoaded', function() {
             .replace(/'/g, '&#039;');
     }
 
+    // Read a newline-delimited JSON response, calling onEvent for each line as it arrives
+    async function readNdjsonStream(response, onEvent) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            lines.filter(line => line.trim()).forEach(line => onEvent(JSON.parse(line)));
+        }
+
+        if (buffer.trim()) onEvent(JSON.parse(buffer));
+    }
+
     async function doGenerateQuestions() {
         const jd = jdInput ? jdInput.value.trim() : '';
 
@@ -1138,28 +1253,47 @@ document.addEventListener('DOMContentLoaded', function() {
         }
 
         try {
-            const response = await fetch('/api/generate-questions', {
+            const response = await fetch('/api/generate-questions/stream', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({ job_description: jd }),
             });
 
-            const data = await response.json();
-
             if (!response.ok) {
+                const data = await response.json();
                 throw new Error(data.detail || 'Failed to generate questions.');
             }
 
-            renderQuestionList(data.behavioral || [], 'behavioralQuestionsList');
-            renderQuestionList(data.technical || [], 'technicalQuestionsList');
+            // Render each question as soon as the server streams it
+            const streamed = { behavioral: [], technical: [] };
+            let resultsShown = false;
 
-            if (questionsLoadingState) questionsLoadingState.classList.add('hidden');
-            if (questionsResults) questionsResults.classList.remove('hidden');
+            await readNdjsonStream(response, event => {
+                if (event.type === 'error') {
+                    throw new Error(event.detail || 'Failed to generate questions.');
+                }
+                if (event.type === 'question') {
+                    streamed[event.section].push(event.question);
+                    renderQuestionList(streamed[event.section], `${event.section}QuestionsList`);
+                } else if (event.type === 'done') {
+                    renderQuestionList(event.behavioral || [], 'behavioralQuestionsList');
+                    renderQuestionList(event.technical || [], 'technicalQuestionsList');
+                }
 
-            // Scroll to results on mobile
-            if (questionsResults) {
-                questionsResults.scrollIntoView({ behavior: 'smooth', block: 'start' });
-            }
+                if (!resultsShown) {
+                    resultsShown = true;
+                    if (event.type === 'question') {
+                        renderQuestionList([], event.section === 'behavioral' ? 'technicalQuestionsList' : 'behavioralQuestionsList');
+                    }
+                    if (questionsLoadingState) questionsLoadingState.classList.add('hidden');
+                    if (questionsResults) questionsResults.classList.remove('hidden');
+
+                    // Scroll to results on mobile
+                    if (questionsResults) {
+                        questionsResults.scrollIntoView({ behavior: 'smooth', block: 'start' });
+                    }
+                }
+            });
 
         } catch (err) {
             console.error('Question generation error:', err);